@@ -0,0 +1,310 @@
+# ===========================================
+# File: src/batch_convert.py
+# ===========================================
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from conversion_cache import ConversionCache
+from page_store import PageStore, convert_incremental
+from streaming_export import DEFAULT_PAGE_WINDOW, output_paths, stream_or_copy
+
+# Shared helpers live in the training project
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from training_project.src.instrumentation import metrics
+
+logger = logging.getLogger(__name__)
+
+# Export formats a conversion can write
+EXPORT_FORMATS = ("markdown", "json")
+
+# Per worker process state, built once by the pool initializer
+_converter = None
+_pipeline_options = None
+_cache = None
+_page_store = None
+
+
+def build_pipeline_options(num_threads=None):
+    """Build the PDF pipeline options shared by all converters"""
+    # docling is imported on first use; importing it costs seconds of startup
+    from docling.datamodel.pipeline_options import (
+        AcceleratorOptions,
+        PdfPipelineOptions,
+    )
+
+    pipeline_options = PdfPipelineOptions()
+    if num_threads:
+        pipeline_options.accelerator_options = AcceleratorOptions(
+            num_threads=num_threads
+        )
+    return pipeline_options
+
+
+def build_converter(pipeline_options=None):
+    """Create a DocumentConverter for PDF input"""
+    from docling.datamodel.base_models import InputFormat
+    from docling.document_converter import DocumentConverter, PdfFormatOption
+
+    pipeline_options = pipeline_options or build_pipeline_options()
+    return DocumentConverter(
+        format_options={
+            InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)
+        }
+    )
+
+
+def collect_documents(source):
+    """Collect PDF paths from a directory or a manifest file (one path per line)"""
+    source = Path(source)
+    if source.is_dir():
+        return sorted(p for p in source.rglob("*") if p.suffix.lower() == ".pdf")
+
+    if not source.exists():
+        raise FileNotFoundError(f"Batch source not found: {source}")
+
+    documents = []
+    with open(source, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            path = Path(line)
+            # Relative manifest entries are resolved against the manifest location
+            if not path.is_absolute():
+                path = source.parent / path
+            documents.append(path)
+    return documents
+
+
+def output_path_for(pdf_path, source, output_dir, suffix=".md"):
+    """Mirror the PDF's location below the batch source into the output directory"""
+    pdf_path = Path(pdf_path)
+    source = Path(source)
+    if source.is_dir():
+        relative = pdf_path.relative_to(source)
+    else:
+        relative = Path(pdf_path.name)
+    return Path(output_dir) / relative.with_suffix(suffix)
+
+
+def load_or_convert(
+    pdf_path,
+    converter,
+    pipeline_options,
+    cache=None,
+    page_store=None,
+    formats=EXPORT_FORMATS,
+):
+    """Return (markdown, document_dict, pages, cached) for a PDF, using caches if given
+
+    Only the requested export formats are computed; the others are None.
+    With a page store only pages that changed since the last conversion are
+    converted and the document is stitched together from stored pages.
+    """
+    key = None
+    if cache is not None:
+        variant = "pages" if page_store is not None else "document"
+        with metrics.span("cache_lookup"):
+            key = cache.make_key(pdf_path, pipeline_options, variant=variant)
+            hit = cache.get(key, formats)
+        if hit is not None:
+            metrics.count("cache_hits")
+            markdown, document_dict, meta = hit
+            return markdown, document_dict, meta.get("pages", 0), True
+        metrics.count("cache_misses")
+
+    markdown = document_dict = None
+    if page_store is not None:
+        markdown, document_dict, pages, _ = convert_incremental(
+            pdf_path, converter, page_store, formats
+        )
+    else:
+        with metrics.span("conversion", mode="document"):
+            document = converter.convert(str(pdf_path)).document
+        if "markdown" in formats:
+            with metrics.span("export", format="markdown"):
+                markdown = document.export_to_markdown()
+        if "json" in formats:
+            with metrics.span("export", format="dict"):
+                document_dict = document.export_to_dict()
+        pages = len(document.pages)
+        metrics.count("pages_converted", pages)
+
+    if cache is not None:
+        cache.put(
+            key, markdown, document_dict, {"pdf": str(pdf_path), "pages": pages}
+        )
+    return markdown, document_dict, pages, False
+
+
+def write_exports(output_base, markdown=None, document_dict=None):
+    """Write the computed exports next to each other; returns the written paths"""
+    exports = {"markdown": markdown, "json": document_dict}
+    formats = [name for name, value in exports.items() if value is not None]
+    paths = output_paths(output_base, formats)
+    for name, path in paths.items():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            if name == "json":
+                json.dump(exports[name], f)
+            else:
+                f.write(exports[name])
+    return list(paths.values())
+
+
+def _init_worker(
+    num_threads, cache_dir=None, page_store_dir=None, metrics_config=None
+):
+    """Pool initializer: build this worker's converter and cache handles once"""
+    global _converter, _pipeline_options, _cache, _page_store
+    if metrics_config is not None:
+        metrics.configure(**metrics_config)
+    _pipeline_options = build_pipeline_options(num_threads)
+    _converter = build_converter(_pipeline_options)
+    _cache = ConversionCache(cache_dir) if cache_dir else None
+    if page_store_dir:
+        _page_store = PageStore(page_store_dir, _pipeline_options)
+
+
+def convert_document(
+    pdf_path, output_base, formats=("markdown",), stream=False, page_window=None
+):
+    """Convert a single PDF with the worker's converter and write its exports
+
+    output_base is the output path without suffix; every requested format
+    is written next to it (.md, .json).
+    """
+    global _converter, _pipeline_options
+    if _converter is None:
+        _pipeline_options = build_pipeline_options()
+        _converter = build_converter(_pipeline_options)
+
+    start = time.perf_counter()
+    cached = False
+    try:
+        if stream:
+            pages, cached = stream_or_copy(
+                pdf_path,
+                _converter,
+                _pipeline_options,
+                output_base,
+                formats,
+                page_window or DEFAULT_PAGE_WINDOW,
+                _cache,
+            )
+        else:
+            markdown, document_dict, pages, cached = load_or_convert(
+                pdf_path, _converter, _pipeline_options, _cache, _page_store, formats
+            )
+            write_exports(output_base, markdown, document_dict)
+        error = None
+    except Exception as e:
+        pages = 0
+        error = str(e)
+
+    return {
+        "pdf": str(pdf_path),
+        "output": str(output_base),
+        "pages": pages,
+        "cached": cached,
+        "seconds": time.perf_counter() - start,
+        "error": error,
+        # Handed back to the parent, which aggregates metrics of all workers
+        "metrics": metrics.drain() if metrics.enabled else None,
+    }
+
+
+def run_batch(
+    source,
+    output_dir,
+    workers=None,
+    cache=None,
+    page_store_dir=None,
+    formats=("markdown",),
+    stream=False,
+    page_window=None,
+):
+    """Convert all documents of a batch source across a process pool"""
+    documents = collect_documents(source)
+    if not documents:
+        logger.warning(f"No PDF documents found in {source}")
+        return []
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(documents)))
+    # Split the cores between workers so the converters do not oversubscribe
+    num_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    logger.info(
+        f"Converting {len(documents)} documents with {workers} workers "
+        f"({num_threads} threads each)"
+    )
+
+    results = []
+    start = time.perf_counter()
+    # Spawn instead of fork: torch-backed converters are not fork safe
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(
+            num_threads,
+            str(cache.root) if cache else None,
+            str(page_store_dir) if page_store_dir else None,
+            metrics.worker_config() if metrics.enabled else None,
+        ),
+    ) as pool:
+        futures = [
+            pool.submit(
+                convert_document,
+                pdf,
+                output_path_for(pdf, source, output_dir, suffix=""),
+                formats,
+                stream,
+                page_window,
+            )
+            for pdf in documents
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            metrics.merge(result.pop("metrics"))
+            results.append(result)
+            if result["error"]:
+                logger.error(f"{result['pdf']}: failed - {result['error']}")
+            else:
+                source_note = " (cached)" if result["cached"] else ""
+                logger.info(
+                    f"{result['pdf']}: {result['pages']} pages in "
+                    f"{result['seconds']:.2f}s{source_note}"
+                )
+
+    elapsed = time.perf_counter() - start
+    metrics.observe("batch_seconds", elapsed)
+    report_batch(results, elapsed)
+
+    # Workers only add entries; trimming happens once the pool is done
+    if cache is not None:
+        cache.evict()
+    return results
+
+
+def report_batch(results, elapsed):
+    """Log the batch summary with overall page throughput"""
+    converted = [r for r in results if not r["error"]]
+    failed = len(results) - len(converted)
+    cached = sum(1 for r in converted if r["cached"])
+    pages = sum(r["pages"] for r in converted)
+    pages_per_sec = pages / elapsed if elapsed > 0 else 0.0
+
+    logger.info("=== Batch Summary ===")
+    logger.info(
+        f"Documents: {len(converted)} converted ({cached} from cache), {failed} failed"
+    )
+    logger.info(f"Pages: {pages} in {elapsed:.1f}s wall time")
+    logger.info(f"Throughput: {pages_per_sec:.2f} pages/sec")
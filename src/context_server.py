@@ -0,0 +1,276 @@
+# ===========================================
+# File: src/context_server.py
+# ===========================================
+"""MCP server (stdio transport) answering from a precomputed context store
+
+Tool calls never run docling: everything is served from the store written by
+src/context_store.py (or ``src/main.py --batch ... --context-store``).
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+
+from context_store import DEFAULT_STORE_DIR, KINDS, ContextStore
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = "2024-11-05"
+SERVER_INFO = {"name": "pdf-ocr-datasheets", "version": "0.1.0"}
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+TOOLS = [
+    {
+        "name": "search_datasheets",
+        "description": (
+            "Full-text search over converted datasheets: text sections, tables "
+            "and detected schematic symbols. Returns the best matching chunks."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Search terms"},
+                "limit": {"type": "integer", "default": 10},
+                "kind": {"type": "string", "enum": list(KINDS)},
+                "document": {
+                    "type": "string",
+                    "description": "Restrict the search to one datasheet",
+                },
+            },
+            "required": ["query"],
+        },
+    },
+    {
+        "name": "get_datasheet",
+        "description": "All chunks of one datasheet in reading order.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "document": {"type": "string"},
+                "kind": {"type": "string", "enum": list(KINDS)},
+            },
+            "required": ["document"],
+        },
+    },
+    {
+        "name": "get_chunk",
+        "description": "One chunk by the id returned from search_datasheets.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {"id": {"type": "integer"}},
+            "required": ["id"],
+        },
+    },
+    {
+        "name": "list_datasheets",
+        "description": "Names of the loaded datasheets, filtered by a name prefix.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "prefix": {"type": "string", "default": ""},
+                "limit": {"type": "integer", "default": 100},
+            },
+        },
+    },
+]
+
+
+class InvalidParams(ValueError):
+    """Tool arguments that do not match the tool's input schema"""
+
+
+_REQUIRED = object()
+
+
+def _argument(arguments, key, kind, default=_REQUIRED):
+    """Tool argument of the given type; raises InvalidParams if it is not"""
+    value = arguments.get(key)
+    if value is None:
+        if default is _REQUIRED:
+            raise InvalidParams(f"Missing required argument: {key}")
+        return default
+    # bool is an int subclass, but true is not a valid limit or id
+    if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+        expected = "an integer" if kind is int else "a string"
+        raise InvalidParams(f"Argument '{key}' must be {expected}")
+    return value
+
+
+def _kind_argument(arguments):
+    kind = _argument(arguments, "kind", str, None)
+    if kind is not None and kind not in KINDS:
+        raise InvalidParams(f"Argument 'kind' must be one of: {', '.join(KINDS)}")
+    return kind
+
+
+def _limit_argument(arguments, default):
+    limit = _argument(arguments, "limit", int, default)
+    if limit < 1:
+        raise InvalidParams("Argument 'limit' must be at least 1")
+    return limit
+
+
+def _format_chunks(chunks):
+    if not chunks:
+        return "No matching content."
+    return "\n\n".join(
+        f"[{c['document']} #{c['id']} {c['kind']}]\n{c['text']}" for c in chunks
+    )
+
+
+class ContextServer:
+    """Dispatches MCP JSON-RPC requests to ContextStore lookups"""
+
+    def __init__(self, store):
+        self.store = store
+
+    # -------------------------------------------------------------- tools
+
+    def call_tool(self, name, arguments):
+        """Text answer of one tool call
+
+        Raises InvalidParams for unknown tools, mistyped arguments and unknown
+        documents or chunk ids.
+        """
+        try:
+            if name == "search_datasheets":
+                chunks = self.store.search(
+                    _argument(arguments, "query", str),
+                    limit=_limit_argument(arguments, 10),
+                    kind=_kind_argument(arguments),
+                    document=_argument(arguments, "document", str, None),
+                )
+                return _format_chunks(chunks)
+            if name == "get_datasheet":
+                chunks = self.store.document_chunks(
+                    _argument(arguments, "document", str),
+                    kind=_kind_argument(arguments),
+                )
+                return _format_chunks(chunks)
+            if name == "get_chunk":
+                chunk_id = _argument(arguments, "id", int)
+                return _format_chunks([self.store.chunk(chunk_id)])
+            if name == "list_datasheets":
+                names = self.store.list_documents(
+                    _argument(arguments, "prefix", str, ""),
+                    _limit_argument(arguments, 100),
+                )
+                return "\n".join(names) or "No datasheets loaded."
+        except KeyError as e:
+            # The store raises KeyError("Unknown document: ...") and the like
+            raise InvalidParams(e.args[0] if e.args else "Unknown key")
+        raise InvalidParams(f"Unknown tool: {name}")
+
+    # ------------------------------------------------------------ JSON-RPC
+
+    def handle(self, message):
+        """Response for one JSON-RPC message, or None for notifications"""
+        if not isinstance(message, dict):
+            # Batches are not used by MCP clients; answered like any non-request
+            return _error(None, INVALID_REQUEST, "Request must be a JSON object")
+        method = message.get("method")
+        params = message.get("params") or {}
+        if "id" not in message:
+            return None
+        if not isinstance(params, dict):
+            return _error(message["id"], INVALID_PARAMS, "params must be an object")
+
+        if method == "initialize":
+            result = {
+                "protocolVersion": params.get("protocolVersion", PROTOCOL_VERSION),
+                "capabilities": {"tools": {}},
+                "serverInfo": SERVER_INFO,
+            }
+        elif method == "ping":
+            result = {}
+        elif method == "tools/list":
+            result = {"tools": TOOLS}
+        elif method == "tools/call":
+            name = params.get("name")
+            arguments = params.get("arguments") or {}
+            if not isinstance(arguments, dict):
+                return _error(
+                    message["id"], INVALID_PARAMS, "arguments must be an object"
+                )
+            start = time.perf_counter()
+            try:
+                text = self.call_tool(name, arguments)
+                result = {"content": [{"type": "text", "text": text}]}
+            except InvalidParams as e:
+                # Tool errors are reported to the model, not as protocol errors
+                content = [{"type": "text", "text": str(e)}]
+                result = {"content": content, "isError": True}
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            logger.debug(f"{name} took {elapsed_ms:.2f}ms")
+        else:
+            return _error(message["id"], METHOD_NOT_FOUND, f"Unknown method: {method}")
+        return {"jsonrpc": "2.0", "id": message["id"], "result": result}
+
+    def serve(self, stdin=sys.stdin, stdout=sys.stdout):
+        """Newline-delimited JSON-RPC over stdio until stdin closes"""
+        for line in stdin:
+            if not line.strip():
+                continue
+            try:
+                message = json.loads(line)
+            except ValueError as e:
+                response = _error(None, PARSE_ERROR, str(e))
+            else:
+                try:
+                    response = self.handle(message)
+                except Exception as e:
+                    # A failing request must not end the session
+                    logger.exception("Request failed")
+                    request_id = (
+                        message.get("id") if isinstance(message, dict) else None
+                    )
+                    response = _error(request_id, INTERNAL_ERROR, str(e))
+            if response is not None:
+                stdout.write(json.dumps(response) + "\n")
+                stdout.flush()
+
+
+def _error(message_id, code, text):
+    return {
+        "jsonrpc": "2.0",
+        "id": message_id,
+        "error": {"code": code, "message": text},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve datasheet context to an LLM over MCP (stdio)"
+    )
+    parser.add_argument(
+        "--store", default=DEFAULT_STORE_DIR, help="Context store directory"
+    )
+    parser.add_argument("--verbose", action="store_true", help="Log tool timings")
+    args = parser.parse_args()
+
+    # stdout carries the protocol; logs go to stderr
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        stream=sys.stderr,
+    )
+
+    start = time.perf_counter()
+    store = ContextStore(args.store)
+    logger.info(
+        f"Loaded {len(store.documents)} datasheets, {len(store)} chunks in "
+        f"{time.perf_counter() - start:.2f}s from {args.store}"
+    )
+    ContextServer(store).serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+# ===========================================
+# File: src/context_store.py
+# ===========================================
+"""Precomputed, mmap-backed store of datasheet chunks for the context server
+
+Layout of a store directory:
+
+- ``chunks.bin``     UTF-8 chunk texts, concatenated
+- ``offsets.bin``    uint64 start offset of every chunk, plus the end offset
+- ``chunk_docs.bin`` uint32 document id of every chunk
+- ``chunk_kinds.bin`` uint8 chunk kind (see KINDS)
+- ``postings.bin``   uint32 chunk ids, grouped by token
+- ``index.json``     documents, vocabulary (token -> [offset, count]) and stats
+
+Only ``index.json`` and the small per-chunk arrays are read into memory;
+chunk texts and posting lists are sliced from memory maps on demand.
+"""
+
+import argparse
+import json
+import logging
+import math
+import mmap
+import re
+import shutil
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = "./tmp/context"
+
+KINDS = ("text", "table", "detections")
+
+# Chunk texts larger than this are split at paragraph boundaries
+MAX_CHUNK_CHARS = 2000
+
+# Tokens found in more than this fraction of all chunks do not add candidates
+COMMON_TOKEN_FRACTION = 0.05
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+
+
+def tokenize(text):
+    """Lower-case search tokens; keeps part numbers and values such as 4.5-15v"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+# ------------------------------------------------------------------ chunking
+
+
+def _split_long(text, heading):
+    """Split an oversized section at blank lines, repeating its heading"""
+    parts, current = [], []
+    size = 0
+    for paragraph in text.split("\n\n"):
+        if current and size + len(paragraph) > MAX_CHUNK_CHARS:
+            parts.append("\n\n".join(current))
+            current, size = [heading] if heading else [], len(heading)
+        current.append(paragraph)
+        size += len(paragraph) + 2
+    if current:
+        parts.append("\n\n".join(current))
+    return parts
+
+
+def chunk_markdown(markdown):
+    """Split docling markdown into (kind, text) chunks at headings and tables
+
+    Tables become separate chunks prefixed with the heading of their section,
+    so a table row can be found together with the section it belongs to.
+    """
+    chunks = []
+    heading = ""
+    text_lines, table_lines = [], []
+
+    def flush_text():
+        text = "\n".join(text_lines).strip()
+        text_lines.clear()
+        if text:
+            text = f"{heading}\n\n{text}" if heading else text
+            chunks.extend(("text", part) for part in _split_long(text, heading))
+
+    def flush_table():
+        if table_lines:
+            table = "\n".join(table_lines)
+            chunks.append(("table", f"{heading}\n{table}" if heading else table))
+            table_lines.clear()
+
+    for line in markdown.splitlines():
+        if line.startswith("|"):
+            table_lines.append(line)
+            continue
+        flush_table()
+        if line.startswith("#"):
+            flush_text()
+            heading = line.strip()
+        elif line.strip() != "<!-- image -->":
+            text_lines.append(line)
+    flush_table()
+    flush_text()
+    return chunks
+
+
+def load_detections(jsonl_paths):
+    """Detection records from predict.py --jsonl files, grouped by PDF stem"""
+    by_document = defaultdict(list)
+    for path in jsonl_paths or []:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    by_document[Path(record["source"]).stem].append(record)
+    return by_document
+
+
+def detection_chunks(records):
+    """One 'detections' chunk per page summarising the detected classes"""
+    chunks = []
+    for record in sorted(records, key=lambda r: (r.get("page") or 0)):
+        counts = Counter(
+            d.get("class_name", str(d["class_id"])) for d in record["detections"]
+        )
+        if not counts:
+            continue
+        page = record.get("page")
+        where = f"page {page + 1}" if page is not None else "image"
+        summary = ", ".join(f"{n} {name}" for name, n in counts.most_common())
+        chunks.append(("detections", f"Detected on {where}: {summary}"))
+    return chunks
+
+
+# ------------------------------------------------------------------ building
+
+
+def collect_markdown(source):
+    """Markdown files of a batch output directory, or a single file"""
+    source = Path(source)
+    if source.is_dir():
+        return sorted(source.rglob("*.md"))
+    return [source]
+
+
+def build_store(markdown_source, store_dir=DEFAULT_STORE_DIR, detections=None):
+    """Chunk all markdown outputs and write a fresh store
+
+    The store is built next to store_dir and swapped in at the end, so a
+    running context server keeps reading the previous store until restarted.
+    """
+    markdown_source = Path(markdown_source)
+    store_dir = Path(store_dir)
+    tmp_dir = store_dir.with_name(store_dir.name + ".tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    detections_by_doc = load_detections(detections)
+    documents = []
+    offsets = array("Q", [0])
+    chunk_docs = array("I")
+    chunk_kinds = array("B")
+    # Packed 4-byte ids per token instead of boxed ints; chunk ids only grow,
+    # so every posting list is sorted as built
+    postings = defaultdict(lambda: array("I"))
+
+    with open(tmp_dir / "chunks.bin", "wb") as payload:
+        for path in collect_markdown(markdown_source):
+            if markdown_source.is_dir():
+                name = path.relative_to(markdown_source).with_suffix("").as_posix()
+            else:
+                name = path.stem
+            chunks = chunk_markdown(path.read_text(encoding="utf-8"))
+            chunks += detection_chunks(detections_by_doc.get(path.stem, []))
+
+            doc_id = len(documents)
+            documents.append(
+                {
+                    "name": name,
+                    "path": str(path),
+                    "first_chunk": len(chunk_docs),
+                    "chunks": len(chunks),
+                }
+            )
+            for kind, text in chunks:
+                chunk_id = len(chunk_docs)
+                data = text.encode("utf-8")
+                payload.write(data)
+                offsets.append(offsets[-1] + len(data))
+                chunk_docs.append(doc_id)
+                chunk_kinds.append(KINDS.index(kind))
+                # The document name is searchable from every one of its chunks
+                for token in set(tokenize(text)) | set(tokenize(name)):
+                    postings[token].append(chunk_id)
+
+    vocabulary = {}
+    position = 0
+    with open(tmp_dir / "postings.bin", "wb") as f:
+        for token in sorted(postings):
+            ids = postings[token]
+            ids.tofile(f)
+            vocabulary[token] = [position, len(ids)]
+            position += len(ids)
+
+    for filename, values in [
+        ("offsets.bin", offsets),
+        ("chunk_docs.bin", chunk_docs),
+        ("chunk_kinds.bin", chunk_kinds),
+    ]:
+        with open(tmp_dir / filename, "wb") as f:
+            values.tofile(f)
+
+    with open(tmp_dir / "index.json", "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "version": 1,
+                "documents": documents,
+                "chunks": len(chunk_docs),
+                "vocabulary": vocabulary,
+            },
+            f,
+        )
+
+    if store_dir.exists():
+        shutil.rmtree(store_dir)
+    tmp_dir.rename(store_dir)
+    logger.info(
+        f"Context store: {len(documents)} documents, {len(chunk_docs)} chunks, "
+        f"{len(vocabulary)} tokens -> {store_dir}"
+    )
+    return store_dir
+
+
+# ------------------------------------------------------------------- reading
+
+
+def _load_array(path, typecode):
+    values = array(typecode)
+    with open(path, "rb") as f:
+        values.frombytes(f.read())
+    return values
+
+
+def _mmap(path):
+    """Read-only memory map; empty files cannot be mapped"""
+    with open(path, "rb") as f:
+        if Path(path).stat().st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class ContextStore:
+    """Read side of a context store: in-memory index, mmap-backed payloads"""
+
+    def __init__(self, store_dir=DEFAULT_STORE_DIR):
+        self.root = Path(store_dir)
+        with open(self.root / "index.json", "r", encoding="utf-8") as f:
+            index = json.load(f)
+        self.documents = index["documents"]
+        self.vocabulary = index["vocabulary"]
+        self.by_name = {doc["name"]: i for i, doc in enumerate(self.documents)}
+
+        self.offsets = _load_array(self.root / "offsets.bin", "Q")
+        self.chunk_docs = _load_array(self.root / "chunk_docs.bin", "I")
+        self.chunk_kinds = _load_array(self.root / "chunk_kinds.bin", "B")
+        self._payload = _mmap(self.root / "chunks.bin")
+        self._postings = _mmap(self.root / "postings.bin")
+
+    def __len__(self):
+        return len(self.chunk_docs)
+
+    def chunk(self, chunk_id):
+        """Chunk text and metadata"""
+        if not 0 <= chunk_id < len(self.chunk_docs):
+            raise KeyError(f"Unknown chunk id: {chunk_id}")
+        start, end = self.offsets[chunk_id], self.offsets[chunk_id + 1]
+        document = self.documents[self.chunk_docs[chunk_id]]
+        return {
+            "id": chunk_id,
+            "document": document["name"],
+            "kind": KINDS[self.chunk_kinds[chunk_id]],
+            "text": self._payload[start:end].decode("utf-8"),
+        }
+
+    def _posting(self, token):
+        entry = self.vocabulary.get(token)
+        if entry is None:
+            return array("I")
+        start, count = entry
+        ids = array("I")
+        ids.frombytes(self._postings[start * 4 : (start + count) * 4])
+        return ids
+
+    def search(self, query, limit=10, kind=None, document=None):
+        """Chunks ranked by summed IDF of the matched query tokens"""
+        tokens = set(tokenize(query))
+        total = max(len(self.chunk_docs), 1)
+        doc_id = self.by_name.get(document) if document else None
+        if document and doc_id is None:
+            raise KeyError(f"Unknown document: {document}")
+
+        # Rare tokens select the candidate chunks; very common tokens only add
+        # to the score of existing candidates (binary search in their sorted
+        # posting list) instead of touching a large part of the corpus
+        postings = sorted(
+            (p for p in (self._posting(t) for t in tokens) if p), key=len
+        )
+        common_limit = max(COMMON_TOKEN_FRACTION * total, 1000)
+        scores = defaultdict(float)
+        for ids in postings:
+            idf = math.log(1 + total / len(ids))
+            if scores and len(ids) > common_limit:
+                for chunk_id in scores:
+                    i = bisect_left(ids, chunk_id)
+                    if i < len(ids) and ids[i] == chunk_id:
+                        scores[chunk_id] += idf
+                continue
+            for chunk_id in ids:
+                scores[chunk_id] += idf
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        results = []
+        for chunk_id, score in ranked:
+            if kind and KINDS[self.chunk_kinds[chunk_id]] != kind:
+                continue
+            if doc_id is not None and self.chunk_docs[chunk_id] != doc_id:
+                continue
+            result = self.chunk(chunk_id)
+            result["score"] = round(score, 4)
+            results.append(result)
+            if len(results) >= limit:
+                break
+        return results
+
+    def document_chunks(self, name, kind=None):
+        """All chunks of a document in reading order"""
+        if name not in self.by_name:
+            raise KeyError(f"Unknown document: {name}")
+        document = self.documents[self.by_name[name]]
+        first = document["first_chunk"]
+        chunks = [self.chunk(i) for i in range(first, first + document["chunks"])]
+        return [c for c in chunks if kind is None or c["kind"] == kind]
+
+    def list_documents(self, prefix="", limit=100):
+        """Document names, optionally filtered by a name prefix"""
+        names = [d["name"] for d in self.documents if d["name"].startswith(prefix)]
+        return names[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the context store served by src/context_server.py"
+    )
+    parser.add_argument(
+        "source", help="Batch markdown output directory (or a single .md file)"
+    )
+    parser.add_argument(
+        "--store", default=DEFAULT_STORE_DIR, help="Context store directory"
+    )
+    parser.add_argument(
+        "--detections",
+        nargs="+",
+        help="JSON-lines detection records from training_project/scripts/predict.py",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    try:
+        build_store(args.source, args.store, detections=args.detections)
+    except Exception as e:
+        print(f"Building the context store failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+# ===========================================
+# File: src/conversion_cache.py
+# ===========================================
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "./tmp/cache/conversions"
+DEFAULT_MAX_BYTES = 10 * 1024**3
+
+MARKDOWN_FILE = "document.md"
+DICT_FILE = "document.json"
+META_FILE = "meta.json"
+
+# Cache entry file of each export format
+ENTRY_FILES = {"markdown": MARKDOWN_FILE, "json": DICT_FILE}
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Hash a file in chunks so large PDFs are never fully loaded"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _package_version(name):
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def pipeline_digest(pipeline_options):
+    """Hash of everything besides the PDF itself that determines docling output"""
+    # Thread counts change between batch sizes but never change the output
+    options = pipeline_options.model_dump(mode="json", exclude={"accelerator_options"})
+    key_data = {
+        "docling": _package_version("docling"),
+        "docling_core": _package_version("docling-core"),
+        "pipeline_options": options,
+    }
+    encoded = json.dumps(key_data, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ConversionCache:
+    """Content-addressed cache of docling exports with size-based LRU eviction"""
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def make_key(self, pdf_path, pipeline_options, variant="document"):
+        """Build the cache key from PDF content, docling version and pipeline options"""
+        key_data = {
+            "pdf_sha256": file_sha256(pdf_path),
+            "pipeline": pipeline_digest(pipeline_options),
+            "variant": variant,
+        }
+        encoded = json.dumps(key_data, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _entry_dir(self, key):
+        return self.root / key[:2] / key
+
+    def get(self, key, formats=("markdown", "json")):
+        """Return (markdown, document_dict, meta) for a cached conversion or None
+
+        Only the requested formats are read; the others are returned as None.
+        An entry lacking one of the requested formats counts as a miss.
+        """
+        entry = self._entry_dir(key)
+        meta_path = entry / META_FILE
+        if not meta_path.exists():
+            return None
+        files = [ENTRY_FILES[name] for name in formats]
+        if not all((entry / filename).exists() for filename in files):
+            return None
+
+        markdown = document_dict = None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if "markdown" in formats:
+                with open(entry / MARKDOWN_FILE, "r", encoding="utf-8") as f:
+                    markdown = f.read()
+            if "json" in formats:
+                with open(entry / DICT_FILE, "r", encoding="utf-8") as f:
+                    document_dict = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable cache entry {key}: {e}")
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+        # Touch the entry so eviction treats it as recently used
+        os.utime(meta_path)
+        return markdown, document_dict, meta
+
+    def get_files(self, key, formats=("markdown", "json")):
+        """Return ({format: path}, meta) of cached export files or None
+
+        Lets callers copy cached exports to their destination without
+        loading them into memory.
+        """
+        entry = self._entry_dir(key)
+        meta_path = entry / META_FILE
+        paths = {name: entry / ENTRY_FILES[name] for name in formats}
+        if not meta_path.exists() or not all(p.exists() for p in paths.values()):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable cache entry {key}: {e}")
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        os.utime(meta_path)
+        return paths, meta
+
+    def put(self, key, markdown, document_dict, meta=None):
+        """Store a conversion; entries are written to a temp dir and renamed in place
+
+        Exports passed as None are not stored. If the entry exists already,
+        exports it is missing are added to it.
+        """
+
+        def write(directory):
+            if markdown is not None:
+                with open(directory / MARKDOWN_FILE, "w", encoding="utf-8") as f:
+                    f.write(markdown)
+            if document_dict is not None:
+                with open(directory / DICT_FILE, "w", encoding="utf-8") as f:
+                    json.dump(document_dict, f)
+
+        return self._store(key, write, meta)
+
+    def put_files(self, key, paths, meta=None):
+        """Store export files {format: path} by copying them, like put()"""
+
+        def write(directory):
+            for name, path in paths.items():
+                shutil.copyfile(path, directory / ENTRY_FILES[name])
+
+        return self._store(key, write, meta)
+
+    def _store(self, key, write, meta):
+        entry = self._entry_dir(key)
+        if entry.exists():
+            self._complete(entry, write)
+            return entry
+
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{key}.", dir=entry.parent))
+        try:
+            write(tmp_dir)
+            # meta.json is written last and marks the entry as complete
+            with open(tmp_dir / META_FILE, "w", encoding="utf-8") as f:
+                json.dump(meta or {}, f)
+            os.replace(tmp_dir, entry)
+        except OSError:
+            # Another worker stored the same document first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not entry.exists():
+                raise
+            self._complete(entry, write)
+        return entry
+
+    def _complete(self, entry, write):
+        """Add exports an existing entry is missing, one atomic rename per file"""
+        tmp_dir = Path(tempfile.mkdtemp(prefix=".add.", dir=entry.parent))
+        try:
+            write(tmp_dir)
+            for path in tmp_dir.iterdir():
+                if not (entry / path.name).exists():
+                    os.replace(path, entry / path.name)
+        except OSError as e:
+            logger.warning(f"Could not complete cache entry {entry.name}: {e}")
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _entries(self):
+        for meta_path in self.root.glob(f"*/*/{META_FILE}"):
+            entry = meta_path.parent
+            size = sum(p.stat().st_size for p in entry.iterdir() if p.is_file())
+            yield meta_path.stat().st_mtime, size, entry
+
+    def size(self):
+        """Total size of all cache entries in bytes"""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_bytes"""
+        entries = sorted(self._entries(), key=lambda e: e[0])
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            evicted += 1
+
+        if evicted:
+            logger.info(f"Evicted {evicted} cache entries, {total} bytes remaining")
+        return evicted
@@ -0,0 +1,555 @@
+# ===========================================
+# File: src/datasheet_index.py
+# ===========================================
+"""Full-text (SQLite FTS5) and electrical-parameter index over docling output"""
+
+import argparse
+import json
+import logging
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from conversion_cache import DEFAULT_CACHE_DIR, DICT_FILE, META_FILE, file_sha256
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = "./tmp/datasheets.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    source TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    first_chunk INTEGER,
+    last_chunk INTEGER,
+    indexed_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(
+    heading,
+    text,
+    doc_id UNINDEXED,
+    page UNINDEXED,
+    kind UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS parameters (
+    id INTEGER PRIMARY KEY,
+    doc_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    part TEXT NOT NULL,
+    parameter TEXT NOT NULL,
+    symbol TEXT,
+    conditions TEXT,
+    min REAL,
+    typ REAL,
+    max REAL,
+    unit TEXT,
+    raw TEXT,
+    page INTEGER
+);
+CREATE INDEX IF NOT EXISTS parameters_doc ON parameters(doc_id);
+CREATE INDEX IF NOT EXISTS parameters_name ON parameters(parameter COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS parameters_unit_max ON parameters(unit, max);
+"""
+
+# Header cell patterns identifying the columns of an electrical characteristics table
+COLUMN_PATTERNS = {
+    "min": re.compile(r"^min(imum)?\.?$", re.I),
+    "typ": re.compile(r"^typ(ical)?\.?$", re.I),
+    "max": re.compile(r"^max(imum)?\.?$", re.I),
+    "unit": re.compile(r"^units?$", re.I),
+    "parameter": re.compile(r"param|characteristic|description|rating", re.I),
+    "symbol": re.compile(r"^sym(bol)?\.?$", re.I),
+    "conditions": re.compile(r"condition|test", re.I),
+}
+
+# SI prefixes; the parameter table stores values in base units
+PREFIXES = {
+    "p": 1e-12,
+    "n": 1e-9,
+    "u": 1e-6,
+    "µ": 1e-6,
+    "μ": 1e-6,
+    "m": 1e-3,
+    "k": 1e3,
+    "K": 1e3,
+    "M": 1e6,
+    "G": 1e9,
+}
+BASE_UNITS = {"V", "A", "W", "Hz", "F", "H", "s", "Ω", "°C", "%", "dB", "dBm"}
+UNIT_ALIASES = {"ohm": "Ω", "ohms": "Ω", "Ohm": "Ω", "kohm": "kΩ", "C": "°C"}
+
+NUMBER = re.compile(r"[-+±]?\d+(?:,\d{3})*(?:[.,]\d+)?(?:[eE][-+]?\d+)?")
+# A comma followed by one or two final digits is a decimal comma ("4,75")
+DECIMAL_COMMA = re.compile(r",(\d{1,2})$")
+
+
+# ------------------------------------------------------------ extraction
+
+
+def normalize_unit(unit):
+    """Return (base unit, scale factor) for units like mV, kHz or µA"""
+    unit = (unit or "").strip().replace("Ohm", "Ω")
+    unit = UNIT_ALIASES.get(unit, unit)
+    if unit in BASE_UNITS:
+        return unit, 1.0
+    if len(unit) > 1 and unit[0] in PREFIXES and unit[1:] in BASE_UNITS:
+        return unit[1:], PREFIXES[unit[0]]
+    return unit or None, 1.0
+
+
+def parse_number(text):
+    """First number in a table cell; unicode minus signs and ± are handled
+
+    Commas are thousands separators ("1,000 pF") unless they are a decimal
+    comma ("4,75 V"). The magnitude of "±5" is returned; see is_symmetric().
+    """
+    text = (text or "").replace("−", "-").replace("–", "-")
+    match = NUMBER.search(text)
+    if match is None:
+        return None, ""
+    value = match.group().replace("±", "")
+    mantissa = re.split(r"[eE]", value)[0]
+    if "." not in mantissa:
+        value = DECIMAL_COMMA.sub(r".\1", mantissa) + value[len(mantissa) :]
+    return float(value.replace(",", "")), text[match.end() :].strip()
+
+
+def is_symmetric(text):
+    """True for cells like "±5 V" that give the range -5..+5"""
+    return (text or "").lstrip().startswith("±")
+
+
+def _resolve(document, ref):
+    collection, index = ref["$ref"].lstrip("#/").split("/")
+    return document[collection][int(index)]
+
+
+def _walk(document, node):
+    for ref in node.get("children", []):
+        item = _resolve(document, ref)
+        yield item
+        yield from _walk(document, item)
+
+
+def _page(item):
+    prov = item.get("prov") or []
+    return prov[0].get("page_no") if prov else None
+
+
+def table_grid(table):
+    """Row-major text grid of a docling table item, spanning cells repeated"""
+    data = table.get("data", {})
+    if data.get("grid"):
+        return [[cell.get("text", "") for cell in row] for row in data["grid"]]
+    grid = [[""] * data.get("num_cols", 0) for _ in range(data.get("num_rows", 0))]
+    for cell in data.get("table_cells", []):
+        for row in range(cell["start_row_offset_idx"], cell["end_row_offset_idx"]):
+            for col in range(cell["start_col_offset_idx"], cell["end_col_offset_idx"]):
+                grid[row][col] = cell.get("text", "")
+    return grid
+
+
+def document_items(document):
+    """(page, label, text, grid) in reading order
+
+    Accepts a docling ``export_to_dict()`` document as well as the per-page
+    documents stitched together in incremental mode (src/page_store.py).
+    """
+    if "pages" in document and isinstance(document["pages"], list):
+        for page in document["pages"]:
+            for item in page.get("items", []):
+                text, cells = item.get("text", ""), item.get("cells")
+                yield page["page_no"], item["label"], text, cells
+        return
+
+    if "body" in document:
+        items = _walk(document, document["body"])
+    else:
+        items = iter(document.get("texts", []) + document.get("tables", []))
+    for item in items:
+        label = item.get("label", "")
+        if label == "table":
+            yield _page(item), label, "", table_grid(item)
+        elif item.get("text"):
+            yield _page(item), label, item["text"], None
+
+
+def _header_columns(grid):
+    """(header row index, {role: column}) of a parameter table, or None"""
+    for row_index, row in enumerate(grid[:3]):
+        columns = {}
+        for col, cell in enumerate(row):
+            for role, pattern in COLUMN_PATTERNS.items():
+                if role not in columns and pattern.search(cell.strip()):
+                    columns[role] = col
+                    break
+        if {"min", "typ", "max"} & columns.keys() and len(columns) >= 2:
+            columns.setdefault("parameter", 0)
+            return row_index, columns
+    return None
+
+
+def extract_parameters(grid):
+    """Parameter rows with min/typ/max normalised to base units"""
+    header = _header_columns(grid)
+    if header is None:
+        return []
+    header_row, columns = header
+
+    def cell(row, role):
+        col = columns.get(role)
+        return row[col].strip() if col is not None and col < len(row) else ""
+
+    rows = []
+    parameter = ""
+    for row in grid[header_row + 1 :]:
+        # Continuation rows (other conditions) leave the parameter cell empty
+        parameter = cell(row, "parameter") or parameter
+        if not parameter:
+            continue
+
+        values, unit_text, symmetric = {}, cell(row, "unit"), None
+        for role in ("min", "typ", "max"):
+            value, rest = parse_number(cell(row, role))
+            values[role] = value
+            if value is not None and is_symmetric(cell(row, role)):
+                symmetric, values[role] = value, None
+            # Units written next to the value, e.g. "15 V"
+            if value is not None and rest and not unit_text:
+                unit_text = rest
+        if symmetric is not None:
+            if values["min"] is None:
+                values["min"] = -symmetric
+            if values["max"] is None:
+                values["max"] = symmetric
+        if all(v is None for v in values.values()):
+            continue
+
+        unit, scale = normalize_unit(unit_text)
+        rows.append(
+            {
+                "parameter": parameter,
+                "symbol": cell(row, "symbol") or None,
+                "conditions": cell(row, "conditions") or None,
+                "min": values["min"] * scale if values["min"] is not None else None,
+                "typ": values["typ"] * scale if values["typ"] is not None else None,
+                "max": values["max"] * scale if values["max"] is not None else None,
+                "unit": unit,
+                "raw": " | ".join(row),
+            }
+        )
+    return rows
+
+
+def grid_text(grid):
+    return "\n".join(" | ".join(row) for row in grid)
+
+
+def document_rows(document):
+    """FTS chunks (one per section and per table) and parameter rows"""
+    chunks, parameters = [], []
+    heading, page, lines = "", None, []
+
+    def flush():
+        if lines:
+            chunks.append((heading, "\n".join(lines), page, "text"))
+            lines.clear()
+
+    for item_page, label, text, grid in document_items(document):
+        if grid is not None:
+            flush()
+            chunks.append((heading, grid_text(grid), item_page, "table"))
+            for row in extract_parameters(grid):
+                row["page"] = item_page
+                parameters.append(row)
+        elif label in ("section_header", "title"):
+            flush()
+            heading, page = text, item_page
+        else:
+            if not lines:
+                page = item_page
+            lines.append(text)
+    flush()
+    return chunks, parameters
+
+
+# -------------------------------------------------------------- sources
+
+
+def iter_sources(source):
+    """(source id, name, digest, document json path) for a cache dir or JSON dir
+
+    In a conversion cache every PDF may have several entries (older revisions,
+    other pipeline options); only the most recently used one is indexed.
+    """
+    source = Path(source)
+    meta_paths = list(source.glob(f"*/*/{META_FILE}"))
+    if meta_paths:
+        latest = {}
+        for meta_path in meta_paths:
+            # Entries converted without the JSON export have nothing to index
+            if not (meta_path.parent / DICT_FILE).exists():
+                continue
+            with open(meta_path, "r", encoding="utf-8") as f:
+                pdf = json.load(f).get("pdf")
+            if not pdf:
+                continue
+            mtime = meta_path.stat().st_mtime
+            if pdf not in latest or mtime > latest[pdf][0]:
+                latest[pdf] = (mtime, meta_path.parent)
+        for pdf, (_, entry) in sorted(latest.items()):
+            # Cache keys are content hashes, so the key doubles as the digest
+            yield pdf, Path(pdf).stem, entry.name, entry / DICT_FILE
+        return
+
+    paths = sorted(source.rglob("*.json")) if source.is_dir() else [source]
+    for path in paths:
+        yield str(path.resolve()), path.stem, file_sha256(path), path
+
+
+# ---------------------------------------------------------------- index
+
+
+class DatasheetIndex:
+    """SQLite index of datasheet text and electrical parameters"""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _delete(self, doc_id):
+        row = self.db.execute(
+            "SELECT first_chunk, last_chunk FROM documents WHERE id = ?", (doc_id,)
+        ).fetchone()
+        if row["first_chunk"] is not None:
+            # A document's chunks are inserted back to back: delete by rowid range
+            self.db.execute(
+                "DELETE FROM chunks WHERE rowid BETWEEN ? AND ?",
+                (row["first_chunk"], row["last_chunk"]),
+            )
+        self.db.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+
+    def add_document(self, source, name, digest, document):
+        """(Re)index one document inside the current transaction"""
+        existing = self.db.execute(
+            "SELECT id FROM documents WHERE source = ?", (source,)
+        ).fetchone()
+        if existing is not None:
+            self._delete(existing["id"])
+
+        chunks, parameters = document_rows(document)
+        doc_id = self.db.execute(
+            "INSERT INTO documents (source, name, digest, indexed_at) "
+            "VALUES (?, ?, ?, ?)",
+            (source, name, digest, time.time()),
+        ).lastrowid
+
+        first = last = None
+        for heading, text, page, kind in chunks:
+            rowid = self.db.execute(
+                "INSERT INTO chunks (heading, text, doc_id, page, kind) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (heading, text, doc_id, page, kind),
+            ).lastrowid
+            first = rowid if first is None else first
+            last = rowid
+        self.db.execute(
+            "UPDATE documents SET first_chunk = ?, last_chunk = ? WHERE id = ?",
+            (first, last, doc_id),
+        )
+
+        self.db.executemany(
+            "INSERT INTO parameters (doc_id, part, parameter, symbol, conditions, "
+            "min, typ, max, unit, raw, page) "
+            "VALUES (:doc_id, :part, :parameter, :symbol, :conditions, "
+            ":min, :typ, :max, :unit, :raw, :page)",
+            [{**row, "doc_id": doc_id, "part": name} for row in parameters],
+        )
+        return len(chunks), len(parameters)
+
+    def update(self, source, prune=False):
+        """Index new and changed documents; returns a summary dict"""
+        known = {
+            row["source"]: (row["id"], row["digest"])
+            for row in self.db.execute("SELECT id, source, digest FROM documents")
+        }
+        seen = set()
+        summary = {"indexed": 0, "unchanged": 0, "removed": 0, "parameters": 0}
+
+        start = time.perf_counter()
+        with self.db:
+            for source_id, name, digest, json_path in iter_sources(source):
+                seen.add(source_id)
+                if source_id in known and known[source_id][1] == digest:
+                    summary["unchanged"] += 1
+                    continue
+                with open(json_path, "r", encoding="utf-8") as f:
+                    document = json.load(f)
+                _, n_parameters = self.add_document(source_id, name, digest, document)
+                summary["indexed"] += 1
+                summary["parameters"] += n_parameters
+
+            if prune:
+                for source_id in known.keys() - seen:
+                    self._delete(known[source_id][0])
+                    summary["removed"] += 1
+
+        summary["seconds"] = round(time.perf_counter() - start, 3)
+        logger.info(
+            f"Index update: {summary['indexed']} indexed, "
+            f"{summary['unchanged']} unchanged, {summary['removed']} removed, "
+            f"{summary['parameters']} parameters in {summary['seconds']}s"
+        )
+        return summary
+
+    def optimize(self):
+        """Merge FTS segments after large updates"""
+        self.db.execute("INSERT INTO chunks(chunks) VALUES ('optimize')")
+        self.db.commit()
+
+    # -------------------------------------------------------------- queries
+
+    def search(self, query, limit=20):
+        """Best matching chunks by BM25, with highlighted snippets"""
+        return self.db.execute(
+            "SELECT d.name, c.page, c.kind, c.heading, "
+            "snippet(chunks, 1, '[', ']', '…', 16) AS snippet "
+            "FROM chunks c JOIN documents d ON d.id = c.doc_id "
+            "WHERE chunks MATCH ? ORDER BY bm25(chunks) LIMIT ?",
+            (query, limit),
+        ).fetchall()
+
+    def parameters(
+        self,
+        parameter=None,
+        text=None,
+        part=None,
+        unit=None,
+        min_ge=None,
+        max_le=None,
+        limit=100,
+    ):
+        """Parameter rows filtered by name, value range and full-text match"""
+        clauses, values = [], []
+        if parameter:
+            # "supply voltage" matches "Supply Voltage Range" and "Supply voltage"
+            clauses.append("p.parameter LIKE ?")
+            values.append("%" + "%".join(parameter.split()) + "%")
+        if part:
+            clauses.append("p.part LIKE ?")
+            values.append(f"%{part}%")
+        if unit:
+            base, _ = normalize_unit(unit)
+            clauses.append("p.unit = ?")
+            values.append(base)
+        if min_ge is not None:
+            clauses.append("COALESCE(p.min, p.typ, p.max) >= ?")
+            values.append(min_ge)
+        if max_le is not None:
+            clauses.append("COALESCE(p.max, p.typ, p.min) <= ?")
+            values.append(max_le)
+        if text:
+            clauses.append(
+                "p.doc_id IN (SELECT doc_id FROM chunks WHERE chunks MATCH ?)"
+            )
+            values.append(text)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self.db.execute(
+            "SELECT p.part, p.parameter, p.symbol, p.conditions, p.min, p.typ, "
+            f"p.max, p.unit, p.page FROM parameters p {where} "
+            "ORDER BY p.part, p.parameter LIMIT ?",
+            (*values, limit),
+        ).fetchall()
+
+
+def _format_value(value):
+    return "" if value is None else f"{value:g}"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Full-text and electrical-parameter index over converted datasheets"
+    )
+    parser.add_argument(
+        "--db", default=DEFAULT_INDEX_PATH, help="SQLite index file"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    update = commands.add_parser("update", help="Index new and changed documents")
+    update.add_argument(
+        "source",
+        nargs="?",
+        default=DEFAULT_CACHE_DIR,
+        help="Conversion cache or directory of docling JSON exports",
+    )
+    update.add_argument(
+        "--prune", action="store_true", help="Drop documents missing from the source"
+    )
+
+    search = commands.add_parser("search", help="Full-text search (FTS5 syntax)")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=20)
+
+    params = commands.add_parser("params", help="Query the parameter table")
+    params.add_argument("--parameter", help="Parameter name, e.g. 'supply voltage'")
+    params.add_argument("--text", help="Only datasheets matching this FTS query")
+    params.add_argument("--part", help="Part (datasheet) name substring")
+    params.add_argument("--unit", help="Unit, e.g. V or mA (values are in base units)")
+    params.add_argument("--min-ge", type=float, help="Lowest value at least this")
+    params.add_argument("--max-le", type=float, help="Highest value at most this")
+    params.add_argument("--limit", type=int, default=100)
+
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+    index = DatasheetIndex(args.db)
+    try:
+        if args.command == "update":
+            index.update(args.source, prune=args.prune)
+        elif args.command == "search":
+            for row in index.search(args.query, args.limit):
+                print(f"{row['name']} p.{row['page']} [{row['kind']}] {row['heading']}")
+                print(f"    {row['snippet']}")
+        else:
+            rows = index.parameters(
+                parameter=args.parameter,
+                text=args.text,
+                part=args.part,
+                unit=args.unit,
+                min_ge=args.min_ge,
+                max_le=args.max_le,
+                limit=args.limit,
+            )
+            for row in rows:
+                values = "/".join(
+                    _format_value(row[key]) for key in ("min", "typ", "max")
+                )
+                print(
+                    f"{row['part']:24} {row['parameter']:32} "
+                    f"{values:>20} {row['unit'] or '':4} p.{row['page']}"
+                )
+    except sqlite3.OperationalError as e:
+        print(f"Index query failed: {e}")
+        sys.exit(1)
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,191 @@
+import argparse
+import logging
 import os
+import shutil
+import sys
+from pathlib import Path
 
-from docling.document_converter import DocumentConverter
+# Shared helpers live in the training project
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from batch_convert import (
+    EXPORT_FORMATS,
+    build_converter,
+    build_pipeline_options,
+    load_or_convert,
+    run_batch,
+    write_exports,
+)
+from context_store import build_store
+from conversion_cache import DEFAULT_CACHE_DIR, ConversionCache
+from datasheet_index import DatasheetIndex
+from page_store import DEFAULT_PAGE_STORE_DIR, PageStore
+from streaming_export import DEFAULT_PAGE_WINDOW, stream_or_copy
+from training_project.src.instrumentation import (
+    add_metrics_arguments,
+    finish_metrics,
+    setup_metrics,
+)
 
-converter = DocumentConverter()
 PDF = "./input/CEM33403345-VCO.pdf"
-result = converter.convert(PDF)
-document = result.document
-markdown_output = document.export_to_markdown()
-json_output = document.export_to_dict()
-print(markdown_output)
-os.makedirs("./tmp/markdown/", exist_ok=True)
-
-with open("./tmp/markdown/file.md", "w", encoding="utf-8") as f:
-    f.write(markdown_output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert PDF datasheets with docling")
+    parser.add_argument("pdf", nargs="?", default=PDF, help="PDF to convert")
+    parser.add_argument(
+        "--batch",
+        metavar="SOURCE",
+        help="Directory of PDFs or manifest file with one PDF path per line",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of conversion processes in batch mode",
+    )
+    parser.add_argument(
+        "--output", "-o", default="./tmp/markdown/", help="Output directory"
+    )
+    parser.add_argument(
+        "--cache-dir", default=DEFAULT_CACHE_DIR, help="Conversion cache directory"
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=float,
+        default=10.0,
+        help="Maximum conversion cache size in GB",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Always run the full conversion"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only convert pages that changed since the last run",
+    )
+    parser.add_argument(
+        "--page-store-dir",
+        default=DEFAULT_PAGE_STORE_DIR,
+        help="Per-page result store used in incremental mode",
+    )
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=EXPORT_FORMATS,
+        default=["markdown"],
+        help="Export formats to write; others are never computed",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Convert in page windows and write pages as they are done "
+        "(bounded memory for very large documents)",
+    )
+    parser.add_argument(
+        "--page-window",
+        type=int,
+        default=DEFAULT_PAGE_WINDOW,
+        help="Pages converted per docling call in streaming mode",
+    )
+    parser.add_argument(
+        "--print",
+        action="store_true",
+        help="Also print the markdown of a single PDF to stdout",
+    )
+    parser.add_argument(
+        "--context-store",
+        metavar="DIR",
+        help="Rebuild the context store for src/context_server.py from the output",
+    )
+    parser.add_argument(
+        "--index",
+        metavar="DB",
+        help="Update this full-text/parameter index from the conversion cache",
+    )
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    if args.index and args.no_cache:
+        parser.error("--index reads the conversion cache and cannot use --no-cache")
+    if args.stream and args.incremental:
+        parser.error("--stream and --incremental cannot be combined")
+    if args.page_window < 1:
+        parser.error("--page-window must be at least 1")
+    # The index and the context store are built from the JSON / markdown exports
+    if args.index and "json" not in args.formats:
+        args.formats.append("json")
+    if args.context_store and "markdown" not in args.formats:
+        args.formats.append("markdown")
+    setup_metrics(args)
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+    try:
+        convert(args)
+        if args.context_store:
+            build_store(args.output, args.context_store)
+        if args.index:
+            index = DatasheetIndex(args.index)
+            try:
+                index.update(args.cache_dir)
+            finally:
+                index.close()
+    finally:
+        finish_metrics(args)
+
+
+def convert(args):
+    """Convert a single PDF or a whole batch"""
+    cache = None
+    if not args.no_cache:
+        max_bytes = int(args.cache_size * 1024**3)
+        cache = ConversionCache(args.cache_dir, max_bytes=max_bytes)
+
+    if args.batch:
+        run_batch(
+            args.batch,
+            args.output,
+            workers=args.workers,
+            cache=cache,
+            page_store_dir=args.page_store_dir if args.incremental else None,
+            formats=args.formats,
+            stream=args.stream,
+            page_window=args.page_window,
+        )
+        return
+
+    pipeline_options = build_pipeline_options()
+    converter = build_converter(pipeline_options)
+    output_base = os.path.join(args.output, "file")
+    if args.stream:
+        stream_or_copy(
+            args.pdf,
+            converter,
+            pipeline_options,
+            output_base,
+            args.formats,
+            args.page_window,
+            cache,
+        )
+    else:
+        page_store = None
+        if args.incremental:
+            page_store = PageStore(args.page_store_dir, pipeline_options)
+        markdown_output, json_output, _, _ = load_or_convert(
+            args.pdf, converter, pipeline_options, cache, page_store, args.formats
+        )
+        write_exports(output_base, markdown_output, json_output)
+    if cache is not None:
+        cache.evict()
+
+    if args.print and "markdown" in args.formats:
+        # Copied in blocks, so printing does not hold the document in memory
+        with open(output_base + ".md", "r", encoding="utf-8") as f:
+            shutil.copyfileobj(f, sys.stdout)
+        print()
+
+
+if __name__ == "__main__":
+    main()
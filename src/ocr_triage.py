@@ -0,0 +1,226 @@
+# ===========================================
+# File: src/ocr_triage.py
+# ===========================================
+"""Selective OCR: only pages without a text layer are sent through OCRmyPDF"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+# Shared helpers live in the training project
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from training_project.src.instrumentation import (
+    add_metrics_arguments,
+    finish_metrics,
+    metrics,
+    setup_metrics,
+)
+
+logger = logging.getLogger(__name__)
+
+TEXT = "text"
+SCANNED = "scanned"
+VECTOR = "vector"
+
+# A page with fewer extractable characters than this has no usable text layer
+MIN_TEXT_CHARS = 32
+# Fraction of the page area raster images must cover to count as a scan
+MIN_IMAGE_COVERAGE = 0.5
+
+
+def classify_page(
+    page, min_chars=MIN_TEXT_CHARS, min_coverage=MIN_IMAGE_COVERAGE
+):
+    """Classify a page as text-bearing, scanned or vector-only"""
+    if len(page.get_text("text").strip()) >= min_chars:
+        return TEXT
+
+    page_area = abs(page.rect)
+    image_area = sum(
+        abs(fitz.Rect(info["bbox"]) & page.rect) for info in page.get_image_info()
+    )
+    if page_area and image_area / page_area >= min_coverage:
+        return SCANNED
+
+    # Vector drawings without text gain nothing from OCR
+    return VECTOR
+
+
+def classify_pages(
+    pdf_path, min_chars=MIN_TEXT_CHARS, min_coverage=MIN_IMAGE_COVERAGE
+):
+    """Classify every page of a PDF"""
+    with fitz.open(pdf_path) as doc:
+        return [classify_page(page, min_chars, min_coverage) for page in doc]
+
+
+def _ocr_page(input_path, output_path, language, deskew, clean, rotate_pages):
+    """Worker: OCR a single-page PDF with OCRmyPDF"""
+    import ocrmypdf
+
+    # Scanned pages may still carry a few characters (page numbers, stamps),
+    # which OCRmyPDF otherwise rejects as prior OCR
+    ocrmypdf.ocr(
+        input_path,
+        output_path,
+        force_ocr=True,
+        language=language,
+        deskew=deskew,
+        clean=clean,
+        rotate_pages=rotate_pages,
+        jobs=1,
+        progress_bar=False,
+    )
+    return output_path
+
+
+def selective_ocr(
+    input_pdf,
+    output_pdf,
+    workers=None,
+    language="eng",
+    deskew=True,
+    clean=True,
+    rotate_pages=True,
+    min_chars=MIN_TEXT_CHARS,
+    min_coverage=MIN_IMAGE_COVERAGE,
+):
+    """OCR only the scanned pages of a PDF and splice them back into the document
+
+    Returns the list of OCRed page indices.
+    """
+    start = time.perf_counter()
+    with metrics.span("ocr_triage"):
+        labels = classify_pages(input_pdf, min_chars, min_coverage)
+    scanned = [i for i, label in enumerate(labels) if label == SCANNED]
+    logger.info(
+        f"{input_pdf}: {len(labels)} pages, {labels.count(TEXT)} text, "
+        f"{len(scanned)} scanned, {labels.count(VECTOR)} vector"
+    )
+
+    doc = fitz.open(input_pdf)
+    try:
+        if scanned:
+            with tempfile.TemporaryDirectory(prefix="ocr_triage_") as tmp_dir:
+                tmp_dir = Path(tmp_dir)
+                jobs = []
+                for index in scanned:
+                    page_pdf = tmp_dir / f"page_{index}.pdf"
+                    with fitz.open() as single:
+                        single.insert_pdf(doc, from_page=index, to_page=index)
+                        single.save(page_pdf)
+                    jobs.append((index, page_pdf, tmp_dir / f"page_{index}_ocr.pdf"))
+
+                workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+                with metrics.span("ocr"), ProcessPoolExecutor(
+                    max_workers=workers
+                ) as pool:
+                    futures = {
+                        index: pool.submit(
+                            _ocr_page,
+                            str(page_in),
+                            str(page_out),
+                            language,
+                            deskew,
+                            clean,
+                            rotate_pages,
+                        )
+                        for index, page_in, page_out in jobs
+                    }
+                    ocr_outputs = {}
+                    for index, future in futures.items():
+                        try:
+                            ocr_outputs[index] = future.result()
+                        except Exception as e:
+                            # Keep the original page instead of failing the run
+                            logger.warning(
+                                f"{input_pdf}: OCR of page {index} failed: {e}"
+                            )
+
+                # Replace pages in place so outline, metadata and untouched
+                # pages of the original document are kept as they are
+                with metrics.span("ocr_splice"):
+                    for index, page_out in ocr_outputs.items():
+                        with fitz.open(page_out) as ocr_page:
+                            doc.insert_pdf(ocr_page, start_at=index)
+                        doc.delete_page(index + 1)
+                metrics.count("pages_ocred", len(ocr_outputs))
+                scanned = sorted(ocr_outputs)
+
+        Path(output_pdf).parent.mkdir(parents=True, exist_ok=True)
+        doc.save(output_pdf, garbage=3, deflate=True)
+    finally:
+        doc.close()
+
+    logger.info(
+        f"Wrote {output_pdf}: OCRed {len(scanned)} of {len(labels)} pages "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return scanned
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="OCR only the scanned pages of a PDF with OCRmyPDF"
+    )
+    parser.add_argument("input", help="Input PDF")
+    parser.add_argument("output", nargs="?", help="Output PDF")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count(), help="Parallel OCR processes"
+    )
+    parser.add_argument("--language", "-l", default="eng", help="Tesseract language")
+    parser.add_argument(
+        "--min-chars",
+        type=int,
+        default=MIN_TEXT_CHARS,
+        help="Characters a page needs to count as text-bearing",
+    )
+    parser.add_argument(
+        "--no-clean",
+        action="store_true",
+        help="Skip unpaper cleaning (needed when unpaper is not installed)",
+    )
+    parser.add_argument(
+        "--classify-only",
+        action="store_true",
+        help="Only print the page classification",
+    )
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    if not args.output and not args.classify_only:
+        parser.error("an output PDF is required unless --classify-only is given")
+    setup_metrics(args)
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+    try:
+        if args.classify_only:
+            with metrics.span("ocr_triage"):
+                labels = classify_pages(args.input, args.min_chars)
+            for index, label in enumerate(labels):
+                print(f"page {index + 1}: {label}")
+            return
+
+        selective_ocr(
+            args.input,
+            args.output,
+            workers=args.workers,
+            language=args.language,
+            clean=not args.no_clean,
+            min_chars=args.min_chars,
+        )
+    finally:
+        finish_metrics(args)
+
+
+if __name__ == "__main__":
+    main()
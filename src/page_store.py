@@ -0,0 +1,162 @@
+# ===========================================
+# File: src/page_store.py
+# ===========================================
+import json
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from conversion_cache import pipeline_digest
+
+# Shared PDF helpers live in the training project
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from training_project.src.instrumentation import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_STORE_DIR = "./tmp/cache/pages"
+
+
+class PageStore:
+    """Per-page docling results keyed by page fingerprint
+
+    Entries are namespaced by the pipeline digest, so changing docling or its
+    options never mixes pages converted under different settings.
+    """
+
+    def __init__(self, root, pipeline_options):
+        self.root = Path(root) / pipeline_digest(pipeline_options)[:16]
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, fingerprint):
+        return self.root / fingerprint[:2] / f"{fingerprint}.json"
+
+    def get(self, fingerprint):
+        """Return the stored page entry or None"""
+        path = self._path(fingerprint)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            path.unlink(missing_ok=True)
+            return None
+
+    def put(self, fingerprint, entry):
+        """Store a page entry atomically"""
+        path = self._path(fingerprint)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(suffix=".json", dir=path.parent)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+
+def _page_ranges(page_numbers):
+    """Group sorted page numbers into inclusive (start, end) ranges"""
+    ranges = []
+    for page_no in page_numbers:
+        if ranges and ranges[-1][1] == page_no - 1:
+            ranges[-1][1] = page_no
+        else:
+            ranges.append([page_no, page_no])
+    return [tuple(r) for r in ranges]
+
+
+def page_items(document, page_no):
+    """Layout items (label, text, bbox, table cells) found on one page"""
+    from docling_core.types.doc import TableItem
+
+    items = []
+    for item, _ in document.iterate_items(page_no=page_no):
+        prov = next((p for p in item.prov if p.page_no == page_no), None)
+        if prov is None:
+            continue
+        entry = {
+            "label": str(item.label.value),
+            "text": getattr(item, "text", ""),
+            "bbox": [prov.bbox.l, prov.bbox.t, prov.bbox.r, prov.bbox.b],
+            "coord_origin": str(prov.bbox.coord_origin.value),
+        }
+        if isinstance(item, TableItem):
+            entry["cells"] = [[cell.text for cell in row] for row in item.data.grid]
+        items.append(entry)
+    return items
+
+
+# Page entry field holding each export format
+PAGE_FIELDS = {"markdown": "markdown", "json": "items"}
+
+
+def convert_incremental(pdf_path, converter, store, formats=tuple(PAGE_FIELDS)):
+    """Convert only pages whose fingerprint is not stored and stitch the document
+
+    Only the requested export formats are computed; the others are None.
+    Returns (markdown, document_dict, pages, converted_pages).
+    """
+    from training_project.src.pdf_source import page_fingerprints
+
+    with metrics.span("fingerprint"):
+        fingerprints = page_fingerprints(pdf_path)
+    fields = [PAGE_FIELDS[name] for name in formats]
+    entries = {}
+    missing = []
+    for page_no, fingerprint in enumerate(fingerprints, start=1):
+        entry = store.get(fingerprint)
+        # Pages stored by a run with other formats lack some exports
+        if entry is None or any(field not in entry for field in fields):
+            missing.append(page_no)
+        else:
+            entries[page_no] = entry
+
+    # Contiguous runs of changed pages are converted in one docling call each
+    for start, end in _page_ranges(missing):
+        with metrics.span("conversion", mode="pages"):
+            result = converter.convert(str(pdf_path), page_range=(start, end))
+        document = result.document
+        for page_no in range(start, end + 1):
+            page = document.pages.get(page_no)
+            # Exports of other formats stored earlier are kept
+            entry = {
+                **(store.get(fingerprints[page_no - 1]) or {}),
+                "page_no": page_no,
+                "fingerprint": fingerprints[page_no - 1],
+                "size": [page.size.width, page.size.height] if page else None,
+            }
+            with metrics.span("export", format="page"):
+                if "markdown" in formats:
+                    entry["markdown"] = document.export_to_markdown(page_no=page_no)
+                if "json" in formats:
+                    entry["items"] = page_items(document, page_no)
+            store.put(fingerprints[page_no - 1], entry)
+            entries[page_no] = entry
+
+    metrics.count("pages_converted", len(missing))
+    metrics.count("pages_reused", len(fingerprints) - len(missing))
+
+    logger.info(
+        f"{pdf_path}: converted {len(missing)} of {len(fingerprints)} pages, "
+        f"{len(fingerprints) - len(missing)} reused"
+    )
+
+    ordered = [entries[page_no] for page_no in sorted(entries)]
+    markdown = document_dict = None
+    if "markdown" in formats:
+        markdown = "\n\n".join(entry["markdown"] for entry in ordered)
+    if "json" in formats:
+        document_dict = {
+            "name": Path(pdf_path).stem,
+            "pages": [
+                {
+                    "page_no": n,
+                    "fingerprint": entry["fingerprint"],
+                    "size": entry["size"],
+                    "items": entry["items"],
+                }
+                for n, entry in sorted(entries.items())
+            ],
+        }
+    return markdown, document_dict, len(fingerprints), len(missing)
@@ -0,0 +1,152 @@
+# ===========================================
+# File: src/streaming_export.py
+# ===========================================
+"""Convert large PDFs window by window and stream the exports to disk
+
+docling holds the converted document of one page window at a time; every page
+is exported and appended to the output files before the next window is
+converted. Peak memory depends on the window size, not on the document size.
+
+The JSON export uses the per-page layout of the incremental mode:
+``{"name": ..., "pages": [{"page_no", "size", "markdown", "items"}, ...]}``.
+"""
+
+import json
+import logging
+import os
+import shutil
+import sys
+from pathlib import Path
+
+from page_store import page_items
+
+# Shared PDF helpers live in the training project
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from training_project.src.instrumentation import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_WINDOW = 16
+
+SUFFIXES = {"markdown": ".md", "json": ".json"}
+
+
+def output_paths(output_base, formats):
+    """Output file of every requested format {format: path}"""
+    # Appended rather than with_suffix(): PDF stems may contain dots
+    return {name: Path(f"{output_base}{SUFFIXES[name]}") for name in formats}
+
+
+class _PageWriter:
+    """Appends page exports to temporary files, renamed into place on close"""
+
+    def __init__(self, paths, name):
+        self.paths = paths
+        self.files = {}
+        for fmt, path in paths.items():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.files[fmt] = open(f"{path}.tmp", "w", encoding="utf-8")
+        if "json" in self.files:
+            self.files["json"].write(f'{{"name": {json.dumps(name)}, "pages": [')
+        self.pages = 0
+
+    def write(self, page_no, size, markdown, items):
+        if "markdown" in self.files:
+            if self.pages:
+                self.files["markdown"].write("\n\n")
+            self.files["markdown"].write(markdown)
+        if "json" in self.files:
+            entry = {"page_no": page_no, "size": size, "items": items}
+            if self.pages:
+                self.files["json"].write(", ")
+            json.dump(entry, self.files["json"])
+        self.pages += 1
+
+    def close(self, commit=True):
+        if "json" in self.files:
+            self.files["json"].write("]}")
+        for fmt, f in self.files.items():
+            f.close()
+            tmp_path = f"{self.paths[fmt]}.tmp"
+            if commit:
+                os.replace(tmp_path, self.paths[fmt])
+            else:
+                Path(tmp_path).unlink(missing_ok=True)
+
+
+def stream_convert(
+    pdf_path,
+    converter,
+    output_base,
+    formats=("markdown",),
+    page_window=DEFAULT_PAGE_WINDOW,
+):
+    """Convert a PDF in page windows, writing each page as soon as it is done
+
+    Only the requested formats are exported. Returns the number of pages.
+    """
+    from training_project.src.pdf_source import page_count
+
+    pdf_path = Path(pdf_path)
+    pages = page_count(pdf_path)
+    writer = _PageWriter(output_paths(output_base, formats), pdf_path.stem)
+    try:
+        for start in range(1, pages + 1, page_window):
+            end = min(start + page_window - 1, pages)
+            with metrics.span("conversion", mode="stream"):
+                result = converter.convert(str(pdf_path), page_range=(start, end))
+            document = result.document
+            for page_no in range(start, end + 1):
+                page = document.pages.get(page_no)
+                with metrics.span("export", format="page"):
+                    markdown = items = None
+                    if "markdown" in formats:
+                        markdown = document.export_to_markdown(page_no=page_no)
+                    if "json" in formats:
+                        items = page_items(document, page_no)
+                    size = [page.size.width, page.size.height] if page else None
+                writer.write(page_no, size, markdown, items)
+            # Drop the window's document before converting the next one
+            del result, document
+            logger.debug(f"{pdf_path}: pages {start}-{end} of {pages} written")
+    except BaseException:
+        writer.close(commit=False)
+        raise
+    writer.close()
+    metrics.count("pages_converted", pages)
+    return pages
+
+
+def stream_or_copy(
+    pdf_path,
+    converter,
+    pipeline_options,
+    output_base,
+    formats=("markdown",),
+    page_window=DEFAULT_PAGE_WINDOW,
+    cache=None,
+):
+    """Streaming counterpart of load_or_convert; returns (pages, cached)
+
+    Cached exports are copied file to file and new exports are copied into
+    the cache, so neither path loads a whole document into memory.
+    """
+    paths = output_paths(output_base, formats)
+    key = None
+    if cache is not None:
+        with metrics.span("cache_lookup"):
+            key = cache.make_key(pdf_path, pipeline_options, variant="stream")
+            hit = cache.get_files(key, formats)
+        if hit is not None:
+            metrics.count("cache_hits")
+            cached_paths, meta = hit
+            for fmt, path in paths.items():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(cached_paths[fmt], path)
+            return meta.get("pages", 0), True
+        metrics.count("cache_misses")
+
+    pages = stream_convert(pdf_path, converter, output_base, formats, page_window)
+    if cache is not None:
+        cache.put_files(key, paths, {"pdf": str(pdf_path), "pages": pages})
+    return pages, False
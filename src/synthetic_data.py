@@ -0,0 +1,457 @@
+# ===========================================
+# File: src/synthetic_data.py
+# ===========================================
+"""YOLO training data generated from docling layout items
+
+docling's export_to_dict() locates pictures and tables on every page. Those
+boxes become YOLO labels for the page rendered with PyMuPDF, so every
+datasheet of the corpus adds labeled pages to a dataset of its own
+(training_project/synthetic_data). Only the docling labels are annotated,
+so the target dataset must not define any other class: other objects on
+the generated pages would become unlabeled negatives.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import yaml
+from batch_convert import (
+    build_converter,
+    build_pipeline_options,
+    collect_documents,
+    load_or_convert,
+)
+from conversion_cache import DEFAULT_CACHE_DIR, ConversionCache, file_sha256
+
+# Shared helpers live in the training project
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from training_project.src.instrumentation import (
+    add_metrics_arguments,
+    finish_metrics,
+    metrics,
+    setup_metrics,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_DIR = (
+    Path(__file__).resolve().parent.parent / "training_project" / "synthetic_data"
+)
+# docling layout labels written as YOLO classes of the same name in data.yaml
+DEFAULT_LABELS = ("picture", "table")
+# Older docling versions call pictures figures
+LABEL_ALIASES = {"figure": "picture"}
+DEFAULT_DPI = 150
+DEFAULT_VAL_FRACTION = 0.1
+IMAGE_FORMATS = ("png", "jpg")
+# One line per finished document; documents listed here are skipped on resume
+MANIFEST_FILE = "synthetic_manifest.jsonl"
+
+# Per worker process state, built once by the pool initializer
+_converter = None
+_pipeline_options = None
+_cache = None
+
+
+def dataset_class_ids(data_yaml, labels=DEFAULT_LABELS):
+    """{label: class id} of docling labels, looked up by name in a YOLO data.yaml
+
+    Raises ValueError when the dataset has no class of a label's name, or
+    classes besides the labels, which generated pages would leave unlabeled.
+    """
+    with open(data_yaml, "r", encoding="utf-8") as f:
+        names = (yaml.safe_load(f) or {}).get("names")
+    if isinstance(names, list):
+        names = dict(enumerate(names))
+    if not isinstance(names, dict):
+        raise ValueError(f"No class names defined in {data_yaml}")
+
+    by_name = {str(name).lower(): int(class_id) for class_id, name in names.items()}
+    missing = [label for label in labels if label.lower() not in by_name]
+    if missing:
+        raise ValueError(
+            f"Classes {', '.join(missing)} not found in {data_yaml} "
+            f"(names: {', '.join(map(str, names.values()))})"
+        )
+    extra = sorted(set(by_name) - {label.lower() for label in labels})
+    if extra:
+        raise ValueError(
+            f"{data_yaml} also defines {', '.join(extra)}, which generated pages "
+            "would leave unlabeled; generate into a separate dataset (--output)"
+        )
+    return {label: by_name[label.lower()] for label in labels}
+
+
+def write_dataset_yaml(output_dir, labels=DEFAULT_LABELS):
+    """data.yaml of a new synthetic dataset with the labels as its classes"""
+    data = {
+        "path": str(Path(output_dir).resolve()),
+        "train": "images/train",
+        "val": "images/val",
+        "names": dict(enumerate(labels)),
+    }
+    data_yaml = Path(output_dir) / "data.yaml"
+    with open(data_yaml, "w", encoding="utf-8") as f:
+        yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+    return data_yaml
+
+
+def layout_boxes(document, class_ids):
+    """{page_no: [(class_id, cx, cy, w, h), ...]} of a docling document dict
+
+    class_ids maps the docling labels to keep to their YOLO class ids. Boxes
+    are normalized by docling's page size, so they hold for any render
+    resolution. docling bounding boxes are in PDF points, usually with the
+    origin at the bottom left.
+    """
+    sizes = {
+        int(page_no): page["size"] for page_no, page in document["pages"].items()
+    }
+
+    boxes = {}
+    for collection in ("texts", "pictures", "tables"):
+        for item in document.get(collection, []):
+            label = LABEL_ALIASES.get(item.get("label"), item.get("label"))
+            if label not in class_ids:
+                continue
+            for prov in item.get("prov", []):
+                page_no = prov["page_no"]
+                width, height = sizes[page_no]["width"], sizes[page_no]["height"]
+                bbox = prov["bbox"]
+                top, bottom = bbox["t"], bbox["b"]
+                if bbox.get("coord_origin", "BOTTOMLEFT") == "BOTTOMLEFT":
+                    top, bottom = height - top, height - bottom
+                x1, x2 = sorted((bbox["l"], bbox["r"]))
+                y1, y2 = sorted((top, bottom))
+                x1, x2 = max(x1, 0.0), min(x2, width)
+                y1, y2 = max(y1, 0.0), min(y2, height)
+                if x2 <= x1 or y2 <= y1:
+                    continue
+                boxes.setdefault(page_no, []).append(
+                    (
+                        class_ids[label],
+                        (x1 + x2) / 2 / width,
+                        (y1 + y2) / 2 / height,
+                        (x2 - x1) / width,
+                        (y2 - y1) / height,
+                    )
+                )
+    return boxes
+
+
+def page_split(name, val_fraction=DEFAULT_VAL_FRACTION):
+    """Stable train/val assignment of a page from its file name"""
+    bucket = int(hashlib.sha256(name.encode("utf-8")).hexdigest()[:8], 16)
+    return "val" if bucket / 0xFFFFFFFF < val_fraction else "train"
+
+
+def _write_atomic(path, write):
+    """Write through a temp file next to path and rename it in place"""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _init_worker(num_threads, cache_dir=None, metrics_config=None):
+    """Pool initializer: build this worker's converter and cache once"""
+    global _converter, _pipeline_options, _cache
+    if metrics_config is not None:
+        metrics.configure(**metrics_config)
+    _pipeline_options = build_pipeline_options(num_threads)
+    _converter = build_converter(_pipeline_options)
+    _cache = ConversionCache(cache_dir) if cache_dir else None
+
+
+def generate_document(
+    pdf_path,
+    output_dir,
+    class_ids,
+    dpi=DEFAULT_DPI,
+    val_fraction=DEFAULT_VAL_FRACTION,
+    image_format="png",
+):
+    """Render the pages of one PDF that carry layout items, with their labels
+
+    Pages are named after the PDF's content hash, so a renamed or copied PDF
+    maps onto the same files. Pages whose image exists already are skipped;
+    the label is written before the image, which marks the page as done.
+    """
+    import fitz  # PyMuPDF
+
+    global _converter, _pipeline_options
+    if _converter is None:
+        _pipeline_options = build_pipeline_options()
+        _converter = build_converter(_pipeline_options)
+
+    start = time.perf_counter()
+    output_dir = Path(output_dir)
+    digest = file_sha256(pdf_path)
+    written = skipped = boxes_written = 0
+    cached = False
+    try:
+        _, document_dict, _, cached = load_or_convert(
+            pdf_path, _converter, _pipeline_options, _cache, formats=("json",)
+        )
+        boxes = layout_boxes(document_dict, class_ids)
+
+        with fitz.open(pdf_path) as doc:
+            for page_no in sorted(boxes):
+                name = f"docling_{digest[:16]}_p{page_no:04d}"
+                split = page_split(name, val_fraction)
+                image_path = output_dir / "images" / split / f"{name}.{image_format}"
+                label_path = output_dir / "labels" / split / f"{name}.txt"
+                if image_path.exists():
+                    skipped += 1
+                    continue
+
+                lines = "".join(
+                    f"{cls} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}\n"
+                    for cls, cx, cy, w, h in boxes[page_no]
+                )
+                label_path.parent.mkdir(parents=True, exist_ok=True)
+                image_path.parent.mkdir(parents=True, exist_ok=True)
+                _write_atomic(
+                    label_path, lambda p: p.write_text(lines, encoding="utf-8")
+                )
+                with metrics.span("render"):
+                    # docling numbers pages from 1
+                    pix = doc[page_no - 1].get_pixmap(
+                        dpi=dpi, colorspace=fitz.csRGB, alpha=False
+                    )
+                    _write_atomic(
+                        image_path, lambda p: pix.save(str(p), output=image_format)
+                    )
+                written += 1
+                boxes_written += len(boxes[page_no])
+        metrics.count("synthetic_pages", written)
+        error = None
+    except Exception as e:
+        error = str(e)
+
+    return {
+        "pdf": str(pdf_path),
+        "digest": digest,
+        "pages": written,
+        "skipped": skipped,
+        "boxes": boxes_written,
+        "cached": cached,
+        "seconds": time.perf_counter() - start,
+        "error": error,
+        # Handed back to the parent, which aggregates metrics of all workers
+        "metrics": metrics.drain() if metrics.enabled else None,
+    }
+
+
+def _document_state(pdf_path):
+    """Identity of a PDF file that is cheap to check on resume"""
+    stat = Path(pdf_path).stat()
+    return {"pdf": str(pdf_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def load_manifest(output_dir):
+    """Finished documents recorded by earlier runs"""
+    manifest_path = Path(output_dir) / MANIFEST_FILE
+    done = []
+    if manifest_path.exists():
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    done.append(json.loads(line))
+                except ValueError:
+                    # Line cut short by an interrupted run
+                    continue
+    return done
+
+
+def generate(
+    source,
+    output_dir=DEFAULT_OUTPUT_DIR,
+    workers=None,
+    cache=None,
+    labels=DEFAULT_LABELS,
+    dpi=DEFAULT_DPI,
+    val_fraction=DEFAULT_VAL_FRACTION,
+    image_format="png",
+    data_yaml=None,
+):
+    """Generate training pages for all documents of a source across a process pool
+
+    Class ids come from the names in data_yaml (default: output_dir/data.yaml,
+    written with the labels as classes if missing). Documents finished by an
+    earlier run (same path, size and mtime) are skipped; interrupted documents
+    resume at the first page without an image.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if data_yaml is None:
+        data_yaml = output_dir / "data.yaml"
+        if not data_yaml.exists():
+            write_dataset_yaml(output_dir, labels)
+    class_ids = dataset_class_ids(data_yaml, labels)
+    done = {
+        (entry["pdf"], entry["size"], entry["mtime_ns"])
+        for entry in load_manifest(output_dir)
+    }
+    documents = []
+    finished = 0
+    for pdf in collect_documents(source):
+        state = _document_state(pdf)
+        if (state["pdf"], state["size"], state["mtime_ns"]) in done:
+            finished += 1
+        else:
+            documents.append(pdf)
+
+    logger.info(
+        f"Generating training pages for {len(documents)} documents "
+        f"({finished} finished earlier); classes: "
+        + ", ".join(f"{label}={class_id}" for label, class_id in class_ids.items())
+    )
+    if not documents:
+        return []
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(documents)))
+    # Split the cores between workers so the converters do not oversubscribe
+    num_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    results = []
+    start = time.perf_counter()
+    # Spawn instead of fork: torch-backed converters are not fork safe
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(
+            num_threads,
+            str(cache.root) if cache else None,
+            metrics.worker_config() if metrics.enabled else None,
+        ),
+    ) as pool, open(output_dir / MANIFEST_FILE, "a", encoding="utf-8") as manifest:
+        futures = {
+            pool.submit(
+                generate_document,
+                pdf,
+                output_dir,
+                class_ids,
+                dpi,
+                val_fraction,
+                image_format,
+            ): pdf
+            for pdf in documents
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            metrics.merge(result.pop("metrics"))
+            results.append(result)
+            if result["error"]:
+                logger.error(f"{result['pdf']}: failed - {result['error']}")
+                continue
+            entry = {**_document_state(futures[future]), "digest": result["digest"]}
+            manifest.write(json.dumps(entry) + "\n")
+            manifest.flush()
+            resumed = result["skipped"]
+            logger.info(
+                f"{result['pdf']}: {result['pages']} pages, {result['boxes']} boxes "
+                f"in {result['seconds']:.2f}s"
+                + (f" ({resumed} pages from an earlier run)" if resumed else "")
+            )
+
+    elapsed = time.perf_counter() - start
+    pages = sum(r["pages"] for r in results)
+    failed = sum(1 for r in results if r["error"])
+    logger.info(
+        f"Wrote {pages} pages from {len(results) - failed} documents "
+        f"({failed} failed) in {elapsed:.1f}s"
+    )
+    if cache is not None:
+        cache.evict()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate YOLO training pages from docling layout items"
+    )
+    parser.add_argument(
+        "source",
+        nargs="?",
+        default="./input",
+        help="Directory of PDFs or manifest file with one PDF path per line",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        default=str(DEFAULT_OUTPUT_DIR),
+        help="Dataset directory receiving images/<split> and labels/<split>",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of conversion processes",
+    )
+    parser.add_argument(
+        "--labels",
+        nargs="+",
+        default=list(DEFAULT_LABELS),
+        help="docling layout labels to keep; the dataset YAML must define exactly "
+        "these classes",
+    )
+    parser.add_argument(
+        "--data",
+        help="Dataset YAML whose class names give the class ids "
+        "(default: <output>/data.yaml, created if missing)",
+    )
+    parser.add_argument(
+        "--dpi", type=int, default=DEFAULT_DPI, help="Page render resolution"
+    )
+    parser.add_argument(
+        "--val-fraction",
+        type=float,
+        default=DEFAULT_VAL_FRACTION,
+        help="Fraction of pages assigned to the val split",
+    )
+    parser.add_argument(
+        "--image-format", choices=IMAGE_FORMATS, default="png", help="Page encoding"
+    )
+    parser.add_argument(
+        "--cache-dir", default=DEFAULT_CACHE_DIR, help="Conversion cache directory"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Always run the full conversion"
+    )
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    setup_metrics(args)
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+    try:
+        cache = None if args.no_cache else ConversionCache(args.cache_dir)
+        generate(
+            args.source,
+            args.output,
+            workers=args.workers,
+            cache=cache,
+            labels=args.labels,
+            dpi=args.dpi,
+            val_fraction=args.val_fraction,
+            image_format=args.image_format,
+            data_yaml=args.data,
+        )
+    finally:
+        finish_metrics(args)
+
+
+if __name__ == "__main__":
+    main()
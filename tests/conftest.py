@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The docling scripts in src/ import each other by module name
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
@@ -0,0 +1,156 @@
+import io
+import json
+
+import pytest
+from context_server import INVALID_PARAMS, INVALID_REQUEST, ContextServer
+from context_store import ContextStore, build_store, chunk_markdown, tokenize
+
+VCO_MARKDOWN = """# CEM3340 VCO
+
+Voltage controlled oscillator with exponential converter.
+
+## Electrical Characteristics
+
+| Parameter | Min | Max | Unit |
+| Supply voltage | 4.5 | 15 | V |
+
+<!-- image -->
+"""
+
+FILTER_MARKDOWN = """# CEM3320 Filter
+
+Four pole voltage controlled filter.
+"""
+
+
+@pytest.fixture
+def store(tmp_path):
+    output = tmp_path / "markdown"
+    (output / "filters").mkdir(parents=True)
+    (output / "CEM3340.md").write_text(VCO_MARKDOWN, encoding="utf-8")
+    (output / "filters" / "CEM3320.md").write_text(
+        FILTER_MARKDOWN, encoding="utf-8"
+    )
+    detections = tmp_path / "detections.jsonl"
+    record = {
+        "source": "input/CEM3340.pdf",
+        "page": 0,
+        "detections": [{"class_id": 0, "class_name": "opamp"}] * 2,
+    }
+    detections.write_text(json.dumps(record) + "\n", encoding="utf-8")
+
+    build_store(output, tmp_path / "store", detections=[detections])
+    return ContextStore(tmp_path / "store")
+
+
+def call(server, *messages):
+    stdin = io.StringIO("".join(messages))
+    stdout = io.StringIO()
+    server.serve(stdin, stdout)
+    return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+
+def tool_call(request_id, name, arguments):
+    message = {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "tools/call",
+        "params": {"name": name, "arguments": arguments},
+    }
+    return json.dumps(message) + "\n"
+
+
+def test_tokenize_keeps_part_numbers_and_values():
+    assert tokenize("CEM3340, 4.5-15V supply") == ["cem3340", "4.5-15v", "supply"]
+
+
+def test_chunk_markdown_splits_sections_and_tables():
+    chunks = chunk_markdown(VCO_MARKDOWN)
+    assert [kind for kind, _ in chunks] == ["text", "table"]
+    assert chunks[1][1].startswith("## Electrical Characteristics\n| Parameter")
+    assert all("<!-- image -->" not in text for _, text in chunks)
+
+
+def test_store_round_trip(store):
+    assert store.list_documents() == ["CEM3340", "filters/CEM3320"]
+    assert store.list_documents("filters/") == ["filters/CEM3320"]
+
+    chunks = store.document_chunks("CEM3340")
+    assert [c["kind"] for c in chunks] == ["text", "table", "detections"]
+    assert chunks[-1]["text"] == "Detected on page 1: 2 opamp"
+    assert store.document_chunks("CEM3340", kind="table")[0]["text"].endswith(
+        "| Supply voltage | 4.5 | 15 | V |"
+    )
+
+
+def test_store_search(store):
+    results = store.search("supply voltage")
+    assert results[0]["kind"] == "table"
+    assert results[0]["document"] == "CEM3340"
+
+    results = store.search("voltage controlled", document="filters/CEM3320")
+    assert {r["document"] for r in results} == {"filters/CEM3320"}
+    assert store.search("opamp", kind="detections")[0]["document"] == "CEM3340"
+    assert store.search("nonexistent") == []
+
+
+def test_store_rejects_unknown_ids(store):
+    with pytest.raises(KeyError):
+        store.chunk(len(store))
+    with pytest.raises(KeyError):
+        store.document_chunks("missing")
+
+
+def test_server_round_trip(store):
+    server = ContextServer(store)
+    initialize = {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}}
+    notification = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+    tools = {"jsonrpc": "2.0", "id": 2, "method": "tools/list"}
+    responses = call(
+        server,
+        json.dumps(initialize) + "\n",
+        json.dumps(notification) + "\n",
+        json.dumps(tools) + "\n",
+        tool_call(3, "search_datasheets", {"query": "supply voltage", "limit": 1}),
+        tool_call(4, "get_chunk", {"id": 0}),
+    )
+    assert [r["id"] for r in responses] == [1, 2, 3, 4]
+    assert responses[0]["result"]["serverInfo"]["name"] == "pdf-ocr-datasheets"
+    assert "search_datasheets" in [t["name"] for t in responses[1]["result"]["tools"]]
+    text = responses[2]["result"]["content"][0]["text"]
+    assert text.startswith("[CEM3340 #") and "Supply voltage" in text
+    assert responses[3]["result"]["content"][0]["text"].startswith("[CEM3340 #0 text]")
+
+
+def test_server_survives_malformed_requests(store):
+    server = ContextServer(store)
+    responses = call(
+        server,
+        "[1]\n",
+        '"x"\n',
+        "{not json\n",
+        '{"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": ["a"]}\n',
+        tool_call(2, "search_datasheets", [1]),
+        tool_call(3, "search_datasheets", {"query": 5}),
+        tool_call(4, "search_datasheets", {}),
+        tool_call(5, "search_datasheets", {"query": "vco", "limit": 0}),
+        tool_call(6, "get_chunk", {"id": 10**6}),
+        tool_call(7, "search_datasheets", {"query": "vco"}),
+    )
+    assert [r.get("error", {}).get("code") for r in responses[:2]] == [
+        INVALID_REQUEST,
+        INVALID_REQUEST,
+    ]
+    assert responses[3]["error"]["code"] == INVALID_PARAMS
+    assert responses[4]["error"]["code"] == INVALID_PARAMS
+
+    errors = [r["result"] for r in responses[5:9]]
+    assert all(result["isError"] for result in errors)
+    assert [result["content"][0]["text"] for result in errors] == [
+        "Argument 'query' must be a string",
+        "Missing required argument: query",
+        "Argument 'limit' must be at least 1",
+        "Unknown chunk id: 1000000",
+    ]
+    # The session is still alive after all of them
+    assert "isError" not in responses[9]["result"]
@@ -0,0 +1,77 @@
+import pytest
+from datasheet_index import extract_parameters, normalize_unit, parse_number
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("15 V", (15.0, "V")),
+        ("1,000 pF", (1000.0, "pF")),
+        ("4,75 V", (4.75, "V")),
+        ("−40 °C", (-40.0, "°C")),
+        ("±5 V", (5.0, "V")),
+        ("1.5e-3", (1.5e-3, "")),
+        ("min. 3", (3.0, "")),
+        ("—", (None, "")),
+        (None, (None, "")),
+    ],
+)
+def test_parse_number(text, expected):
+    assert parse_number(text) == expected
+
+
+@pytest.mark.parametrize(
+    "unit, expected",
+    [
+        ("V", ("V", 1.0)),
+        ("mV", ("V", 1e-3)),
+        ("kOhm", ("Ω", 1e3)),
+        ("µA", ("A", 1e-6)),
+        ("C", ("°C", 1.0)),
+        ("", (None, 1.0)),
+    ],
+)
+def test_normalize_unit(unit, expected):
+    assert normalize_unit(unit) == expected
+
+
+def test_extract_parameters():
+    grid = [
+        ["Electrical Characteristics", "", "", "", "", ""],
+        ["Parameter", "Conditions", "Min", "Typ", "Max", "Units"],
+        ["Supply Voltage", "", "4.5", "", "18", "V"],
+        ["Offset Voltage", "Ta = 25°C", "", "2", "5", "mV"],
+        ["", "Full range", "", "", "7", "mV"],
+        ["Output Swing", "", "±10", "", "", "V"],
+        ["Notes", "", "", "", "", ""],
+    ]
+    rows = extract_parameters(grid)
+    assert [(r["parameter"], r["conditions"]) for r in rows] == [
+        ("Supply Voltage", None),
+        ("Offset Voltage", "Ta = 25°C"),
+        ("Offset Voltage", "Full range"),
+        ("Output Swing", None),
+    ]
+    assert (rows[0]["min"], rows[0]["typ"], rows[0]["max"]) == (4.5, None, 18.0)
+    assert rows[1]["unit"] == "V"
+    assert rows[1]["typ"] == pytest.approx(2e-3)
+    assert rows[2]["max"] == pytest.approx(7e-3)
+    assert (rows[3]["min"], rows[3]["max"]) == (-10.0, 10.0)
+    assert rows[0]["raw"] == "Supply Voltage |  | 4.5 |  | 18 | V"
+
+
+def test_extract_parameters_units_next_to_values():
+    grid = [
+        ["Characteristic", "Symbol", "Min", "Max"],
+        ["Control current", "Ic", "10 µA", "500 µA"],
+    ]
+    (row,) = extract_parameters(grid)
+    assert row["symbol"] == "Ic"
+    assert row["unit"] == "A"
+    assert row["min"] == pytest.approx(10e-6)
+    assert row["max"] == pytest.approx(500e-6)
+
+
+def test_extract_parameters_without_header():
+    grid = [["Pin", "Name"], ["1", "VCC"], ["2", "GND"]]
+    assert extract_parameters(grid) == []
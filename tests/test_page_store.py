@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+
+import page_store
+import pytest
+from page_store import PageStore, _page_ranges, convert_incremental
+
+import training_project.src.pdf_source as pdf_source
+
+
+class FakeOptions:
+    def model_dump(self, mode="json", exclude=None):
+        return {"do_ocr": False}
+
+
+class FakeDocument:
+    def __init__(self, start, end):
+        self.pages = {
+            n: SimpleNamespace(size=SimpleNamespace(width=100.0, height=200.0))
+            for n in range(start, end + 1)
+        }
+
+    def export_to_markdown(self, page_no):
+        return f"# Page {page_no}"
+
+
+class FakeConverter:
+    def __init__(self):
+        self.calls = []
+
+    def convert(self, path, page_range):
+        self.calls.append(page_range)
+        return SimpleNamespace(document=FakeDocument(*page_range))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PageStore(tmp_path / "pages", FakeOptions())
+
+
+@pytest.fixture
+def fingerprints(monkeypatch):
+    values = ["a" * 64, "b" * 64, "c" * 64, "d" * 64]
+    monkeypatch.setattr(pdf_source, "page_fingerprints", lambda path: list(values))
+    monkeypatch.setattr(
+        page_store, "page_items", lambda document, page_no: [{"page": page_no}]
+    )
+    return values
+
+
+def test_page_ranges_groups_consecutive_pages():
+    assert _page_ranges([]) == []
+    assert _page_ranges([3]) == [(3, 3)]
+    assert _page_ranges([1, 2, 3, 5, 7, 8]) == [(1, 3), (5, 5), (7, 8)]
+
+
+def test_store_round_trip(store):
+    assert store.get("f" * 64) is None
+    store.put("f" * 64, {"page_no": 1, "markdown": "x"})
+    assert store.get("f" * 64) == {"page_no": 1, "markdown": "x"}
+
+
+def test_store_drops_corrupt_entries(store):
+    store.put("f" * 64, {"page_no": 1})
+    store._path("f" * 64).write_text("{not json", encoding="utf-8")
+    assert store.get("f" * 64) is None
+    assert not store._path("f" * 64).exists()
+
+
+def test_convert_incremental_reuses_stored_pages(store, fingerprints):
+    converter = FakeConverter()
+    markdown, document, pages, converted = convert_incremental(
+        "doc.pdf", converter, store
+    )
+    assert (pages, converted) == (4, 4)
+    assert converter.calls == [(1, 4)]
+    assert markdown == "# Page 1\n\n# Page 2\n\n# Page 3\n\n# Page 4"
+    assert [p["page_no"] for p in document["pages"]] == [1, 2, 3, 4]
+    assert document["pages"][1]["items"] == [{"page": 2}]
+
+    # Changed pages 2 and 3 are converted again in one contiguous range
+    fingerprints[1], fingerprints[2] = "e" * 64, "f" * 64
+    converter = FakeConverter()
+    _, _, _, converted = convert_incremental("doc.pdf", converter, store)
+    assert converted == 2
+    assert converter.calls == [(2, 3)]
+
+
+def test_convert_incremental_only_exports_requested_formats(store, fingerprints):
+    markdown, document, _, _ = convert_incremental(
+        "doc.pdf", FakeConverter(), store, formats=("json",)
+    )
+    assert markdown is None
+    assert "markdown" not in store.get(fingerprints[0])
+
+    # Markdown was never stored, so asking for it converts the pages again
+    converter = FakeConverter()
+    markdown, document, _, converted = convert_incremental(
+        "doc.pdf", converter, store, formats=("markdown",)
+    )
+    assert document is None
+    assert converted == 4
+    assert markdown.startswith("# Page 1")
+    # The JSON export stored by the first run is kept
+    assert store.get(fingerprints[0])["items"] == [{"page": 1}]
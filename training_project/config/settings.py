@@ -6,13 +6,15 @@ import os
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-import torch
 import yaml
 
 
 class Config:
     """Configuration class for YOLO training with enhanced MPS support"""
 
+    # Inference backends selectable with prediction.backend
+    BACKENDS = ("torch", "onnx", "onnx_int8", "openvino")
+
     def __init__(self, config_file: Optional[str] = None):
         # Base paths
         self.PROJECT_ROOT = Path(__file__).parent.parent  # training_project/
@@ -45,6 +47,7 @@ class Config:
             self.BATCH_SIZE = training_config.get("batch_size", -1)
             self.EPOCHS = training_config.get("epochs", 100)
             self.WORKERS = training_config.get("workers", 0)
+            self.THREADS = training_config.get("threads")
             self.DEVICE = training_config.get("device", "mps")
             self.PATIENCE = training_config.get("patience", 50)
             self.SAVE_PERIOD = training_config.get("save_period", 10)
@@ -53,6 +56,8 @@ class Config:
             self.AMP = training_config.get("amp", True)
             self.HALF = training_config.get("half", False)
             self.CACHE = training_config.get("cache", False)
+            self.IMAGE_CACHE = training_config.get("image_cache", True)
+            self.IMAGE_CACHE_MAX_GB = training_config.get("image_cache_max_gb", 50.0)
             self.MULTI_SCALE = training_config.get("multi_scale", False)
             self.DETERMINISTIC = training_config.get("deterministic", False)
 
@@ -101,6 +106,82 @@ class Config:
             self.HALF_PRECISION = prediction_config.get("half_precision", False)
             self.AUGMENT = prediction_config.get("augment", False)
             self.AGNOSTIC_NMS = prediction_config.get("agnostic_nms", False)
+            self.MODEL_CACHE_SIZE = prediction_config.get("model_cache_size", 2)
+            self.PREDICT_BATCH_SIZE = prediction_config.get("batch_size", 8)
+            self.PDF_DPI = prediction_config.get("pdf_dpi", 150)
+            self.PREFETCH_BATCHES = prediction_config.get("prefetch_batches", 2)
+            self.WARMUP = prediction_config.get("warmup", True)
+            self.BACKEND = prediction_config.get("backend", "torch")
+            self.EXPORT_DYNAMIC = prediction_config.get("export_dynamic", True)
+            self.EXPORT_SIMPLIFY = prediction_config.get("export_simplify", True)
+            self.TILED = prediction_config.get("tiled", False)
+            self.TILE_SIZE = prediction_config.get("tile_size", 640)
+            self.TILE_OVERLAP = prediction_config.get("tile_overlap", 128)
+            self.TILE_PDF_DPI = prediction_config.get("tile_pdf_dpi", 300)
+            self.TILE_MERGE_THRESHOLD = prediction_config.get(
+                "tile_merge_threshold", 0.5
+            )
+
+            # Quantization settings
+            quantization_config = config_data.get("quantization", {})
+            self.CALIBRATION_IMAGES = quantization_config.get("calibration_images", 128)
+            self.CALIBRATION_METHOD = quantization_config.get(
+                "calibration_method", "minmax"
+            )
+            self.QUANT_PER_CHANNEL = quantization_config.get("per_channel", True)
+            self.QUANT_EXCLUDE_HEAD = quantization_config.get("exclude_head", True)
+
+            # Throughput autotuning (scripts/autotune.py)
+            autotune_config = config_data.get("autotune", {})
+            self.AUTOTUNE_BATCH_SIZES = autotune_config.get(
+                "batch_sizes", [8, 16, 32, 64]
+            )
+            self.AUTOTUNE_WORKERS = autotune_config.get("workers", [0, 2, 4, 8])
+            self.AUTOTUNE_THREADS = autotune_config.get("threads", [])
+            self.AUTOTUNE_WARMUP_BATCHES = autotune_config.get("warmup_batches", 3)
+            self.AUTOTUNE_PROBE_BATCHES = autotune_config.get("probe_batches", 20)
+            self.AUTOTUNE_MEMORY_FRACTION = autotune_config.get("memory_fraction", 0.8)
+            self.AUTOTUNE_TIMEOUT = autotune_config.get("timeout", 600)
+
+            # Auto-labeling (scripts/autolabel.py)
+            autolabel_config = config_data.get("autolabel", {})
+            self.AUTOLABEL_CONF = autolabel_config.get("confidence", 0.5)
+            self.AUTOLABEL_CANDIDATE_CONF = autolabel_config.get(
+                "candidate_confidence", 0.1
+            )
+            self.AUTOLABEL_REVIEW_FRACTION = autolabel_config.get(
+                "review_fraction", 0.1
+            )
+            self.AUTOLABEL_COMMITTEE = autolabel_config.get("committee", [])
+            self.AUTOLABEL_IOU = autolabel_config.get("match_iou", 0.5)
+            self.AUTOLABEL_IMAGE_FORMAT = autolabel_config.get("image_format", "jpg")
+            self.AUTOLABEL_WRITERS = autolabel_config.get("writers", 4)
+
+            # Perceptual-hash deduplication
+            dedup_config = config_data.get("dedup", {})
+            self.DEDUP_TRAINING = dedup_config.get("training", False)
+            self.DEDUP_PREDICTION = dedup_config.get("prediction", False)
+            self.DEDUP_THRESHOLD = dedup_config.get("threshold", 6)
+            self.DEDUP_CACHE_SIZE = dedup_config.get("cache_size", 4096)
+
+            # Detection cropping (scripts/crop.py)
+            crop_config = config_data.get("crop", {})
+            self.CROP_FORMAT = crop_config.get("format", "png")
+            self.CROP_QUALITY = crop_config.get("quality", 95)
+            self.CROP_PADDING = crop_config.get("padding", 8)
+            self.CROP_MIN_SIZE = crop_config.get("min_size", 8)
+            self.CROP_CLASSES = crop_config.get("classes", [])
+            self.CROP_WORKERS = crop_config.get("workers", 8)
+
+            # Inference server settings
+            server_config = config_data.get("server", {})
+            self.SERVER_HOST = server_config.get("host", "127.0.0.1")
+            self.SERVER_PORT = server_config.get("port", 8765)
+            self.SERVER_SOCKET = server_config.get("socket")
+            self.SERVER_MAX_BATCH = server_config.get("max_batch", 8)
+            self.SERVER_MAX_LATENCY_MS = server_config.get("max_latency_ms", 10)
+            self.SERVER_MAX_QUEUE = server_config.get("max_queue", 256)
+            self.SERVER_MAX_BODY_MB = server_config.get("max_body_mb", 64)
 
             # Validation settings
             validation_config = config_data.get("validation", {})
@@ -132,6 +213,10 @@ class Config:
             )
             self._project_rel = paths_config.get("project", "training_data/runs")
             self._output_rel = paths_config.get("output", "../output")
+            self._image_cache_rel = paths_config.get(
+                "image_cache", "../output/image_cache"
+            )
+            self._dedup_rel = paths_config.get("dedup", "../output/dedup")
 
         except FileNotFoundError:
             raise FileNotFoundError(f"Configuration file not found: {config_path}")
@@ -144,10 +229,15 @@ class Config:
         self.YAML_PATH = self.PROJECT_ROOT / self._dataset_yaml_rel
         self.PROJECT_PATH = self.PROJECT_ROOT / self._project_rel
         self.OUTPUT_PATH = self.PROJECT_ROOT / self._output_rel
+        self.IMAGE_CACHE_PATH = self.PROJECT_ROOT / self._image_cache_rel
+        self.DEDUP_PATH = self.PROJECT_ROOT / self._dedup_rel
 
     def _optimize_for_mps(self):
         """Apply MPS-specific optimizations"""
         if self.DEVICE == "mps":
+            # torch is imported lazily; it dominates CLI startup time
+            import torch
+
             # Check MPS availability
             if not torch.backends.mps.is_available():
                 logging.warning("MPS not available, falling back to CPU")
@@ -253,6 +343,25 @@ class Config:
         weights_name = "best.pt" if self.USE_BEST_WEIGHTS else "last.pt"
         return self.PROJECT_PATH / self.RUN_NAME / "weights" / weights_name
 
+    def get_inference_model_path(self, backend=None):
+        """Get the path to the model used by the configured inference backend"""
+        backend = backend or self.BACKEND
+        weights_path = self.get_weights_path()
+        if backend == "torch":
+            return weights_path
+        if backend == "onnx":
+            return weights_path.with_suffix(".onnx")
+        if backend == "onnx_int8":
+            # Written by scripts/quantize.py
+            return weights_path.with_name(f"{weights_path.stem}_int8.onnx")
+        if backend == "openvino":
+            # Directory name used by ultralytics' OpenVINO export
+            return weights_path.parent / f"{weights_path.stem}_openvino_model"
+        raise ValueError(
+            f"Unknown inference backend '{backend}' "
+            f"(expected one of: {', '.join(self.BACKENDS)})"
+        )
+
     def validate_paths(self):
         """Validate that required paths exist"""
         if not self.YAML_PATH.exists():
@@ -308,6 +417,8 @@ class Config:
 
     def print_mps_info(self):
         """Print MPS configuration and status"""
+        import torch
+
         print("=== MPS Configuration ===")
         print(f"Device: {self.DEVICE}")
         print(f"MPS Available: {torch.backends.mps.is_available()}")
@@ -337,12 +448,15 @@ class Config:
                 "batch_size": self.BATCH_SIZE,
                 "epochs": self.EPOCHS,
                 "workers": self.WORKERS,
+                "threads": self.THREADS,
                 "device": self.DEVICE,
                 "patience": self.PATIENCE,
                 "save_period": self.SAVE_PERIOD,
                 "amp": self.AMP,
                 "half": self.HALF,
                 "cache": self.CACHE,
+                "image_cache": self.IMAGE_CACHE,
+                "image_cache_max_gb": self.IMAGE_CACHE_MAX_GB,
                 "multi_scale": self.MULTI_SCALE,
                 "deterministic": self.DETERMINISTIC,
                 "optimizer": self.OPTIMIZER,
@@ -370,12 +484,74 @@ class Config:
                 "half_precision": self.HALF_PRECISION,
                 "augment": self.AUGMENT,
                 "agnostic_nms": self.AGNOSTIC_NMS,
+                "model_cache_size": self.MODEL_CACHE_SIZE,
+                "batch_size": self.PREDICT_BATCH_SIZE,
+                "pdf_dpi": self.PDF_DPI,
+                "prefetch_batches": self.PREFETCH_BATCHES,
+                "warmup": self.WARMUP,
+                "backend": self.BACKEND,
+                "export_dynamic": self.EXPORT_DYNAMIC,
+                "export_simplify": self.EXPORT_SIMPLIFY,
+                "tiled": self.TILED,
+                "tile_size": self.TILE_SIZE,
+                "tile_overlap": self.TILE_OVERLAP,
+                "tile_pdf_dpi": self.TILE_PDF_DPI,
+                "tile_merge_threshold": self.TILE_MERGE_THRESHOLD,
+            },
+            "quantization": {
+                "calibration_images": self.CALIBRATION_IMAGES,
+                "calibration_method": self.CALIBRATION_METHOD,
+                "per_channel": self.QUANT_PER_CHANNEL,
+                "exclude_head": self.QUANT_EXCLUDE_HEAD,
+            },
+            "autotune": {
+                "batch_sizes": self.AUTOTUNE_BATCH_SIZES,
+                "workers": self.AUTOTUNE_WORKERS,
+                "threads": self.AUTOTUNE_THREADS,
+                "warmup_batches": self.AUTOTUNE_WARMUP_BATCHES,
+                "probe_batches": self.AUTOTUNE_PROBE_BATCHES,
+                "memory_fraction": self.AUTOTUNE_MEMORY_FRACTION,
+                "timeout": self.AUTOTUNE_TIMEOUT,
+            },
+            "autolabel": {
+                "confidence": self.AUTOLABEL_CONF,
+                "candidate_confidence": self.AUTOLABEL_CANDIDATE_CONF,
+                "review_fraction": self.AUTOLABEL_REVIEW_FRACTION,
+                "committee": self.AUTOLABEL_COMMITTEE,
+                "match_iou": self.AUTOLABEL_IOU,
+                "image_format": self.AUTOLABEL_IMAGE_FORMAT,
+                "writers": self.AUTOLABEL_WRITERS,
+            },
+            "dedup": {
+                "training": self.DEDUP_TRAINING,
+                "prediction": self.DEDUP_PREDICTION,
+                "threshold": self.DEDUP_THRESHOLD,
+                "cache_size": self.DEDUP_CACHE_SIZE,
+            },
+            "crop": {
+                "format": self.CROP_FORMAT,
+                "quality": self.CROP_QUALITY,
+                "padding": self.CROP_PADDING,
+                "min_size": self.CROP_MIN_SIZE,
+                "classes": self.CROP_CLASSES,
+                "workers": self.CROP_WORKERS,
+            },
+            "server": {
+                "host": self.SERVER_HOST,
+                "port": self.SERVER_PORT,
+                "socket": self.SERVER_SOCKET,
+                "max_batch": self.SERVER_MAX_BATCH,
+                "max_latency_ms": self.SERVER_MAX_LATENCY_MS,
+                "max_queue": self.SERVER_MAX_QUEUE,
+                "max_body_mb": self.SERVER_MAX_BODY_MB,
             },
             "paths": {
                 "training_data": self._training_data_rel,
                 "dataset_yaml": self._dataset_yaml_rel,
                 "project": self._project_rel,
                 "output": self._output_rel,
+                "image_cache": self._image_cache_rel,
+                "dedup": self._dedup_rel,
             },
         }
 
@@ -385,5 +561,20 @@ class Config:
         print(f"Configuration saved to: {output_path}")
 
 
-# Create a default instance for backward compatibility
-default_config = Config()
+_default_config = None
+
+
+def get_default_config():
+    """Return the shared default configuration, created on first use"""
+    global _default_config
+    if _default_config is None:
+        _default_config = Config()
+    return _default_config
+
+
+def __getattr__(name):
+    # Backward compatibility for ``from config.settings import default_config``
+    # without parsing YAML and probing devices at import time
+    if name == "default_config":
+        return get_default_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Auto-label unlabeled pages and select the most uncertain ones for review"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from config.settings import Config
+
+from src.autolabel import AutoLabeler
+from src.instrumentation import add_metrics_arguments, finish_metrics, setup_metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Label images and PDF pages with the trained model and rank "
+        "them by uncertainty for review in Label Studio",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s ./input
+  %(prog)s ./input/datasheet.pdf --output output/autolabel --review-fraction 0.2
+  %(prog)s ./img --committee runs/run2/weights/best.pt runs/run3/weights/best.pt
+        """,
+    )
+    parser.add_argument("source", help="Image, PDF or directory of images and PDFs")
+    parser.add_argument("--config", type=str, help="Path to configuration YAML file")
+    parser.add_argument(
+        "--output", "-o", help="Output directory (default: <output>/autolabel)"
+    )
+    parser.add_argument(
+        "--model", help="Labeling weights (default: the configured run's weights)"
+    )
+    parser.add_argument(
+        "--committee",
+        nargs="+",
+        help="Further weights; their disagreement counts as uncertainty",
+    )
+    parser.add_argument(
+        "--conf", type=float, help="Minimum score of boxes written as labels"
+    )
+    parser.add_argument(
+        "--candidate-conf",
+        type=float,
+        help="Minimum score of boxes considered when ranking uncertainty",
+    )
+    parser.add_argument(
+        "--review-fraction",
+        type=float,
+        help="Most uncertain fraction of pages listed for review",
+    )
+    parser.add_argument("--batch", type=int, help="Pages per inference batch")
+    parser.add_argument("--dpi", type=int, help="Render resolution for PDF pages")
+
+    add_metrics_arguments(parser)
+
+    args = parser.parse_args()
+    setup_metrics(args)
+
+    try:
+        config = Config(config_file=args.config) if args.config else Config()
+        config.update_from_args(
+            autolabel_conf=args.conf,
+            autolabel_candidate_conf=args.candidate_conf,
+            autolabel_review_fraction=args.review_fraction,
+        )
+        output_dir = Path(args.output or config.OUTPUT_PATH / "autolabel")
+
+        labeler = AutoLabeler(config, model_path=args.model, committee=args.committee)
+        print(f"🏷️ Auto-labeling {args.source} with {labeler.predictor.model_path}")
+        if labeler.committee:
+            print(f"   Committee: {len(labeler.committee)} further models")
+
+        ranking = labeler.run(
+            args.source, output_dir, batch_size=args.batch, dpi=args.dpi
+        )
+        review = sum(1 for entry in ranking if entry["review"])
+        labels = sum(entry["labels"] for entry in ranking)
+
+        print(f"✅ Labeled {len(ranking)} pages with {labels} boxes")
+        print(f"   Review queue: {review} pages ({output_dir / 'review.txt'})")
+        print(f"   Ranking: {output_dir / 'ranking.csv'}")
+
+    except Exception as e:
+        print(f"❌ Auto-labeling failed: {e}")
+        sys.exit(1)
+    finally:
+        finish_metrics(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Find the fastest CPU training settings for this host and save them as a profile"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from config.settings import Config
+
+from src.autotune import ThroughputAutotuner
+
+
+def print_result(best):
+    candidate = best["candidate"]
+    print("=== Autotune Result ===")
+    print(f"Batch Size: {candidate['batch']}")
+    print(f"Workers: {candidate['workers']}")
+    print(f"Threads: {candidate['threads']}")
+    print(f"Throughput: {best['images_per_sec']:.1f} images/sec")
+    print(f"Peak Memory: {best['peak_rss_bytes'] / 1024**3:.2f} GB")
+    print("=" * 30)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Autotune batch size, dataloader workers and threads on CPU",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s
+  %(prog)s --memory-gb 24 --batch-sizes 16 32 64 --workers 2 4 8
+  python scripts/train.py --config config/autotune_<host>.yaml
+        """,
+    )
+    parser.add_argument("--config", type=str, help="Path to configuration YAML file")
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", help="Candidate batch sizes"
+    )
+    parser.add_argument(
+        "--workers", type=int, nargs="+", help="Candidate dataloader workers"
+    )
+    parser.add_argument("--threads", type=int, nargs="+", help="Candidate threads")
+    parser.add_argument(
+        "--probe-batches", type=int, help="Timed training batches per probe"
+    )
+    parser.add_argument(
+        "--memory-gb",
+        type=float,
+        help="Memory ceiling (defaults to memory_fraction of physical RAM)",
+    )
+    parser.add_argument(
+        "--output", help="Profile YAML (default: config/autotune_<host>.yaml)"
+    )
+    args = parser.parse_args()
+
+    try:
+        config = Config(config_file=args.config) if args.config else Config()
+        config.update_from_args(
+            autotune_batch_sizes=args.batch_sizes,
+            autotune_workers=args.workers,
+            autotune_threads=args.threads,
+            autotune_probe_batches=args.probe_batches,
+        )
+        memory_limit = int(args.memory_gb * 1024**3) if args.memory_gb else None
+        tuner = ThroughputAutotuner(config, memory_limit=memory_limit)
+        best = tuner.run()
+        tuner.apply(best)
+        print_result(best)
+
+        profile, report = tuner.save(best, args.output)
+        print(f"Probe report saved to: {report}")
+        print(f"✅ Train with: python scripts/train.py --config {profile}")
+
+    except Exception as e:
+        print(f"❌ Autotuning failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
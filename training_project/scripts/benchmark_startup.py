@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Startup-time benchmark for the CLI entry points
+
+Runs each script with --help in a fresh interpreter, reports the median wall
+time and fails when a script exceeds the time budget or pulls in one of the
+heavy libraries (torch, ultralytics, docling) before it is actually needed.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+REPO_ROOT = PROJECT_ROOT.parent
+
+HEAVY_MODULES = ["torch", "ultralytics", "docling", "docling_core"]
+
+SCRIPTS = [
+    PROJECT_ROOT / "scripts" / "train.py",
+    PROJECT_ROOT / "scripts" / "predict.py",
+    REPO_ROOT / "src" / "main.py",
+]
+
+# Executes a script like ``python script --help`` and reports which heavy
+# modules ended up imported
+PROBE = """
+import json, runpy, sys
+from pathlib import Path
+script = sys.argv[1]
+sys.argv = [script, "--help"]
+sys.path.insert(0, str(Path(script).parent))
+try:
+    runpy.run_path(script, run_name="__main__")
+except SystemExit:
+    pass
+heavy = {heavy}
+print(json.dumps(sorted(m for m in heavy if m in sys.modules)), file=sys.stderr)
+"""
+
+
+def time_script(script, runs):
+    """Median wall time of ``script --help`` over several fresh interpreters"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, str(script), "--help"],
+            cwd=REPO_ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def heavy_imports(script):
+    """Heavy modules imported while the script handles --help"""
+    probe = PROBE.format(heavy=repr(HEAVY_MODULES))
+    result = subprocess.run(
+        [sys.executable, "-c", probe, str(script)],
+        cwd=REPO_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=False,
+    )
+    try:
+        return json.loads(result.stderr.strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        return ["<probe failed>"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup time")
+    parser.add_argument(
+        "--runs", type=int, default=5, help="Interpreter starts per script"
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=1.0,
+        help="Maximum median startup time per script in seconds",
+    )
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    failed = False
+    for script in SCRIPTS:
+        median = time_script(script, args.runs)
+        heavy = heavy_imports(script)
+        ok = median <= args.budget and not heavy
+        failed |= not ok
+        results.append(
+            {
+                "script": str(script.relative_to(REPO_ROOT)),
+                "median_seconds": round(median, 4),
+                "heavy_imports": heavy,
+                "ok": ok,
+            }
+        )
+        status = "✅" if ok else "❌"
+        heavy_note = f" (imports {', '.join(heavy)})" if heavy else ""
+        print(f"{status} {script.relative_to(REPO_ROOT)}: {median:.3f}s{heavy_note}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"budget": args.budget, "results": results}, f, indent=2)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -34,6 +34,9 @@ _train_py() {
         '--no-amp[Disable AMP]' \
         '--check-mps[Check MPS availability]' \
         '--optimize-for-mps[Apply MPS optimizations]' \
+        '--autotune[Autotune CPU throughput first]' \
+        '--nproc-per-node[CPU DDP processes on this node]:nproc:(2 4 8)' \
+        '--dedup[Drop near-duplicate training images]' \
         '--help[Show help]' \
         '*::args:_files'
 }
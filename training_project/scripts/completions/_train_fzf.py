@@ -23,6 +23,8 @@ function _train_fzf_completion() {
         '--no-amp[Disable AMP]'
         '--check-mps[Check MPS]'
         '--optimize-for-mps[Optimize for MPS]'
+        '--autotune[Autotune CPU]'
+        '--dedup[Deduplicate images]'
         '--no-resume[No resume]'
         '--help[Help]'
     )
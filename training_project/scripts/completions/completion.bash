@@ -8,7 +8,7 @@ _train_completion() {
     prev="${COMP_WORDS[COMP_CWORD - 1]}"
 
     # Available options
-    opts="--config --epochs --batch --device --no-resume --model --run-name --workers --amp --no-amp --check-mps --optimize-for-mps --help"
+    opts="--config --epochs --batch --device --no-resume --model --run-name --workers --amp --no-amp --check-mps --optimize-for-mps --autotune --nproc-per-node --nnodes --node-rank --master-addr --master-port --scaling-report --dedup --help"
 
     # Config file completion
     if [[ ${prev} == "--config" ]]; then
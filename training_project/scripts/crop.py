@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Crop detected regions out of images and PDF pages in-process"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from src.cropper import CROP_FORMATS, CropWriter, crop_source
+from src.instrumentation import add_metrics_arguments, finish_metrics, setup_metrics
+from src.predictor import YOLOPredictor
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Detect and crop regions (e.g. schematics) without leaving "
+        "the process",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s ./input/CEM33403345-VCO.pdf
+  %(prog)s ./img --output output/crops --classes 0 2 --format jpg
+        """,
+    )
+    parser.add_argument("source", help="Image, image folder or PDF")
+    parser.add_argument(
+        "--output", "-o", help="Crop directory (default: <output>/crops)"
+    )
+    parser.add_argument("--model", help="Path to model weights")
+    parser.add_argument(
+        "--conf",
+        type=float,
+        help="Confidence threshold (defaults to the configured threshold)",
+    )
+    parser.add_argument("--dpi", type=int, help="Render resolution for PDF sources")
+    parser.add_argument(
+        "--classes", type=int, nargs="+", help="Only crop these class ids"
+    )
+    parser.add_argument("--format", choices=CROP_FORMATS, help="Crop encoding")
+    parser.add_argument("--padding", type=int, help="Pixels added around every box")
+    parser.add_argument("--workers", type=int, help="Encoding threads")
+
+    add_metrics_arguments(parser)
+
+    args = parser.parse_args()
+    setup_metrics(args)
+
+    try:
+        predictor = YOLOPredictor(model_path=args.model)
+        config = predictor.config
+        config.update_from_args(
+            crop_classes=args.classes,
+            crop_format=args.format,
+            crop_padding=args.padding,
+            crop_workers=args.workers,
+        )
+        output_dir = Path(args.output or config.OUTPUT_PATH / "crops")
+
+        start = time.perf_counter()
+        with CropWriter(
+            output_dir,
+            names=predictor.names,
+            fmt=config.CROP_FORMAT,
+            quality=config.CROP_QUALITY,
+            padding=config.CROP_PADDING,
+            min_size=config.CROP_MIN_SIZE,
+            classes=config.CROP_CLASSES,
+            workers=config.CROP_WORKERS,
+        ) as writer:
+            pages = crop_source(
+                predictor, args.source, writer, conf=args.conf, dpi=args.dpi
+            )
+        elapsed = time.perf_counter() - start
+
+        print(f"✂️ Cropped {writer.count} regions from {pages} pages in {elapsed:.1f}s")
+        print(f"✅ Crops saved to: {output_dir}")
+
+    except Exception as e:
+        print(f"❌ Cropping failed: {e}")
+        sys.exit(1)
+    finally:
+        finish_metrics(args)
+
+
+if __name__ == "__main__":
+    main()
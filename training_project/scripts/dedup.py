@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Find near-duplicate images with perceptual hashes and prune the training split"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from config.settings import Config
+
+from src.dedup import HashStore, dedup_dataset, find_duplicates
+from src.utils import list_images
+
+
+def print_duplicates(source, store, threshold):
+    """List every image of a folder that duplicates an earlier one"""
+    images = list_images(source)
+    duplicates = find_duplicates(store.hashes(images), threshold)
+    for index, original in sorted(duplicates.items()):
+        print(f"{images[index]} -> {images[original]}")
+    print(f"{len(duplicates)} of {len(images)} images are near-duplicates")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Deduplicate near-identical pages with 64-bit perceptual hashes",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s
+  %(prog)s --threshold 4
+  %(prog)s --list ./img
+  python scripts/train.py --dedup
+        """,
+    )
+    parser.add_argument("--config", type=str, help="Path to configuration YAML file")
+    parser.add_argument(
+        "--threshold",
+        type=int,
+        help="Maximum Hamming distance between hashes of duplicate images",
+    )
+    parser.add_argument(
+        "--list",
+        metavar="SOURCE",
+        help="Only list the near-duplicates of an image file or folder",
+    )
+    args = parser.parse_args()
+
+    try:
+        config = Config(config_file=args.config) if args.config else Config()
+        config.update_from_args(dedup_threshold=args.threshold)
+        store = HashStore(config.DEDUP_PATH)
+
+        if args.list:
+            print_duplicates(args.list, store, config.DEDUP_THRESHOLD)
+            return
+
+        pruned_yaml, kept, dropped = dedup_dataset(
+            config.YAML_PATH, config.DEDUP_PATH, config.DEDUP_THRESHOLD
+        )
+        print(f"🧹 Training split: {kept} images kept, {dropped} near-duplicates dropped")
+        print(f"✅ Pruned dataset: {pruned_yaml}")
+        print("   Train on it with: python scripts/train.py --dedup")
+
+    except Exception as e:
+        print(f"❌ Deduplication failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
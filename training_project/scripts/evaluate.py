@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Accuracy and throughput benchmark for YOLO weights"""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from config.settings import Config
+
+from src.evaluator import YOLOEvaluator, backend_parity, run_isolated
+
+
+def print_report(report):
+    """Print a human readable summary of a benchmark report"""
+    print("=== Benchmark Report ===")
+    print(f"Model: {report['model']} ({report['backend']})")
+    print(f"Device: {report['device']}")
+    print(f"Model load: {report['model_load_seconds']:.3f}s")
+
+    accuracy = report.get("accuracy")
+    if accuracy:
+        print(
+            f"mAP50: {accuracy['map50']:.4f}  mAP50-95: {accuracy['map50_95']:.4f}  "
+            f"P: {accuracy['precision']:.4f}  R: {accuracy['recall']:.4f}"
+        )
+        for name, values in accuracy["per_class"].items():
+            print(
+                f"  {name:20} P {values['precision']:.4f}  R {values['recall']:.4f}  "
+                f"mAP50 {values['map50']:.4f}  mAP50-95 {values['map50_95']:.4f}"
+            )
+
+    speed = report.get("speed")
+    if speed:
+        latency = speed["latency_ms"]
+        print(f"Throughput: {speed['images_per_sec']:.2f} images/sec")
+        print(
+            f"Latency: p50 {latency['p50']:.1f}ms  p95 {latency['p95']:.1f}ms  "
+            f"p99 {latency['p99']:.1f}ms"
+        )
+
+    print(f"Peak RSS: {report['peak_rss_mb']:.1f} MB")
+    print("=" * 30)
+
+
+def _lookup(report, path):
+    for key in path.split("."):
+        if not isinstance(report, dict) or key not in report:
+            return None
+        report = report[key]
+    return report
+
+
+def print_comparison(previous, current):
+    """Print metric deltas between two benchmark reports"""
+    print(f"=== Compared to {previous.get('timestamp', 'previous run')} ===")
+    for path in [
+        "accuracy.map50",
+        "accuracy.map50_95",
+        "speed.images_per_sec",
+        "speed.latency_ms.p50",
+        "speed.latency_ms.p95",
+        "speed.latency_ms.p99",
+        "model_load_seconds",
+        "peak_rss_mb",
+    ]:
+        before, after = _lookup(previous, path), _lookup(current, path)
+        if before is None or after is None:
+            continue
+        print(f"{path:24} {before:>10.4f} -> {after:>10.4f} ({after - before:+.4f})")
+    print("=" * 30)
+
+
+def print_parity(baseline_backend, parity):
+    """Print speed and accuracy of each backend relative to the baseline"""
+    print(f"=== Backend parity (vs {baseline_backend}) ===")
+    for backend, values in parity.items():
+        line = f"{backend:10}"
+        if "speedup" in values:
+            line += f"  speed x{values['speedup']:.2f}"
+        if "map50_delta" in values:
+            line += (
+                f"  mAP50 {values['map50_delta']:+.4f}"
+                f"  mAP50-95 {values['map50_95_delta']:+.4f}"
+            )
+        print(line)
+    print("=" * 30)
+
+
+def run_backends(config, args):
+    """Benchmark every requested backend and compare each with the first one
+
+    Each backend runs in its own process, so peak RSS is measured per backend.
+    """
+    reports = {}
+    for backend in args.backends:
+        print(f"Benchmarking backend: {backend}")
+        reports[backend] = run_isolated(
+            config,
+            backend=backend,
+            data_yaml=args.data,
+            split=args.split,
+            max_images=args.max_images,
+            warmup=args.warmup,
+            accuracy=not args.skip_accuracy,
+            speed=not args.skip_speed,
+        )
+
+    baseline = args.backends[0]
+    parity = {
+        backend: backend_parity(reports[baseline], report)
+        for backend, report in reports.items()
+        if backend != baseline
+    }
+    return {"baseline": baseline, "backends": reports, "parity": parity}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark accuracy and throughput of YOLO weights"
+    )
+    parser.add_argument("--config", type=str, help="Path to configuration YAML file")
+    parser.add_argument("--model", help="Path to model weights")
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=list(Config.BACKENDS),
+        help="Benchmark these inference backends and report parity with the first",
+    )
+    parser.add_argument("--data", help="Dataset YAML (defaults to the configured one)")
+    parser.add_argument("--split", help="Dataset split to evaluate on")
+    parser.add_argument("--device", type=str, choices=["cpu", "mps", "cuda"])
+    parser.add_argument("--max-images", type=int, help="Limit the images timed")
+    parser.add_argument(
+        "--warmup", type=int, default=3, help="Untimed warm-up inferences"
+    )
+    parser.add_argument(
+        "--skip-accuracy", action="store_true", help="Only measure throughput"
+    )
+    parser.add_argument(
+        "--skip-speed", action="store_true", help="Only measure accuracy"
+    )
+    parser.add_argument("--output", "-o", help="JSON report path")
+    parser.add_argument("--compare", help="Previous JSON report to compare against")
+    args = parser.parse_args()
+    # Backend models are resolved from the configured run's weights
+    if args.backends and args.model:
+        parser.error("--model cannot be combined with --backends")
+    if args.backends and args.compare:
+        parser.error("--compare cannot be combined with --backends")
+
+    try:
+        config = Config(config_file=args.config) if args.config else Config()
+        if args.device is not None:
+            config.update_from_args(device=args.device)
+
+        if args.backends:
+            report = run_backends(config, args)
+        else:
+            evaluator = YOLOEvaluator(config=config, model_path=args.model)
+            report = evaluator.run(
+                data_yaml=args.data,
+                split=args.split,
+                max_images=args.max_images,
+                warmup=args.warmup,
+                accuracy=not args.skip_accuracy,
+                speed=not args.skip_speed,
+            )
+
+        output = args.output
+        if output is None:
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            name = f"{config.RUN_NAME}_{stamp}.json"
+            output = config.OUTPUT_PATH / "benchmarks" / name
+        Path(output).parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+        if args.backends:
+            for backend_report in report["backends"].values():
+                print_report(backend_report)
+            print_parity(report["baseline"], report["parity"])
+        else:
+            print_report(report)
+        if args.compare:
+            with open(args.compare, "r", encoding="utf-8") as f:
+                print_comparison(json.load(f), report)
+        print(f"Report saved to: {output}")
+
+    except Exception as e:
+        print(f"Evaluation failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
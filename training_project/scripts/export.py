@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Export trained YOLO weights to ONNX / OpenVINO for CPU inference"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from config.settings import Config
+
+from src.exporter import EXPORT_FORMATS, ModelExporter
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export trained weights for the onnx/openvino inference backends"
+    )
+    parser.add_argument("--config", type=str, help="Path to configuration YAML file")
+    parser.add_argument(
+        "--weights", help="Weights to export (defaults to the configured run)"
+    )
+    parser.add_argument(
+        "--backend",
+        nargs="+",
+        choices=list(EXPORT_FORMATS),
+        default=["onnx"],
+        help="Backends to export for",
+    )
+    parser.add_argument("--imgsz", type=int, help="Export image size")
+    args = parser.parse_args()
+
+    try:
+        config = Config(config_file=args.config) if args.config else Config()
+        exporter = ModelExporter(config=config, weights_path=args.weights)
+        exported = exporter.export_all(args.backend, imgsz=args.imgsz)
+
+        for backend, path in exported.items():
+            print(f"✅ {backend}: {path}")
+        print("Select one with 'backend:' in the prediction section of the config")
+
+    except Exception as e:
+        print(f"❌ Export failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@
 """Prediction script for YOLO model"""
 
 import argparse
+import json
 import sys
 from pathlib import Path
 
@@ -12,47 +13,158 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.append(str(PROJECT_ROOT))
 
-from config.settings import Config
-
+from src.detection_cache import DetectionPageCache
+from src.detection_store import DetectionSink, DetectionStore
+from src.instrumentation import add_metrics_arguments, finish_metrics, setup_metrics
 from src.predictor import YOLOPredictor
 
 
+def stream_predictions(predictor, source, args):
+    """Consume the prediction stream record by record"""
+    if str(source).lower().endswith(".pdf"):
+        page_cache = None
+        if args.incremental:
+            page_cache = DetectionPageCache(predictor.config.OUTPUT_PATH / "page_cache")
+        records = predictor.predict_pdf(
+            source,
+            conf=args.conf,
+            dpi=args.dpi,
+            page_cache=page_cache,
+            tiled=args.tiled or None,
+        )
+    elif args.tiled or predictor.config.TILED:
+        records = predictor.predict_tiled_stream(source, conf=args.conf)
+    else:
+        records = predictor.predict_stream(
+            source, conf=args.conf, save=args.save, save_dir=args.output
+        )
+    names = predictor.names
+    out = open(args.jsonl, "w", encoding="utf-8") if args.jsonl else None
+    sink = DetectionSink(args.store) if args.store else None
+    try:
+        count = 0
+        for record in records:
+            count += 1
+            if sink:
+                sink.append(record)
+            if out:
+                out.write(json.dumps(record.to_dict(names)) + "\n")
+            elif sink:
+                continue
+            elif record.page is not None:
+                print(f"{record.source} page {record.page}: {len(record)} detections")
+            else:
+                print(f"{record.source}: {len(record)} detections")
+        print(f"Processed {count} images")
+    finally:
+        if out:
+            out.close()
+        if sink:
+            sink.close()
+
+    if sink:
+        summary = DetectionStore(args.store).summary()
+        print(
+            f"Detection store {args.store}: {summary['detections']} detections "
+            f"from {summary['documents']} documents in {summary['chunks']} chunks"
+        )
+
+
 def main():
     parser = argparse.ArgumentParser(description="Run YOLO predictions")
     parser.add_argument(
-        "source", nargs="?", help="Source image or directory, use '0' for local webcam"
+        "source",
+        nargs="?",
+        help="Source image, directory or PDF, use '0' for local webcam",
     )
     parser.add_argument("--output", "-o", help="Output directory")
     parser.add_argument(
         "--conf",
         type=float,
-        default=Config.CONFIDENCE_THRESHOLD,
-        help="Confidence threshold",
+        help="Confidence threshold (defaults to the configured threshold)",
     )
     parser.add_argument("--model", help="Path to model weights")
     parser.add_argument(
         "--img-folder", action="store_true", help="Use main img folder as source"
     )
+    parser.add_argument(
+        "--no-warmup", action="store_true", help="Skip the model warm-up inference"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream compact detection records instead of collecting all results",
+    )
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="Draw and save annotated images in stream mode",
+    )
+    parser.add_argument("--dpi", type=int, help="Render resolution for PDF sources")
+    parser.add_argument(
+        "--tiled",
+        action="store_true",
+        help="Detect on overlapping high-resolution tiles (implies streaming)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only detect PDF pages that changed since the last run",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Reuse the detections of near-duplicate pages instead of detecting "
+        "them again (implies streaming)",
+    )
+    parser.add_argument(
+        "--jsonl", help="Write streamed detection records to this JSON-lines file"
+    )
+    parser.add_argument(
+        "--store",
+        help="Append streamed detections to this columnar detection store "
+        "(implies streaming)",
+    )
+
+    add_metrics_arguments(parser)
 
     args = parser.parse_args()
+    setup_metrics(args)
 
     try:
-        predictor = YOLOPredictor(model_path=args.model)
+        predictor = YOLOPredictor(
+            model_path=args.model, warmup=False if args.no_warmup else None
+        )
+        if args.dedup:
+            predictor.config.DEDUP_PREDICTION = True
 
         # Determine source
         if args.img_folder:
-            source = Config.PROJECT_ROOT.parent / "img"
+            source = predictor.config.PROJECT_ROOT.parent / "img"
         elif args.source:
             source = args.source
         else:
             print("Please specify a source or use --img-folder flag")
             sys.exit(1)
 
-        predictor.predict(source, save_dir=args.output, conf=args.conf)
+        # PDFs are always streamed page by page from memory
+        if (
+            args.stream
+            or args.store
+            or args.dedup
+            or args.tiled
+            or predictor.config.TILED
+            or str(source).lower().endswith(".pdf")
+        ):
+            stream_predictions(predictor, source, args)
+        else:
+            predictor.predict(source, save_dir=args.output, conf=args.conf)
 
     except Exception as e:
         print(f"Prediction failed: {e}")
         sys.exit(1)
+    finally:
+        finish_metrics(args)
 
 
 if __name__ == "__main__":
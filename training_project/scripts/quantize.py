@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""INT8 post-training quantization of trained YOLO weights"""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from config.settings import Config
+
+from src.evaluator import backend_parity, run_isolated
+from src.quantizer import CALIBRATION_METHODS, ModelQuantizer
+
+
+def evaluate(config, model_path, args):
+    """Benchmark report of one model on the validation split
+
+    Runs in a fresh process, so the INT8 peak RSS does not include the FP32 one.
+    """
+    return run_isolated(
+        config,
+        model_path=model_path,
+        data_yaml=args.data,
+        max_images=args.max_images,
+        speed=not args.skip_speed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Quantize trained weights to INT8 with training-set calibration"
+    )
+    parser.add_argument("--config", type=str, help="Path to configuration YAML file")
+    parser.add_argument(
+        "--weights", help="Weights to quantize (defaults to the configured run)"
+    )
+    parser.add_argument("--data", help="Dataset YAML (defaults to the configured one)")
+    parser.add_argument(
+        "--calibration-images", type=int, help="Number of training images to sample"
+    )
+    parser.add_argument(
+        "--method", choices=CALIBRATION_METHODS, help="Calibration method"
+    )
+    parser.add_argument(
+        "--skip-eval",
+        action="store_true",
+        help="Do not measure the accuracy drop against the FP32 model",
+    )
+    parser.add_argument(
+        "--skip-speed", action="store_true", help="Only compare accuracy"
+    )
+    parser.add_argument("--max-images", type=int, help="Limit the images timed")
+    args = parser.parse_args()
+
+    try:
+        config = Config(config_file=args.config) if args.config else Config()
+        quantizer = ModelQuantizer(config=config, weights_path=args.weights)
+        int8_path = quantizer.quantize(
+            calibration_images=args.calibration_images,
+            method=args.method,
+            data_yaml=args.data,
+        )
+        print(f"✅ INT8 model: {int8_path}")
+
+        if args.skip_eval:
+            return
+
+        # Compare against the FP32 ONNX model so only quantization differs
+        fp32 = evaluate(config, quantizer.fp32_path, args)
+        int8 = evaluate(config, int8_path, args)
+        parity = backend_parity(fp32, int8)
+
+        print("=== INT8 vs FP32 ===")
+        print(
+            f"mAP50:    {fp32['accuracy']['map50']:.4f} -> "
+            f"{int8['accuracy']['map50']:.4f} ({parity['map50_delta']:+.4f})"
+        )
+        print(
+            f"mAP50-95: {fp32['accuracy']['map50_95']:.4f} -> "
+            f"{int8['accuracy']['map50_95']:.4f} ({parity['map50_95_delta']:+.4f})"
+        )
+        if "speedup" in parity:
+            print(f"Speed:    x{parity['speedup']:.2f} images/sec")
+        print(f"Peak RSS: {fp32['peak_rss_mb']:.1f} MB -> {int8['peak_rss_mb']:.1f} MB")
+        print(
+            f"Size:     {quantizer.fp32_path.stat().st_size / 1024**2:.1f} MB -> "
+            f"{int8_path.stat().st_size / 1024**2:.1f} MB"
+        )
+        print("=" * 30)
+
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output = (
+            config.OUTPUT_PATH / "benchmarks" / f"{config.RUN_NAME}_int8_{stamp}.json"
+        )
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"fp32": fp32, "int8": int8, "parity": parity}, f, indent=2)
+        print(f"Report saved to: {output}")
+        print("Deploy it with 'backend: onnx_int8' in the prediction section")
+
+    except Exception as e:
+        print(f"❌ Quantization failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Long-running local inference service with dynamic micro-batching"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from config.settings import Config
+
+from src.inference_server import serve
+from src.instrumentation import add_metrics_arguments, finish_metrics, setup_metrics
+from src.predictor import YOLOPredictor
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve YOLO predictions over HTTP or a Unix socket",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Endpoints:
+  POST /predict[?source=name]  encoded image body -> detections JSON
+  GET  /metrics                Prometheus metrics (queue depth, batch size, ...)
+  GET  /health                 model path and queue depth
+""",
+    )
+    parser.add_argument("--config", type=str, help="Path to configuration YAML file")
+    parser.add_argument("--model", help="Path to model weights")
+    parser.add_argument("--host", help="HTTP bind address")
+    parser.add_argument("--port", type=int, help="HTTP port")
+    parser.add_argument("--socket", help="Serve on this Unix socket instead of TCP")
+    parser.add_argument(
+        "--max-batch", type=int, help="Requests coalesced into one inference batch"
+    )
+    parser.add_argument(
+        "--max-latency-ms",
+        type=float,
+        help="Longest a request waits for its batch to fill",
+    )
+
+    add_metrics_arguments(parser)
+
+    args = parser.parse_args()
+    setup_metrics(args)
+
+    try:
+        config = Config(config_file=args.config) if args.config else Config()
+        config.update_from_args(
+            server_max_batch=args.max_batch,
+            server_max_latency_ms=args.max_latency_ms,
+        )
+
+        # Warm up before accepting requests so the first batch is not slow
+        predictor = YOLOPredictor(config=config, model_path=args.model, warmup=True)
+        serve(
+            predictor, config, host=args.host, port=args.port, socket_path=args.socket
+        )
+
+    except Exception as e:
+        print(f"❌ Inference service failed: {e}")
+        sys.exit(1)
+    finally:
+        finish_metrics(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,11 @@
 """Training script for YOLO model with autocompletion support"""
 
 import argparse
+import os
+import subprocess
 import sys
 from pathlib import Path
 
-import torch
-
 # Add argcomplete import
 try:
     import argcomplete
@@ -21,6 +21,8 @@ sys.path.append(str(PROJECT_ROOT))
 
 from config.settings import Config
 
+from src.distributed import print_scaling_report
+from src.instrumentation import add_metrics_arguments, finish_metrics, setup_metrics
 from src.trainer import YOLOTrainer
 
 
@@ -54,6 +56,8 @@ def run_name_completer(prefix, parsed_args, **kwargs):
 
 def check_mps_availability():
     """Check and report MPS availability"""
+    import torch
+
     print("=== MPS Availability Check ===")
     print(f"PyTorch version: {torch.__version__}")
     print(f"MPS available: {torch.backends.mps.is_available()}")
@@ -69,6 +73,31 @@ def check_mps_availability():
     print("=" * 30)
 
 
+def launch_distributed(args):
+    """Re-run this script under torchrun, one training process per rank"""
+    env = os.environ.copy()
+    # Split this node's cores between its ranks unless set explicitly
+    cores = os.cpu_count() or 1
+    env.setdefault("OMP_NUM_THREADS", str(max(1, cores // args.nproc_per_node)))
+    command = [
+        sys.executable,
+        "-m",
+        "torch.distributed.run",
+        f"--nproc_per_node={args.nproc_per_node}",
+        f"--nnodes={args.nnodes}",
+        f"--node_rank={args.node_rank}",
+        f"--master_addr={args.master_addr}",
+        f"--master_port={args.master_port}",
+        str(Path(__file__).resolve()),
+        *sys.argv[1:],
+    ]
+    print(
+        f"🌐 Launching {args.nproc_per_node} CPU ranks on node {args.node_rank} "
+        f"of {args.nnodes} (gloo, master {args.master_addr}:{args.master_port})"
+    )
+    return subprocess.call(command, env=env)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Train YOLO model with MPS optimizations",
@@ -79,6 +108,10 @@ Examples:
   %(prog)s --config config/mps_optimized.yaml
   %(prog)s --device auto --optimize-for-mps
   %(prog)s --model yolo11n.pt --epochs 10 --device mps
+  %(prog)s --autotune
+  %(prog)s --nproc-per-node 4 --batch 64
+  %(prog)s --nproc-per-node 2 --nnodes 2 --node-rank 0 --master-addr 10.0.0.1
+  %(prog)s --scaling-report
         """,
     )
 
@@ -124,6 +157,18 @@ Examples:
         metavar="WORKERS",
     )
 
+    parser.add_argument(
+        "--no-image-cache",
+        action="store_true",
+        help="Decode training images from disk instead of the memory-mapped cache",
+    )
+
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Train on one image per near-duplicate group of the training split",
+    )
+
     parser.add_argument(
         "--amp", action="store_true", help="Enable Automatic Mixed Precision"
     )
@@ -145,23 +190,86 @@ Examples:
         help="Apply aggressive MPS optimizations",
     )
 
+    parser.add_argument(
+        "--autotune",
+        action="store_true",
+        help="Probe batch size, workers and threads on CPU first, save the "
+        "profile to config/autotune_<host>.yaml and train with it",
+    )
+
+    parser.add_argument(
+        "--nproc-per-node",
+        type=int,
+        help="Train data-parallel on CPU with this many processes on this node",
+    )
+
+    parser.add_argument(
+        "--nnodes", type=int, default=1, help="Number of nodes in distributed mode"
+    )
+
+    parser.add_argument(
+        "--node-rank", type=int, default=0, help="Rank of this node (0 is master)"
+    )
+
+    parser.add_argument(
+        "--master-addr", default="127.0.0.1", help="Address of the rank 0 node"
+    )
+
+    parser.add_argument(
+        "--master-port", type=int, default=29500, help="Port of the rank 0 node"
+    )
+
+    parser.add_argument(
+        "--scaling-report",
+        action="store_true",
+        help="Print epoch time against world size of past CPU runs and exit",
+    )
+
     parser.add_argument(
         "--verbose",
         action="store_true",
         help="Verbose output",
     )
 
+    add_metrics_arguments(parser)
+
     # Enable argcomplete if available
     if ARGCOMPLETE_AVAILABLE:
         argcomplete.autocomplete(parser)
 
     args = parser.parse_args()
 
+    # Every rank would run its own probe sweep on the same cores and could end
+    # up with a different batch size
+    if args.autotune and args.nproc_per_node:
+        parser.error(
+            "--autotune cannot be combined with --nproc-per-node; run "
+            "scripts/autotune.py first and pass the profile with --config"
+        )
+
     # Check MPS availability if requested
     if args.check_mps:
         check_mps_availability()
         return
 
+    if args.scaling_report:
+        config = Config(config_file=args.config) if args.config else Config()
+        report_path = config.OUTPUT_PATH / "benchmarks" / "ddp_scaling.json"
+        if not report_path.exists():
+            print(f"No scaling report yet: {report_path}")
+            sys.exit(1)
+        print_scaling_report(report_path)
+        return
+
+    # Inside torchrun workers LOCAL_RANK is set and training starts directly
+    if args.nproc_per_node and "LOCAL_RANK" not in os.environ:
+        sys.exit(launch_distributed(args))
+
+    # Heavy imports happen after argument parsing so --help and completion stay fast
+    import torch
+
+    setup_metrics(args)
+
     try:
         # Load configuration
         config = Config(config_file=args.config) if args.config else Config()
@@ -207,6 +315,29 @@ Examples:
             config.WORKERS = args.workers
         if args.amp is not None:
             config.AMP = args.amp
+        if args.no_image_cache:
+            config.IMAGE_CACHE = False
+        if args.dedup:
+            config.DEDUP_TRAINING = True
+        if args.nproc_per_node:
+            config.DEVICE = "cpu"
+            if not config.THREADS:
+                config.THREADS = int(os.environ.get("OMP_NUM_THREADS", 1))
+
+        # Tuned values override the batch/workers/device settings above
+        if args.autotune:
+            from src.autotune import ThroughputAutotuner
+
+            print("⏱️ Autotuning CPU training throughput...")
+            tuner = ThroughputAutotuner(config)
+            best = tuner.run()
+            tuner.apply(best)
+            profile, _ = tuner.save(best)
+            print(
+                f"   Batch {config.BATCH_SIZE}, workers {config.WORKERS}, "
+                f"threads {config.THREADS}: {best['images_per_sec']:.1f} images/sec"
+            )
+            print(f"   Profile saved to: {profile}")
 
         # Print final configuration
         if args.verbose:
@@ -253,6 +384,8 @@ Examples:
 
             traceback.print_exc()
         sys.exit(1)
+    finally:
+        finish_metrics(args)
 
 
 if __name__ == "__main__":
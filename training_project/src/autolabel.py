@@ -0,0 +1,305 @@
+# ===========================================
+# File: training_project/src/autolabel.py
+# ===========================================
+"""Auto-labeling of unlabeled pages with uncertainty-ranked review selection
+
+The trained weights label image folders and PDFs batch by batch and every
+page gets a YOLO label file. Pages are ranked by how unsure the model is
+(scores close to the labeling threshold) and, with a committee of further
+weights, by how much the models disagree. Only the most uncertain fraction
+is queued for review in Label Studio; the rest can go straight to training.
+"""
+
+import csv
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+
+from src.instrumentation import metrics
+from src.pdf_source import PDFPageSource
+from src.predictor import YOLOPredictor
+from src.tiling import pairwise_overlap
+from src.utils import IMAGE_SUFFIXES, setup_logging
+
+RANKING_FIELDS = [
+    "name",
+    "image",
+    "source",
+    "page",
+    "labels",
+    "confidence_uncertainty",
+    "disagreement",
+    "uncertainty",
+    "review",
+]
+
+
+def confidence_uncertainty(scores, conf):
+    """1 for a box scored right at the labeling threshold, 0 at 0 or 1
+
+    An image is as uncertain as its most uncertain candidate box.
+    """
+    if len(scores) == 0:
+        return 0.0
+    margin = np.abs(scores - conf) / max(conf, 1.0 - conf)
+    return float(1.0 - margin.min())
+
+
+def disagreement(a, b, conf, iou):
+    """1 - F1 between the labels of two records (same class and IoU >= iou)"""
+    keep_a = a.scores >= conf
+    keep_b = b.scores >= conf
+    boxes_a, classes_a = a.boxes[keep_a], a.classes[keep_a]
+    boxes_b, classes_b = b.boxes[keep_b], b.classes[keep_b]
+    total = len(boxes_a) + len(boxes_b)
+    if total == 0:
+        return 0.0
+
+    # Greedy matching in score order (records come sorted by score)
+    unmatched = np.ones(len(boxes_b), dtype=bool)
+    matches = 0
+    for box, cls in zip(boxes_a, classes_a):
+        candidates = unmatched & (classes_b == cls)
+        if not candidates.any():
+            continue
+        overlap = np.where(candidates, pairwise_overlap(box, boxes_b), 0.0)
+        best = int(overlap.argmax())
+        if overlap[best] >= iou:
+            unmatched[best] = False
+            matches += 1
+    return 1.0 - 2.0 * matches / total
+
+
+def yolo_lines(record, conf):
+    """YOLO label lines (class cx cy w h, normalized) for boxes scored >= conf"""
+    height, width = record.image_shape
+    keep = record.scores >= conf
+    boxes = record.boxes[keep]
+    scale = np.array([width, height, width, height], dtype=np.float32)
+    xyxy = np.clip(boxes / scale, 0.0, 1.0)
+    centers = (xyxy[:, :2] + xyxy[:, 2:]) / 2
+    sizes = xyxy[:, 2:] - xyxy[:, :2]
+    return [
+        f"{cls} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}"
+        for cls, (cx, cy), (w, h) in zip(record.classes[keep], centers, sizes)
+    ]
+
+
+class AutoLabeler:
+    """Label pages with the trained weights and rank them for human review"""
+
+    def __init__(self, config, model_path=None, committee=None):
+        self.logger = setup_logging()
+        self.config = config
+        committee = config.AUTOLABEL_COMMITTEE if committee is None else committee
+        # Every committee member stays resident next to the primary weights
+        config.MODEL_CACHE_SIZE = max(config.MODEL_CACHE_SIZE, 1 + len(committee))
+
+        self.predictor = YOLOPredictor(
+            config, model_path=model_path or config.get_weights_path(), warmup=False
+        )
+        self.committee = [
+            YOLOPredictor(config, model_path=path, warmup=False) for path in committee
+        ]
+
+    def _sources(self, source):
+        """(root, PDFs, image files) of a file or directory source"""
+        path = Path(source)
+        if not path.exists():
+            raise FileNotFoundError(f"Source not found: {source}")
+        if path.is_file():
+            if path.suffix.lower() == ".pdf":
+                return path.parent, [path], []
+            return path.parent, [], [path]
+        files = sorted(p for p in path.rglob("*") if p.is_file())
+        pdfs = [p for p in files if p.suffix.lower() == ".pdf"]
+        images = [p for p in files if p.suffix.lower() in IMAGE_SUFFIXES]
+        return path, pdfs, images
+
+    @staticmethod
+    def _item_name(path, root, page=None):
+        """Unique file stem for a page: relative path with '__' separators"""
+        stem = "__".join(path.relative_to(root).with_suffix("").parts)
+        return stem if page is None else f"{stem}_p{page:04d}"
+
+    def _image_batches(self, paths, root, batch_size, pool):
+        """Decode image files in the thread pool, one batch ahead of inference"""
+        import cv2
+
+        chunks = [paths[i : i + batch_size] for i in range(0, len(paths), batch_size)]
+        pending = [pool.submit(cv2.imread, str(p)) for p in chunks[0]] if chunks else []
+        for index, chunk in enumerate(chunks):
+            decoding = pending
+            if index + 1 < len(chunks):
+                pending = [pool.submit(cv2.imread, str(p)) for p in chunks[index + 1]]
+            items, images = [], []
+            for path, future in zip(chunk, decoding):
+                image = future.result()
+                if image is None:
+                    self.logger.warning(f"Could not read image: {path}")
+                    continue
+                items.append(
+                    {"name": self._item_name(path, root), "source": path, "page": None}
+                )
+                images.append(image)
+            if images:
+                yield items, images
+
+    def batches(self, source, batch_size, dpi, pool):
+        """Yield (items, images) batches of in-memory BGR pages of a source"""
+        root, pdfs, images = self._sources(source)
+        yield from self._image_batches(images, root, batch_size, pool)
+        for pdf in pdfs:
+            pages = PDFPageSource(
+                pdf,
+                dpi=dpi,
+                batch_size=batch_size,
+                prefetch=self.config.PREFETCH_BATCHES,
+            )
+            for indices, page_images in pages:
+                items = [
+                    {
+                        "name": self._item_name(pdf, root, page),
+                        "source": pdf,
+                        "page": page,
+                    }
+                    for page in indices
+                ]
+                yield items, page_images
+
+    def score(self, record, committee_records):
+        """(confidence uncertainty, committee disagreement, combined uncertainty)
+
+        A page is worth reviewing when either signal is high, so the combined
+        uncertainty is the larger of the two.
+        """
+        conf = self.config.AUTOLABEL_CONF
+        confidence = confidence_uncertainty(record.scores, conf)
+        if not committee_records:
+            return confidence, None, confidence
+        disagreements = [
+            disagreement(record, other, conf, self.config.AUTOLABEL_IOU)
+            for other in committee_records
+        ]
+        spread = float(np.mean(disagreements))
+        return confidence, spread, max(confidence, spread)
+
+    def _write(self, item, image, lines, images_dir, labels_dir):
+        """Write one page image and its label file"""
+        import cv2
+
+        name = item["name"]
+        if item["page"] is None:
+            target = images_dir / f"{name}{item['source'].suffix.lower()}"
+            try:
+                # Same filesystem: a hardlink avoids copying the image
+                os.link(item["source"], target)
+            except FileExistsError:
+                pass
+            except OSError:
+                shutil.copy2(item["source"], target)
+        else:
+            target = images_dir / f"{name}.{self.config.AUTOLABEL_IMAGE_FORMAT}"
+            if not cv2.imwrite(str(target), image):
+                raise IOError(f"Could not write image: {target}")
+        label = labels_dir / f"{name}.txt"
+        label.write_text("".join(f"{line}\n" for line in lines), encoding="utf-8")
+        return target
+
+    def run(self, source, output_dir, batch_size=None, dpi=None):
+        """Label every page of a source and write the review selection
+
+        Writes images/, labels/ and classes.txt (Label Studio's YOLO import
+        layout) plus ranking.csv sorted by uncertainty, review.txt with the
+        most uncertain pages and auto.txt with the rest. Returns the ranking.
+        """
+        output_dir = Path(output_dir)
+        images_dir = output_dir / "images"
+        labels_dir = output_dir / "labels"
+        images_dir.mkdir(parents=True, exist_ok=True)
+        labels_dir.mkdir(parents=True, exist_ok=True)
+
+        batch_size = batch_size or self.config.PREDICT_BATCH_SIZE
+        dpi = dpi or self.config.PDF_DPI
+        candidate_conf = self.config.AUTOLABEL_CANDIDATE_CONF
+        names = self.predictor.names
+        with open(output_dir / "classes.txt", "w", encoding="utf-8") as f:
+            f.writelines(f"{names[i]}\n" for i in sorted(names))
+
+        ranking = []
+        writers = max(1, self.config.AUTOLABEL_WRITERS)
+        with ThreadPoolExecutor(max_workers=writers) as pool:
+            in_flight = []
+            for items, images in self.batches(source, batch_size, dpi, pool):
+                sources = [str(item["source"]) for item in items]
+                pages = [item["page"] for item in items]
+                # Low threshold: boxes just below the labeling threshold are
+                # the uncertain ones
+                records = self.predictor.predict_images(
+                    images, conf=candidate_conf, sources=sources, pages=pages
+                )
+                committee_records = [
+                    member.predict_images(
+                        images, conf=candidate_conf, sources=sources, pages=pages
+                    )
+                    for member in self.committee
+                ]
+
+                # Keep at most two batches of images in memory
+                wait(in_flight)
+                in_flight = []
+                for index, (item, image, record) in enumerate(
+                    zip(items, images, records)
+                ):
+                    others = [member[index] for member in committee_records]
+                    confidence, spread, uncertainty = self.score(record, others)
+                    lines = yolo_lines(record, self.config.AUTOLABEL_CONF)
+                    future = pool.submit(
+                        self._write, item, image, lines, images_dir, labels_dir
+                    )
+                    in_flight.append(future)
+                    ranking.append(
+                        {
+                            "name": item["name"],
+                            "image": future,
+                            "source": str(item["source"]),
+                            "page": item["page"],
+                            "labels": len(lines),
+                            "confidence_uncertainty": round(confidence, 4),
+                            "disagreement": (
+                                None if spread is None else round(spread, 4)
+                            ),
+                            "uncertainty": round(uncertainty, 4),
+                        }
+                    )
+                metrics.count("autolabel_pages", len(items))
+                self.logger.info(f"Labeled {len(ranking)} pages")
+
+        for entry in ranking:
+            # Raises here if writing the page failed
+            entry["image"] = str(entry["image"].result())
+        ranking.sort(key=lambda entry: entry["uncertainty"], reverse=True)
+        self._write_selection(ranking, output_dir)
+        return ranking
+
+    def _write_selection(self, ranking, output_dir):
+        """ranking.csv plus review.txt / auto.txt image lists"""
+        fraction = self.config.AUTOLABEL_REVIEW_FRACTION
+        review_count = int(np.ceil(len(ranking) * fraction))
+        for index, entry in enumerate(ranking):
+            entry["review"] = index < review_count
+
+        with open(output_dir / "ranking.csv", "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=RANKING_FIELDS)
+            writer.writeheader()
+            writer.writerows(ranking)
+
+        for filename, entries in (
+            ("review.txt", ranking[:review_count]),
+            ("auto.txt", ranking[review_count:]),
+        ):
+            with open(output_dir / filename, "w", encoding="utf-8") as f:
+                f.writelines(f"{entry['image']}\n" for entry in entries)
@@ -0,0 +1,272 @@
+# ===========================================
+# File: training_project/src/autotune.py
+# ===========================================
+"""Throughput autotuning of batch size, dataloader workers and torch threads
+
+Every candidate is probed in a fresh process: a real ultralytics training run
+on the configured dataset that is stopped after a few timed batches. Fresh
+processes keep thread settings and peak memory of one probe from leaking into
+the next.
+"""
+
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import socket
+import tempfile
+import time
+from datetime import datetime
+
+from src.utils import setup_logging
+
+
+class _ProbeDone(Exception):
+    """Raised from a training callback once enough batches were timed"""
+
+
+def total_memory_bytes():
+    """Physical memory of this host"""
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+
+def _peak_rss_bytes(workers):
+    """Estimated peak RSS of a probe: the trainer plus its dataloader workers
+
+    RUSAGE_CHILDREN reports the largest single child, so the worker share is
+    estimated as workers times that peak.
+    """
+    # ru_maxrss is in kilobytes on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    child = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+    return own + workers * child
+
+
+def _probe_worker(config, candidate, warmup_batches, probe_batches, results):
+    """Run one probe; put its throughput and peak memory on the results queue"""
+    threads = candidate["threads"]
+    # Before torch is imported, so OpenMP picks it up as well
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+
+    try:
+        import torch
+        from ultralytics import YOLO
+
+        torch.set_num_threads(threads)
+        state = {"batches": 0, "images": 0, "start": None}
+
+        def on_train_batch_end(trainer):
+            state["batches"] += 1
+            if state["batches"] == warmup_batches:
+                state["start"] = time.perf_counter()
+            elif state["batches"] > warmup_batches:
+                state["images"] += trainer.batch_size
+            if state["batches"] >= warmup_batches + probe_batches:
+                raise _ProbeDone()
+
+        model_path = config.get_model_path()
+        model = YOLO(str(model_path) if model_path.exists() else config.MODEL_ARCH)
+        model.add_callback("on_train_batch_end", on_train_batch_end)
+
+        params = config.get_training_params()
+        params.update(
+            batch=candidate["batch"],
+            workers=candidate["workers"],
+            device="cpu",
+            # Enough epochs that small datasets still reach probe_batches
+            epochs=max(1000, params["epochs"]),
+            val=False,
+            plots=False,
+            save=False,
+            verbose=False,
+            resume=False,
+            project=tempfile.mkdtemp(prefix="autotune_"),
+            name="probe",
+        )
+        from ultralytics.models.yolo.detect import DetectionTrainer
+
+        from src.trainer import cpu_workers_trainer_class
+
+        trainer_class = DetectionTrainer
+        if config.IMAGE_CACHE and not config.CACHE:
+            from src.image_cache import cached_trainer_class
+
+            trainer_class = cached_trainer_class(
+                config.IMAGE_CACHE_PATH,
+                max_bytes=int(config.IMAGE_CACHE_MAX_GB * 1024**3),
+            )
+        # Without this ultralytics runs every CPU probe with 0 workers
+        params["trainer"] = cpu_workers_trainer_class(
+            trainer_class, candidate["workers"]
+        )
+
+        try:
+            model.train(**params)
+        except _ProbeDone:
+            pass
+        finally:
+            shutil.rmtree(params["project"], ignore_errors=True)
+        if state["start"] is None or not state["images"]:
+            raise RuntimeError("Dataset too small for the configured probe batches")
+
+        elapsed = time.perf_counter() - state["start"]
+        results.put(
+            {
+                "images_per_sec": state["images"] / elapsed,
+                "peak_rss_bytes": _peak_rss_bytes(candidate["workers"]),
+            }
+        )
+    except Exception as e:
+        results.put({"error": str(e)})
+
+
+class ThroughputAutotuner:
+    """Search the CPU training settings with the highest images/sec
+
+    The search is staged instead of a full grid: dataloader workers first,
+    then torch threads for the best worker count, then batch sizes in
+    ascending order until the memory ceiling is hit or throughput drops.
+    """
+
+    def __init__(self, config, memory_limit=None):
+        self.logger = setup_logging()
+        self.config = config
+        self.memory_limit = memory_limit or int(
+            total_memory_bytes() * config.AUTOTUNE_MEMORY_FRACTION
+        )
+        self.results = []
+
+    def thread_candidates(self, workers):
+        """Configured thread counts, or all cores / cores left by the workers"""
+        if self.config.AUTOTUNE_THREADS:
+            return list(self.config.AUTOTUNE_THREADS)
+        cores = os.cpu_count() or 1
+        candidates = {cores, max(1, cores - workers), max(1, cores // 2)}
+        return sorted(candidates, reverse=True)
+
+    def probe(self, batch, workers, threads):
+        """Time one candidate in a fresh process"""
+        candidate = {"batch": batch, "workers": workers, "threads": threads}
+        for result in self.results:
+            if result["candidate"] == candidate:
+                return result
+
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        process = context.Process(
+            target=_probe_worker,
+            args=(
+                self.config,
+                candidate,
+                self.config.AUTOTUNE_WARMUP_BATCHES,
+                self.config.AUTOTUNE_PROBE_BATCHES,
+                queue,
+            ),
+        )
+        start = time.perf_counter()
+        process.start()
+        try:
+            outcome = queue.get(timeout=self.config.AUTOTUNE_TIMEOUT)
+        except Exception:
+            # Killed (e.g. by the OOM killer) or timed out
+            exit_code = process.exitcode
+            outcome = {"error": f"probe did not finish (exit code {exit_code})"}
+        process.join(10)
+        if process.is_alive():
+            process.kill()
+
+        result = {"candidate": candidate, **outcome}
+        result["probe_seconds"] = round(time.perf_counter() - start, 1)
+        result["ok"] = (
+            "error" not in outcome and outcome["peak_rss_bytes"] <= self.memory_limit
+        )
+        self.results.append(result)
+
+        if "error" in outcome:
+            self.logger.warning(f"Probe {candidate} failed: {outcome['error']}")
+        else:
+            self.logger.info(
+                f"Probe {candidate}: {outcome['images_per_sec']:.1f} images/sec, "
+                f"peak {outcome['peak_rss_bytes'] / 1024**3:.2f} GB"
+                + ("" if result["ok"] else " (over memory limit)")
+            )
+        return result
+
+    def _best(self, results):
+        usable = [r for r in results if r["ok"]]
+        if not usable:
+            return None
+        return max(usable, key=lambda r: r["images_per_sec"])
+
+    def run(self):
+        """Probe the candidates and return the best result"""
+        batch_sizes = sorted(self.config.AUTOTUNE_BATCH_SIZES)
+        workers = sorted(self.config.AUTOTUNE_WORKERS)
+        # Stages 1 and 2 use a mid-sized batch, so memory rarely decides them
+        base_batch = batch_sizes[(len(batch_sizes) - 1) // 2]
+        cores = os.cpu_count() or 1
+
+        stage = [self.probe(base_batch, w, max(1, cores - w)) for w in workers]
+        best = self._best(stage)
+        if best is None:
+            raise RuntimeError("No worker setting finished within the memory limit")
+        best_workers = best["candidate"]["workers"]
+
+        stage = [
+            self.probe(base_batch, best_workers, t)
+            for t in self.thread_candidates(best_workers)
+        ]
+        best_threads = (self._best(stage) or best)["candidate"]["threads"]
+
+        stage = []
+        for batch in batch_sizes:
+            result = self.probe(batch, best_workers, best_threads)
+            stage.append(result)
+            if not result["ok"]:
+                break
+            previous = self._best(stage[:-1])
+            # Larger batches no longer pay off
+            if previous and result["images_per_sec"] < previous["images_per_sec"]:
+                break
+
+        return self._best(self.results)
+
+    def apply(self, best):
+        """Write the chosen settings into the config"""
+        candidate = best["candidate"]
+        self.config.DEVICE = "cpu"
+        self.config.BATCH_SIZE = candidate["batch"]
+        self.config.WORKERS = candidate["workers"]
+        self.config.THREADS = candidate["threads"]
+        return self.config
+
+    def default_profile_path(self):
+        """Per-host profile next to the other configs in training_project/config/"""
+        host = socket.gethostname().split(".")[0] or "host"
+        return self.config.PROJECT_ROOT / "config" / f"autotune_{host}.yaml"
+
+    def save(self, best, profile=None):
+        """Persist the applied config as a profile plus a JSON probe report
+
+        Returns (profile path, report path).
+        """
+        profile = profile or self.default_profile_path()
+        self.config.save_config(profile)
+
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        report = self.config.OUTPUT_PATH / "benchmarks" / f"autotune_{stamp}.json"
+        report.parent.mkdir(parents=True, exist_ok=True)
+        with open(report, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "host": socket.gethostname(),
+                    "memory_limit_bytes": self.memory_limit,
+                    "best": best,
+                    "probes": self.results,
+                    "profile": str(profile),
+                },
+                f,
+                indent=2,
+            )
+        return profile, report
@@ -0,0 +1,230 @@
+# ===========================================
+# File: training_project/src/cropper.py
+# ===========================================
+"""In-process cropping of detected regions
+
+Crops are NumPy views into the page arrays the detector ran on, so cutting
+them costs no copy. Encoding (PNG/JPEG/WebP, GIL released inside OpenCV)
+and the file writes run in a thread pool, and crop metadata is appended to
+crops.jsonl once per page instead of per crop.
+"""
+
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from src.instrumentation import metrics
+from src.pdf_source import PDFPageSource
+from src.utils import list_images
+
+CROP_FORMATS = ("png", "jpg", "webp")
+MANIFEST_FILE = "crops.jsonl"
+
+
+def crop_boxes(record, padding=0, min_size=1):
+    """Integer (N, 4) xyxy boxes grown by padding and clipped to the image
+
+    Returns (boxes, keep): keep marks detections whose clipped crop is at
+    least min_size pixels wide and high.
+    """
+    height, width = record.image_shape
+    boxes = np.rint(record.boxes).astype(np.int64)
+    boxes[:, :2] -= padding
+    boxes[:, 2:] += padding
+    boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, width)
+    boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, height)
+    sizes = boxes[:, 2:] - boxes[:, :2]
+    keep = (sizes >= min_size).all(axis=1)
+    return boxes, keep
+
+
+def crop_views(image, record, padding=0, min_size=1):
+    """(index, box, view) for every detection; views share memory with image"""
+    boxes, keep = crop_boxes(record, padding, min_size)
+    return [
+        (int(i), (x1, y1, x2, y2), image[y1:y2, x1:x2])
+        for i, (x1, y1, x2, y2) in zip(np.flatnonzero(keep), boxes[keep].tolist())
+    ]
+
+
+def _encode_params(fmt, quality):
+    import cv2
+
+    if fmt == "jpg":
+        return [cv2.IMWRITE_JPEG_QUALITY, quality]
+    if fmt == "webp":
+        return [cv2.IMWRITE_WEBP_QUALITY, quality]
+    # Fast PNG compression: crops are written far more often than read
+    return [cv2.IMWRITE_PNG_COMPRESSION, 1]
+
+
+class CropWriter:
+    """Encode and write detection crops in a thread pool
+
+    add() queues the crops of one page and returns immediately; at most
+    max_pending crops (and the pages they view into) are held in memory.
+    Use as a context manager or call close() to wait for all writes. The
+    manifest of an earlier run into the same directory is replaced.
+    """
+
+    def __init__(
+        self,
+        output_dir,
+        names=None,
+        fmt="png",
+        quality=95,
+        padding=0,
+        min_size=1,
+        classes=None,
+        workers=8,
+        max_pending=1024,
+    ):
+        if fmt not in CROP_FORMATS:
+            raise ValueError(
+                f"Unknown crop format '{fmt}' (expected one of: "
+                f"{', '.join(CROP_FORMATS)})"
+            )
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.names = names or {}
+        self.fmt = fmt
+        self.params = _encode_params(fmt, quality)
+        self.padding = padding
+        self.min_size = min_size
+        self.classes = set(classes) if classes else None
+        self.max_pending = max_pending
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers))
+        self.pending = deque()
+        self.manifest = open(self.output_dir / MANIFEST_FILE, "w", encoding="utf-8")
+        self.count = 0
+        self._class_dirs = {}
+
+    def _class_dir(self, cls):
+        directory = self._class_dirs.get(cls)
+        if directory is None:
+            directory = self.output_dir / str(self.names.get(cls, cls))
+            directory.mkdir(parents=True, exist_ok=True)
+            self._class_dirs[cls] = directory
+        return directory
+
+    def _encode(self, view, path):
+        import cv2
+
+        ok, buffer = cv2.imencode(f".{self.fmt}", view, self.params)
+        if not ok:
+            raise IOError(f"Could not encode crop: {path}")
+        with open(path, "wb") as f:
+            f.write(buffer)
+        return path
+
+    def add(self, image, record, name=None):
+        """Queue the crops of one page; returns the number of crops queued
+
+        name is the unique file stem of the page (default: the source's stem).
+        """
+        stem = name or Path(record.source).stem
+        if record.page is not None:
+            stem = f"{stem}_p{record.page:04d}"
+        lines = []
+        for index, box, view in crop_views(image, record, self.padding, self.min_size):
+            cls = int(record.classes[index])
+            if self.classes is not None and cls not in self.classes:
+                continue
+            path = self._class_dir(cls) / f"{stem}_{index:03d}.{self.fmt}"
+            self.pending.append(self.pool.submit(self._encode, view, path))
+            lines.append(
+                json.dumps(
+                    {
+                        "crop": str(path.relative_to(self.output_dir)),
+                        "source": record.source,
+                        "page": record.page,
+                        "class_id": cls,
+                        "class_name": self.names.get(cls, str(cls)),
+                        "score": float(record.scores[index]),
+                        "box": list(box),
+                    }
+                )
+            )
+        # Metadata of a page goes out in a single write
+        if lines:
+            self.manifest.write("\n".join(lines) + "\n")
+        self.count += len(lines)
+        metrics.count("crops", len(lines))
+
+        while len(self.pending) > self.max_pending:
+            self.pending.popleft().result()
+        return len(lines)
+
+    def close(self):
+        """Wait for all queued crops; raises if one of them failed"""
+        try:
+            while self.pending:
+                self.pending.popleft().result()
+        finally:
+            self.pool.shutdown(wait=True)
+            self.manifest.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _item_name(path, root):
+    """Unique file stem for an image: relative path with '__' separators"""
+    return "__".join(path.relative_to(root).with_suffix("").parts)
+
+
+def crop_source(predictor, source, writer, conf=None, dpi=None, batch=None):
+    """Detect on every page of an image/PDF source and crop the detections
+
+    Pages stay in memory between detection and cropping; nothing is written
+    besides the crops. Returns the number of pages processed.
+    """
+    import cv2
+
+    config = predictor.config
+    batch = batch or config.PREDICT_BATCH_SIZE
+
+    def pdf_batches():
+        for indices, images in PDFPageSource(
+            source,
+            dpi=dpi or config.PDF_DPI,
+            batch_size=batch,
+            prefetch=config.PREFETCH_BATCHES,
+        ):
+            records = predictor.predict_images(
+                images,
+                conf=conf,
+                sources=[str(source)] * len(images),
+                pages=indices,
+                mode="pdf",
+            )
+            yield images, records, [None] * len(images)
+
+    def image_batches():
+        # Same-named images in different subfolders must not share crop names
+        root = Path(source) if Path(source).is_dir() else Path(source).parent
+        paths = list_images(source)
+        for start in range(0, len(paths), batch):
+            chunk = paths[start : start + batch]
+            images = [cv2.imread(str(path)) for path in chunk]
+            readable = [i for i, image in enumerate(images) if image is not None]
+            images = [images[i] for i in readable]
+            sources = [str(chunk[i]) for i in readable]
+            records = predictor.predict_images(images, conf=conf, sources=sources)
+            yield images, records, [_item_name(chunk[i], root) for i in readable]
+
+    is_pdf = str(source).lower().endswith(".pdf")
+    batches = pdf_batches() if is_pdf else image_batches()
+    pages = 0
+    for images, records, names in batches:
+        for image, record, name in zip(images, records, names):
+            with metrics.span("crop"):
+                writer.add(image, record, name)
+        pages += len(images)
+    return pages
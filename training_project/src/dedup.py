@@ -0,0 +1,293 @@
+# ===========================================
+# File: training_project/src/dedup.py
+# ===========================================
+"""Near-duplicate detection with perceptual hashes and a BK-tree
+
+Datasheet families repeat the same package drawings and pinout pages, so
+datasets and inference queues hold many near-identical pages. Every image
+gets a 64-bit DCT perceptual hash (computed for whole batches at once) and
+images within a small Hamming distance of an earlier one count as copies.
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+# Images are reduced to HASH_INPUT x HASH_INPUT before the DCT; the lowest
+# HASH_SIZE x HASH_SIZE frequencies make up the 64-bit hash
+HASH_INPUT = 32
+HASH_SIZE = 8
+HASHES_FILE = "hashes.json"
+
+
+def _dct_matrix(n):
+    """Orthonormal DCT-II basis as an (n, n) matrix"""
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    basis = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    basis[0] /= np.sqrt(2.0)
+    return basis.astype(np.float32)
+
+
+_DCT = _dct_matrix(HASH_INPUT)
+_BIT_WEIGHTS = np.left_shift(
+    np.uint64(1), np.arange(HASH_SIZE * HASH_SIZE, dtype=np.uint64)
+)[::-1]
+
+
+def reduce_image(image):
+    """Grayscale HASH_INPUT x HASH_INPUT float32 thumbnail of a BGR or gray image"""
+    import cv2
+
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    thumbnail = cv2.resize(
+        image, (HASH_INPUT, HASH_INPUT), interpolation=cv2.INTER_AREA
+    )
+    return thumbnail.astype(np.float32)
+
+
+def phash_batch(thumbnails):
+    """64-bit perceptual hashes of a stack of (N, 32, 32) thumbnails
+
+    One batched matrix product computes the 2D DCT of all thumbnails; a bit
+    is set where a low frequency lies above the median of the 8x8 block
+    (DC term excluded, it only reflects overall brightness).
+    """
+    thumbnails = np.asarray(thumbnails, dtype=np.float32)
+    if len(thumbnails) == 0:
+        return []
+    dct = _DCT @ thumbnails @ _DCT.T
+    low = dct[:, :HASH_SIZE, :HASH_SIZE].reshape(len(thumbnails), -1)
+    medians = np.median(low[:, 1:], axis=1, keepdims=True)
+    bits = (low > medians).astype(np.uint64)
+    return [int(value) for value in (bits * _BIT_WEIGHTS).sum(axis=1)]
+
+
+def phash_images(images):
+    """Perceptual hashes of in-memory images"""
+    return phash_batch([reduce_image(image) for image in images])
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """Burkhard-Keller tree over hashes under the Hamming distance
+
+    Queries only descend into children whose edge distance lies within the
+    radius of the query distance (triangle inequality), so lookups touch a
+    small part of the tree for small radii.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, value, item):
+        """Insert a hash with an attached item"""
+        node = [value, item, {}]
+        self.size += 1
+        if self.root is None:
+            self.root = node
+            return
+        current = self.root
+        while True:
+            distance = hamming(value, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def search(self, value, radius):
+        """(distance, item) of all hashes within radius, closest first"""
+        if self.root is None:
+            return []
+        found = []
+        stack = [self.root]
+        while stack:
+            node_value, item, children = stack.pop()
+            distance = hamming(value, node_value)
+            if distance <= radius:
+                found.append((distance, item))
+            for edge, child in children.items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return sorted(found, key=lambda match: match[0])
+
+    def nearest(self, value, radius):
+        """Item of the closest hash within radius, or None"""
+        matches = self.search(value, radius)
+        return matches[0][1] if matches else None
+
+
+def find_duplicates(hashes, threshold, reference=()):
+    """Map each duplicate index to the index of the image it duplicates
+
+    Images are visited in order; the first of a group is kept. Hashes in
+    reference (e.g. the validation split) are never dropped themselves, and
+    images duplicating them are dropped and mapped to ("reference", index).
+    """
+    tree = BKTree()
+    for index, value in enumerate(reference):
+        tree.add(value, ("reference", index))
+    duplicates = {}
+    for index, value in enumerate(hashes):
+        original = tree.nearest(value, threshold)
+        if original is None:
+            tree.add(value, index)
+        else:
+            duplicates[index] = original
+    return duplicates
+
+
+class HashStore:
+    """Perceptual hashes of image files, recomputed only for changed files"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.path = self.root / HASHES_FILE
+        self.entries = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def _stamp(path):
+        stat = path.stat()
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def hashes(self, paths, workers=None):
+        """Hashes of image files in order; new files are decoded in a thread pool"""
+        import cv2
+
+        def thumbnail(path):
+            # Reduced decoding skips most of the IDCT work for large pages
+            image = cv2.imread(str(path), cv2.IMREAD_REDUCED_GRAYSCALE_2)
+            if image is None:
+                raise ValueError(f"Could not read image: {path}")
+            return reduce_image(image)
+
+        paths = [Path(p) for p in paths]
+        stamps = [self._stamp(p) for p in paths]
+        missing = [
+            i
+            for i, (path, stamp) in enumerate(zip(paths, stamps))
+            if self.entries.get(str(path), [None, None])[:2] != stamp
+        ]
+        if missing:
+            with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+                thumbnails = list(pool.map(thumbnail, [paths[i] for i in missing]))
+            for i, value in zip(missing, phash_batch(thumbnails)):
+                self.entries[str(paths[i])] = [*stamps[i], value]
+            self.save()
+        return [self.entries[str(path)][2] for path in paths]
+
+    def save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+
+def dedup_dataset(data_yaml, output_dir, threshold, split="train", reference="val"):
+    """Write a data.yaml whose split lists only one image per near-duplicate group
+
+    Images of the split that duplicate a reference-split image are dropped
+    as well, so near-copies of validation pages do not leak into training.
+    The original dataset is left untouched. Returns (yaml path, kept, dropped).
+    """
+    from src.evaluator import split_images
+
+    data_yaml = Path(data_yaml)
+    output_dir = Path(output_dir)
+    with open(data_yaml, "r") as f:
+        data = yaml.safe_load(f)
+
+    store = HashStore(output_dir)
+    images = split_images(data_yaml, split)
+    reference_hashes = []
+    if reference and data.get(reference):
+        reference_hashes = store.hashes(split_images(data_yaml, reference))
+    duplicates = find_duplicates(store.hashes(images), threshold, reference_hashes)
+    kept = [str(path.resolve()) for i, path in enumerate(images) if i not in duplicates]
+
+    # Named after the dataset and the settings, so runs share the same list
+    digest = hashlib.sha256(
+        f"{data_yaml.resolve()}|{split}|{reference}|{threshold}".encode("utf-8")
+    ).hexdigest()[:12]
+    list_path = output_dir / f"{split}_{digest}.txt"
+    with open(list_path, "w", encoding="utf-8") as f:
+        f.writelines(f"{path}\n" for path in kept)
+
+    root = Path(data.get("path") or data_yaml.parent)
+    if not root.is_absolute():
+        root = (data_yaml.parent / root).resolve()
+    pruned = {**data, "path": str(root), split: str(list_path)}
+    pruned_yaml = output_dir / f"data_{digest}.yaml"
+    with open(pruned_yaml, "w") as f:
+        yaml.dump(pruned, f, default_flow_style=False, sort_keys=False)
+    return pruned_yaml, len(kept), len(duplicates)
+
+
+class DuplicatePageIndex:
+    """Detections of recently seen pages, looked up by exact perceptual hash
+
+    Unlike training-set pruning, inference only reuses detections of pages
+    with an identical hash: within the pruning threshold, text pages sharing
+    a layout would get each other's boxes. At most max_size pages are kept,
+    least recently used first out.
+    """
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, value):
+        record = self.entries.get(value)
+        if record is not None:
+            self.entries.move_to_end(value)
+        return record
+
+    def add(self, value, record):
+        self.entries[value] = record
+        self.entries.move_to_end(value)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+
+def reuse_record(record, source, page, image_shape):
+    """Detections of a duplicate page, rescaled to this page's size"""
+    height, width = image_shape
+    scale = np.array(
+        [
+            width / record.image_shape[1],
+            height / record.image_shape[0],
+            width / record.image_shape[1],
+            height / record.image_shape[0],
+        ],
+        dtype=np.float32,
+    )
+    return replace(
+        record,
+        source=str(source),
+        page=page,
+        boxes=record.boxes * scale,
+        image_shape=(int(height), int(width)),
+    )
@@ -0,0 +1,73 @@
+# ===========================================
+# File: training_project/src/detection_cache.py
+# ===========================================
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from src.detections import DetectionRecord
+
+
+def model_key(model_path, inference_params):
+    """Identify a model version plus the settings that change its detections"""
+    path = Path(model_path).resolve()
+    params = {k: v for k, v in inference_params.items() if k != "verbose"}
+    key_data = {
+        "model": str(path),
+        "mtime_ns": path.stat().st_mtime_ns,
+        "params": params,
+    }
+    encoded = json.dumps(key_data, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class DetectionPageCache:
+    """Per-page detections keyed by page fingerprint and model key"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _path(self, key, fingerprint):
+        return self.root / key / fingerprint[:2] / f"{fingerprint}.npz"
+
+    def get(self, key, fingerprint, source=None, page=None):
+        """Return the cached DetectionRecord for a page or None"""
+        path = self._path(key, fingerprint)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                return DetectionRecord(
+                    source=str(source),
+                    boxes=data["boxes"],
+                    classes=data["classes"],
+                    scores=data["scores"],
+                    image_shape=tuple(int(v) for v in data["image_shape"]),
+                    page=page,
+                )
+        except (OSError, ValueError, KeyError):
+            path.unlink(missing_ok=True)
+            return None
+
+    def put(self, key, fingerprint, record):
+        """Store a page's detections atomically"""
+        path = self._path(key, fingerprint)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(suffix=".npz", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    boxes=record.boxes,
+                    classes=record.classes,
+                    scores=record.scores,
+                    image_shape=np.asarray(record.image_shape, dtype=np.int32),
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
@@ -0,0 +1,201 @@
+# ===========================================
+# File: training_project/src/detection_store.py
+# ===========================================
+"""Append-only store of detections as chunked NumPy structured arrays
+
+Layout of a store directory:
+
+- ``chunk_000000.npy`` ...  DETECTION_DTYPE rows, one file per flushed chunk
+- ``documents.json``        document names; row["document"] indexes this list
+
+Chunks are plain ``.npy`` files, so they are opened with ``mmap_mode="r"``
+and only the pages of the columns a query touches are ever read.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+DETECTION_DTYPE = np.dtype(
+    [
+        ("document", np.uint32),
+        ("page", np.int32),  # -1 for image sources
+        ("class_id", np.int16),
+        ("score", np.float32),
+        ("x1", np.float32),
+        ("y1", np.float32),
+        ("x2", np.float32),
+        ("y2", np.float32),
+        ("width", np.uint16),  # size of the predicted image / rendered page
+        ("height", np.uint16),
+    ]
+)
+
+DOCUMENTS_FILE = "documents.json"
+CHUNK_PATTERN = "chunk_*.npy"
+
+# Rows per chunk file; about 36 MB with DETECTION_DTYPE
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+
+def _chunk_paths(root):
+    return sorted(Path(root).glob(CHUNK_PATTERN))
+
+
+def _load_documents(root):
+    path = Path(root) / DOCUMENTS_FILE
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _atomic_write(path, write, suffix):
+    fd, tmp_path = tempfile.mkstemp(suffix=suffix, dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+class DetectionSink:
+    """Append DetectionRecords to a detection store
+
+    Rows are buffered and written as one chunk file every chunk_rows
+    detections; close() flushes the rest. A store has a single writer at a
+    time, later sinks on the same directory append new chunks.
+    """
+
+    def __init__(self, root, chunk_rows=DEFAULT_CHUNK_ROWS):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.chunk_rows = chunk_rows
+        self.documents = _load_documents(self.root)
+        self._document_ids = {name: i for i, name in enumerate(self.documents)}
+        existing = _chunk_paths(self.root)
+        self._next_chunk = int(existing[-1].stem.split("_")[1]) + 1 if existing else 0
+        self._buffer = []
+        self._buffered = 0
+        self.rows_written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def document_id(self, name):
+        """Id of a document, registering new documents"""
+        name = str(name)
+        if name not in self._document_ids:
+            self._document_ids[name] = len(self.documents)
+            self.documents.append(name)
+        return self._document_ids[name]
+
+    def append(self, record):
+        """Buffer the detections of one DetectionRecord"""
+        document = self.document_id(record.source)
+        if not len(record):
+            return
+        rows = np.empty(len(record), dtype=DETECTION_DTYPE)
+        rows["document"] = document
+        rows["page"] = -1 if record.page is None else record.page
+        rows["class_id"] = record.classes
+        rows["score"] = record.scores
+        for i, column in enumerate(("x1", "y1", "x2", "y2")):
+            rows[column] = record.boxes[:, i]
+        height, width = record.image_shape[:2]
+        rows["width"] = width
+        rows["height"] = height
+
+        self._buffer.append(rows)
+        self._buffered += len(rows)
+        if self._buffered >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        """Write buffered rows as a new chunk file and persist the document list"""
+        if self._buffer:
+            rows = np.concatenate(self._buffer)
+            path = self.root / f"chunk_{self._next_chunk:06d}.npy"
+            _atomic_write(path, lambda f: np.save(f, rows), ".npy")
+            self._next_chunk += 1
+            self.rows_written += len(rows)
+            self._buffer, self._buffered = [], 0
+
+        encoded = json.dumps(self.documents).encode("utf-8")
+        _atomic_write(self.root / DOCUMENTS_FILE, lambda f: f.write(encoded), ".json")
+
+    def close(self):
+        self.flush()
+
+
+class DetectionStore:
+    """Read side of a detection store; chunks are memory-mapped, never loaded"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        if not self.root.exists():
+            raise FileNotFoundError(f"Detection store not found: {self.root}")
+        self.documents = _load_documents(self.root)
+        self._document_ids = {name: i for i, name in enumerate(self.documents)}
+        self.chunks = [np.load(path, mmap_mode="r") for path in _chunk_paths(root)]
+
+    def __len__(self):
+        return sum(len(chunk) for chunk in self.chunks)
+
+    def document_id(self, name):
+        if str(name) not in self._document_ids:
+            raise KeyError(f"Unknown document: {name}")
+        return self._document_ids[str(name)]
+
+    def column(self, name):
+        """One column over all chunks (the only step that copies data)"""
+        if not self.chunks:
+            return np.zeros(0, dtype=DETECTION_DTYPE[name])
+        return np.concatenate([chunk[name] for chunk in self.chunks])
+
+    def select(self, document=None, page=None, class_id=None, min_score=None):
+        """Rows matching all given filters, as a regular (copied) structured array"""
+        document = None if document is None else self.document_id(document)
+        selected = []
+        for chunk in self.chunks:
+            mask = np.ones(len(chunk), dtype=bool)
+            if document is not None:
+                mask &= chunk["document"] == document
+            if page is not None:
+                mask &= chunk["page"] == page
+            if class_id is not None:
+                mask &= chunk["class_id"] == class_id
+            if min_score is not None:
+                mask &= chunk["score"] >= min_score
+            selected.append(chunk[mask])
+        if not selected:
+            return np.zeros(0, dtype=DETECTION_DTYPE)
+        return np.concatenate(selected)
+
+    def class_counts(self, min_score=None):
+        """Detections per class id {class_id: count}"""
+        counts = {}
+        for chunk in self.chunks:
+            class_ids = chunk["class_id"]
+            if min_score is not None:
+                class_ids = class_ids[chunk["score"] >= min_score]
+            values, n = np.unique(class_ids, return_counts=True)
+            for value, count in zip(values.tolist(), n.tolist()):
+                counts[value] = counts.get(value, 0) + count
+        return counts
+
+    def summary(self):
+        """Row, chunk and document counts"""
+        return {
+            "detections": len(self),
+            "chunks": len(self.chunks),
+            "documents": len(self.documents),
+        }
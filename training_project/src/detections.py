@@ -0,0 +1,67 @@
+# ===========================================
+# File: training_project/src/detections.py
+# ===========================================
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class DetectionRecord:
+    """Compact per-image detection result detached from ultralytics objects"""
+
+    source: str
+    boxes: np.ndarray  # (N, 4) float32, xyxy in original image pixels
+    classes: np.ndarray  # (N,) int32
+    scores: np.ndarray  # (N,) float32
+    image_shape: Tuple[int, int]  # (height, width) of the original image
+    page: Optional[int] = None
+
+    def __len__(self):
+        return len(self.scores)
+
+    @classmethod
+    def empty(cls, source, image_shape, page=None):
+        """Record for an image without detections"""
+        return cls(
+            source=str(source),
+            boxes=np.zeros((0, 4), dtype=np.float32),
+            classes=np.zeros(0, dtype=np.int32),
+            scores=np.zeros(0, dtype=np.float32),
+            image_shape=tuple(image_shape),
+            page=page,
+        )
+
+    @classmethod
+    def from_result(cls, result, source=None, page=None):
+        """Extract boxes, classes and scores from an ultralytics Results object"""
+        boxes = result.boxes
+        # Copy into small standalone arrays so the result (and its image) can be freed
+        return cls(
+            source=str(source if source is not None else result.path),
+            boxes=boxes.xyxy.cpu().numpy().astype(np.float32, copy=True),
+            classes=boxes.cls.cpu().numpy().astype(np.int32, copy=True),
+            scores=boxes.conf.cpu().numpy().astype(np.float32, copy=True),
+            image_shape=tuple(int(v) for v in result.orig_shape),
+            page=page,
+        )
+
+    def to_dict(self, names=None):
+        """JSON-serialisable representation, optionally with class names"""
+        detections = []
+        for box, cls, score in zip(self.boxes, self.classes, self.scores):
+            detection = {
+                "class_id": int(cls),
+                "score": float(score),
+                "box": [float(v) for v in box],
+            }
+            if names is not None:
+                detection["class_name"] = names.get(int(cls), str(cls))
+            detections.append(detection)
+        return {
+            "source": self.source,
+            "page": self.page,
+            "image_shape": list(self.image_shape),
+            "detections": detections,
+        }
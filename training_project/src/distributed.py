@@ -0,0 +1,164 @@
+# ===========================================
+# File: training_project/src/distributed.py
+# ===========================================
+"""Data-parallel training on CPU nodes with torch DDP over the gloo backend
+
+Processes are started by torchrun (scripts/train.py --nproc-per-node ...),
+which sets RANK, LOCAL_RANK and WORLD_SIZE. ultralytics only implements DDP
+for CUDA devices, so the trainer class returned by distributed_trainer_class
+sets up the process group with gloo and wraps the model without device ids.
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Seconds the ranks wait for each other (dataset caching can take a while)
+PROCESS_GROUP_TIMEOUT = 3 * 3600
+
+
+def is_distributed():
+    """True inside a torchrun worker with more than one process"""
+    return "LOCAL_RANK" in os.environ and world_size() > 1
+
+
+def world_size():
+    return int(os.environ.get("WORLD_SIZE", 1))
+
+
+def rank():
+    return int(os.environ.get("RANK", -1))
+
+
+def is_main_process():
+    """Rank 0 of a distributed run, or any single-process run"""
+    return rank() in (-1, 0)
+
+
+def init_process_group():
+    """Join the gloo process group once; later calls are no-ops"""
+    import torch.distributed as dist
+
+    if not dist.is_initialized():
+        dist.init_process_group(
+            backend="gloo",
+            timeout=timedelta(seconds=PROCESS_GROUP_TIMEOUT),
+            rank=rank(),
+            world_size=world_size(),
+        )
+    return dist
+
+
+def broadcast_object(value):
+    """Rank 0's value on every rank"""
+    dist = init_process_group()
+    values = [value]
+    dist.broadcast_object_list(values, src=0)
+    return values[0]
+
+
+def distributed_trainer_class(base):
+    """Subclass of an ultralytics trainer class that runs DDP on CPU with gloo"""
+    import torch
+    from torch import nn
+
+    class CPUDistributedDataParallel(nn.parallel.DistributedDataParallel):
+        """DDP wrapper dropping the CUDA device ids ultralytics passes"""
+
+        def __init__(self, module, device_ids=None, **kwargs):
+            super().__init__(module, device_ids=None, **kwargs)
+
+    class DistributedTrainer(base):
+        def train(self):
+            # ultralytics derives the world size from CUDA device lists only
+            self._do_train(world_size())
+
+        def _setup_ddp(self, world_size):
+            init_process_group()
+            self.device = torch.device("cpu")
+
+        def _setup_train(self, *args, **kwargs):
+            # ultralytics wraps the model with nn.parallel.DistributedDataParallel;
+            # swap the class only while it does, so other DDP users are unaffected
+            original = nn.parallel.DistributedDataParallel
+            nn.parallel.DistributedDataParallel = CPUDistributedDataParallel
+            try:
+                return super()._setup_train(*args, **kwargs)
+            finally:
+                nn.parallel.DistributedDataParallel = original
+
+    return DistributedTrainer
+
+
+# ---------------------------------------------------------------- scaling report
+
+
+def record_scaling(report_path, run_name, world, epoch_seconds, images_per_epoch):
+    """Add one run's epoch times to the scaling report (rank 0 only)"""
+    report_path = Path(report_path)
+    report = {"runs": []}
+    if report_path.exists():
+        with open(report_path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+
+    mean_epoch = sum(epoch_seconds) / len(epoch_seconds)
+    report["runs"] = [
+        r
+        for r in report["runs"]
+        if not (r["run"] == run_name and r["world_size"] == world)
+    ]
+    report["runs"].append(
+        {
+            "run": run_name,
+            "world_size": world,
+            "epochs": len(epoch_seconds),
+            "mean_epoch_seconds": round(mean_epoch, 3),
+            "images_per_sec": round(images_per_epoch / mean_epoch, 2),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        }
+    )
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def scaling_table(report):
+    """Epoch time, speedup and efficiency per world size, relative to the smallest"""
+    by_world = {}
+    for run in report["runs"]:
+        # The latest run of each world size is representative
+        by_world[run["world_size"]] = run
+    if not by_world:
+        return []
+
+    base = by_world[min(by_world)]
+    rows = []
+    for world in sorted(by_world):
+        run = by_world[world]
+        speedup = base["mean_epoch_seconds"] / run["mean_epoch_seconds"]
+        rows.append(
+            {
+                "world_size": world,
+                "mean_epoch_seconds": run["mean_epoch_seconds"],
+                "images_per_sec": run["images_per_sec"],
+                "speedup": round(speedup, 2),
+                "efficiency": round(speedup * base["world_size"] / world, 2),
+            }
+        )
+    return rows
+
+
+def print_scaling_report(report_path):
+    with open(report_path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    print("=== DDP Scaling ===")
+    print(f"{'world':>5}  {'epoch s':>9}  {'images/s':>9}  {'speedup':>7}  {'eff.':>5}")
+    for row in scaling_table(report):
+        speedup = f"x{row['speedup']:.2f}"
+        print(
+            f"{row['world_size']:>5}  {row['mean_epoch_seconds']:>9.1f}  "
+            f"{row['images_per_sec']:>9.1f}  {speedup:>7}  {row['efficiency']:>5.0%}"
+        )
+    print("=" * 30)
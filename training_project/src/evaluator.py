@@ -0,0 +1,270 @@
+# ===========================================
+# File: training_project/src/evaluator.py
+# ===========================================
+import multiprocessing
+import platform
+import queue
+import resource
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import yaml
+from config.settings import get_default_config
+
+from src.exporter import backend_for_path, check_backend
+from src.utils import IMAGE_SUFFIXES, setup_logging
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB
+
+    The peak never drops during a process' lifetime; use run_isolated() to
+    compare the memory of several models.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    if sys.platform == "darwin":
+        return peak / 1024**2
+    return peak / 1024
+
+
+def latency_summary(latencies):
+    """p50/p95/p99/mean latency in milliseconds"""
+    latencies_ms = np.asarray(latencies, dtype=np.float64) * 1000.0
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+        "mean": round(float(latencies_ms.mean()), 3),
+    }
+
+
+def split_images(data_yaml, split="val"):
+    """List the image files of a dataset split from a YOLO data.yaml"""
+    with open(data_yaml, "r") as f:
+        data = yaml.safe_load(f)
+
+    root = Path(data.get("path") or Path(data_yaml).parent)
+    if not root.is_absolute():
+        root = Path(data_yaml).parent / root
+
+    entries = data.get(split)
+    if entries is None:
+        raise ValueError(f"Split '{split}' not defined in {data_yaml}")
+
+    images = []
+    for entry in entries if isinstance(entries, list) else [entries]:
+        path = Path(entry) if Path(entry).is_absolute() else root / entry
+        if path.is_dir():
+            images.extend(
+                p for p in sorted(path.rglob("*")) if p.suffix.lower() in IMAGE_SUFFIXES
+            )
+        elif path.suffix == ".txt":
+            with open(path, "r") as f:
+                images.extend(root / line.strip() for line in f if line.strip())
+        else:
+            images.append(path)
+    return images
+
+
+def backend_parity(baseline, report):
+    """Speed and accuracy of a backend report relative to a baseline report"""
+    parity = {}
+    if baseline.get("speed") and report.get("speed"):
+        base_speed, speed = baseline["speed"], report["speed"]
+        parity["speedup"] = round(
+            speed["images_per_sec"] / base_speed["images_per_sec"], 3
+        )
+        parity["p50_latency_ratio"] = round(
+            speed["latency_ms"]["p50"] / base_speed["latency_ms"]["p50"], 3
+        )
+    if baseline.get("accuracy") and report.get("accuracy"):
+        for key in ("map50", "map50_95", "precision", "recall"):
+            delta = report["accuracy"][key] - baseline["accuracy"][key]
+            parity[f"{key}_delta"] = round(delta, 4)
+    return parity
+
+
+class YOLOEvaluator:
+    """Accuracy and throughput benchmark for trained YOLO weights"""
+
+    def __init__(self, config=None, model_path=None, backend=None):
+        self.logger = setup_logging()
+        self.config = config or get_default_config()
+        if model_path is None:
+            model_path = self.config.get_inference_model_path(backend)
+        self.model_path = Path(model_path)
+        self.backend = backend_for_path(self.model_path)
+
+        if not self.model_path.exists():
+            raise FileNotFoundError(f"No trained model found at {self.model_path}")
+
+        # Exported models target CPU runtimes
+        self.device = self.config.DEVICE if self.backend == "torch" else "cpu"
+
+        self.model = None
+        self.load_seconds = None
+
+    def load(self):
+        """Load the weights from disk and time it (bypasses the resident model cache)"""
+        check_backend(self.backend)
+        from ultralytics import YOLO
+
+        start = time.perf_counter()
+        if self.backend == "torch":
+            self.model = YOLO(str(self.model_path))
+        else:
+            self.model = YOLO(str(self.model_path), task="detect")
+        self.load_seconds = time.perf_counter() - start
+        self.logger.info(f"Loaded {self.model_path} in {self.load_seconds:.3f}s")
+        return self.load_seconds
+
+    def evaluate_accuracy(self, data_yaml=None, split=None, batch=16):
+        """mAP, precision and recall overall and per class"""
+        metrics = self.model.val(
+            data=str(data_yaml or self.config.YAML_PATH),
+            split=split or self.config.VAL_SPLIT,
+            imgsz=self.config.IMGSZ,
+            batch=batch,
+            iou=self.config.IOU_THRESHOLD,
+            device=self.device,
+            plots=False,
+            verbose=False,
+        )
+        box = metrics.box
+        names = metrics.names
+
+        per_class = {}
+        for i, class_index in enumerate(box.ap_class_index):
+            per_class[names[int(class_index)]] = {
+                "precision": round(float(box.p[i]), 4),
+                "recall": round(float(box.r[i]), 4),
+                "map50": round(float(box.ap50[i]), 4),
+                "map50_95": round(float(box.ap[i]), 4),
+            }
+
+        return {
+            "precision": round(float(box.mp), 4),
+            "recall": round(float(box.mr), 4),
+            "map50": round(float(box.map50), 4),
+            "map50_95": round(float(box.map), 4),
+            "per_class": per_class,
+        }
+
+    def benchmark_speed(self, images, warmup=3, max_images=None):
+        """Per-image end-to-end latency (decode, preprocess, inference, NMS)"""
+        images = list(images)[:max_images] if max_images else list(images)
+        if not images:
+            raise ValueError("No images to benchmark")
+
+        predict_params = {
+            "imgsz": self.config.IMGSZ,
+            "conf": self.config.CONFIDENCE_THRESHOLD,
+            "iou": self.config.IOU_THRESHOLD,
+            "device": self.device,
+            "save": False,
+            "verbose": False,
+        }
+
+        for image in images[:warmup]:
+            self.model.predict(str(image), **predict_params)
+
+        latencies = []
+        start = time.perf_counter()
+        for image in images:
+            t0 = time.perf_counter()
+            self.model.predict(str(image), **predict_params)
+            latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - start
+
+        return {
+            "images": len(images),
+            "images_per_sec": round(len(images) / elapsed, 3),
+            "latency_ms": latency_summary(latencies),
+        }
+
+    def run(
+        self,
+        data_yaml=None,
+        split=None,
+        max_images=None,
+        warmup=3,
+        accuracy=True,
+        speed=True,
+    ):
+        """Run the full benchmark and return a JSON-serialisable report"""
+        data_yaml = Path(data_yaml or self.config.YAML_PATH)
+        split = split or self.config.VAL_SPLIT
+
+        report = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "host": platform.node(),
+            "platform": platform.platform(),
+            "model": str(self.model_path),
+            "backend": self.backend,
+            "data": str(data_yaml),
+            "split": split,
+            "device": self.device,
+            "imgsz": self.config.IMGSZ,
+            "model_load_seconds": round(self.load(), 4),
+        }
+
+        if accuracy:
+            self.logger.info("Evaluating accuracy...")
+            report["accuracy"] = self.evaluate_accuracy(data_yaml, split)
+
+        if speed:
+            self.logger.info("Benchmarking throughput...")
+            images = split_images(data_yaml, split)
+            report["speed"] = self.benchmark_speed(
+                images, warmup=warmup, max_images=max_images
+            )
+
+        report["peak_rss_mb"] = round(peak_rss_mb(), 1)
+        return report
+
+
+def _isolated_worker(config, model_path, backend, run_kwargs, results):
+    """Benchmark one model and put its report (or error) on the results queue"""
+    try:
+        evaluator = YOLOEvaluator(config=config, model_path=model_path, backend=backend)
+        results.put({"report": evaluator.run(**run_kwargs)})
+    except Exception as e:
+        results.put({"error": str(e)})
+
+
+def run_isolated(config, model_path=None, backend=None, **run_kwargs):
+    """YOLOEvaluator.run() in a fresh process
+
+    peak_rss_mb only covers that one model, instead of the largest model
+    benchmarked so far in this process.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(
+        target=_isolated_worker,
+        args=(config, model_path, backend, run_kwargs, results),
+    )
+    process.start()
+    try:
+        while True:
+            try:
+                outcome = results.get(timeout=1)
+                break
+            except queue.Empty:
+                # Killed (e.g. by the OOM killer) before it could report
+                if not process.is_alive():
+                    outcome = {
+                        "error": f"benchmark process died (exit code "
+                        f"{process.exitcode})"
+                    }
+                    break
+    finally:
+        process.join()
+    if "error" in outcome:
+        raise RuntimeError(outcome["error"])
+    return outcome["report"]
@@ -0,0 +1,80 @@
+# ===========================================
+# File: training_project/src/exporter.py
+# ===========================================
+import importlib.util
+from pathlib import Path
+
+from config.settings import get_default_config
+
+from src.utils import setup_logging
+
+# ultralytics export format per inference backend
+EXPORT_FORMATS = {"onnx": "onnx", "openvino": "openvino"}
+
+# Runtime module needed per backend and the pip packages providing it
+BACKEND_REQUIREMENTS = {
+    "onnx": ("onnxruntime", "onnx onnxruntime"),
+    "openvino": ("openvino", "openvino"),
+}
+
+
+def backend_for_path(model_path):
+    """Inference backend able to run a model file or directory"""
+    path = Path(model_path)
+    if path.suffix == ".onnx":
+        return "onnx"
+    if path.name.endswith("_openvino_model"):
+        return "openvino"
+    return "torch"
+
+
+def check_backend(backend):
+    """Raise a helpful ImportError if the runtime of a backend is missing"""
+    if backend not in BACKEND_REQUIREMENTS:
+        return
+    module, packages = BACKEND_REQUIREMENTS[backend]
+    if importlib.util.find_spec(module) is None:
+        raise ImportError(
+            f"The {backend} backend needs '{module}'; install it with: "
+            f"pip install {packages}"
+        )
+
+
+class ModelExporter:
+    """Export trained YOLO weights for CPU inference runtimes"""
+
+    def __init__(self, config=None, weights_path=None):
+        self.logger = setup_logging()
+        self.config = config or get_default_config()
+        self.weights_path = Path(weights_path or self.config.get_weights_path())
+
+        if not self.weights_path.exists():
+            raise FileNotFoundError(f"No trained model found at {self.weights_path}")
+
+    def export(self, backend="onnx", imgsz=None):
+        """Export the weights next to them and return the exported model path"""
+        if backend not in EXPORT_FORMATS:
+            raise ValueError(
+                f"Cannot export for backend '{backend}' "
+                f"(expected one of: {', '.join(EXPORT_FORMATS)})"
+            )
+        check_backend(backend)
+
+        from ultralytics import YOLO
+
+        self.logger.info(f"Exporting {self.weights_path} to {backend}...")
+        model = YOLO(str(self.weights_path))
+        exported = model.export(
+            format=EXPORT_FORMATS[backend],
+            imgsz=imgsz or self.config.IMGSZ,
+            dynamic=self.config.EXPORT_DYNAMIC,
+            simplify=self.config.EXPORT_SIMPLIFY,
+            device="cpu",
+        )
+        self.logger.info(f"Exported model saved to: {exported}")
+        return Path(exported)
+
+    def export_all(self, backends=None, imgsz=None):
+        """Export for several backends; returns {backend: path}"""
+        backends = backends or list(EXPORT_FORMATS)
+        return {backend: self.export(backend, imgsz=imgsz) for backend in backends}
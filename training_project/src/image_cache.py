@@ -0,0 +1,277 @@
+# ===========================================
+# File: training_project/src/image_cache.py
+# ===========================================
+"""Persistent cache of decoded, resized training images in a memory-mapped file
+
+A cache is built once per dataset hash (image paths, sizes and mtimes) and
+image size, and shared read-only by every run and dataloader worker:
+
+- ``images.u8``  resized uint8 BGR images, concatenated
+- ``index.npy``  offset and resized/original shape of every image
+- ``meta.json``  dataset hash, image size and image count; written last
+
+Every dataset change (new images, a dedup prune, synthetic pages) builds a
+new cache, so least recently used caches are evicted beyond a size limit.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import shutil
+import tempfile
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+CACHE_VERSION = 1
+
+INDEX_DTYPE = np.dtype(
+    [
+        ("offset", np.uint64),
+        ("h", np.uint16),
+        ("w", np.uint16),
+        ("h0", np.uint16),
+        ("w0", np.uint16),
+    ]
+)
+
+# Images decoded per thread pool round while building
+BUILD_BLOCK = 256
+
+logger = logging.getLogger(__name__)
+
+
+def dataset_hash(image_files, imgsz, augment):
+    """Hash of the image list, file sizes and mtimes plus the resize settings"""
+    digest = hashlib.sha256()
+    digest.update(f"{CACHE_VERSION}:{imgsz}:{int(bool(augment))}".encode())
+    for path in image_files:
+        stat = os.stat(path)
+        digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def load_resized(path, imgsz, augment):
+    """Decode an image and resize its long side to imgsz like ultralytics does"""
+    import cv2
+
+    image = cv2.imread(str(path))
+    if image is None:
+        raise FileNotFoundError(f"Image not found or unreadable: {path}")
+    h0, w0 = image.shape[:2]
+    r = imgsz / max(h0, w0)
+    if r != 1:
+        # Same interpolation choice as ultralytics' BaseDataset.load_image
+        interp = cv2.INTER_LINEAR if (augment or r > 1) else cv2.INTER_AREA
+        w, h = min(math.ceil(w0 * r), imgsz), min(math.ceil(h0 * r), imgsz)
+        image = cv2.resize(image, (w, h), interpolation=interp)
+    return image, (h0, w0)
+
+
+class ImageCache:
+    """Memory-mapped resized images of one dataset split at one image size"""
+
+    def __init__(self, root, image_files, imgsz, augment=False):
+        self.image_files = [str(f) for f in image_files]
+        self.imgsz = imgsz
+        self.augment = augment
+        self.hash = dataset_hash(self.image_files, imgsz, augment)
+        self.path = Path(root) / f"{self.hash[:16]}_{imgsz}"
+        self._index = None
+        self._data = None
+
+    def __len__(self):
+        return len(self.image_files)
+
+    def __getstate__(self):
+        # Dataloader workers open their own memory maps
+        state = self.__dict__.copy()
+        state["_index"] = state["_data"] = None
+        return state
+
+    def is_valid(self):
+        """True if a complete cache for exactly this dataset exists"""
+        meta_path = self.path / "meta.json"
+        if not meta_path.exists():
+            return False
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return meta.get("hash") == self.hash and meta.get("images") == len(self)
+
+    def build(self, workers=None):
+        """Decode and resize every image once; safe against concurrent builders"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(
+            tempfile.mkdtemp(prefix=f".{self.path.name}.", dir=self.path.parent)
+        )
+        start = time.perf_counter()
+        index = np.zeros(len(self), dtype=INDEX_DTYPE)
+        offset = 0
+        try:
+            with open(tmp_dir / "images.u8", "wb") as f, ThreadPoolExecutor(
+                workers or os.cpu_count()
+            ) as pool:
+                for block in range(0, len(self), BUILD_BLOCK):
+                    files = self.image_files[block : block + BUILD_BLOCK]
+                    results = pool.map(
+                        lambda p: load_resized(p, self.imgsz, self.augment), files
+                    )
+                    for i, (image, (h0, w0)) in enumerate(results, start=block):
+                        image = np.ascontiguousarray(image)
+                        h, w = image.shape[:2]
+                        index[i] = (offset, h, w, h0, w0)
+                        f.write(image.data)
+                        offset += image.nbytes
+            np.save(tmp_dir / "index.npy", index)
+            # meta.json marks the cache as complete
+            with open(tmp_dir / "meta.json", "w") as f:
+                json.dump(
+                    {
+                        "version": CACHE_VERSION,
+                        "hash": self.hash,
+                        "imgsz": self.imgsz,
+                        "augment": bool(self.augment),
+                        "images": len(self),
+                        "bytes": offset,
+                    },
+                    f,
+                )
+            os.replace(tmp_dir, self.path)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            # Another process built the same cache first
+            if not self.is_valid():
+                raise
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        logger.info(
+            f"Built image cache {self.path} ({len(self)} images, "
+            f"{offset / 1024**3:.2f} GB) in {time.perf_counter() - start:.1f}s"
+        )
+        return self
+
+    def ensure(self, workers=None):
+        """Build the cache unless a valid one exists"""
+        if self.is_valid():
+            # The meta.json mtime records the last use for eviction
+            os.utime(self.path / "meta.json")
+        else:
+            self.build(workers)
+        return self
+
+    def _open(self):
+        self._index = np.load(self.path / "index.npy")
+        self._data = np.memmap(self.path / "images.u8", dtype=np.uint8, mode="r")
+
+    def load(self, i):
+        """Return (image, (h0, w0), (h, w)); the image is a read-only view"""
+        if self._data is None:
+            self._open()
+        entry = self._index[i]
+        h, w = int(entry["h"]), int(entry["w"])
+        start = int(entry["offset"])
+        image = self._data[start : start + h * w * 3].reshape(h, w, 3)
+        return image, (int(entry["h0"]), int(entry["w0"])), (h, w)
+
+
+def cache_size(path):
+    """Bytes used by one cache directory"""
+    return sum(f.stat().st_size for f in Path(path).iterdir() if f.is_file())
+
+
+def evict_caches(root, max_bytes, keep=()):
+    """Remove least recently used caches until root fits max_bytes
+
+    Caches in keep (used by the running trainer) are never removed; partial
+    builds of other processes (dot directories) are left alone.
+    """
+    root = Path(root)
+    if not root.exists():
+        return 0
+    keep = {Path(path) for path in keep}
+    entries = []
+    for path in root.iterdir():
+        meta_path = path / "meta.json"
+        if path.name.startswith(".") or not meta_path.exists():
+            continue
+        entries.append((meta_path.stat().st_mtime, cache_size(path), path))
+    entries.sort(key=lambda entry: entry[0])
+
+    total = sum(size for _, size, _ in entries)
+    evicted = 0
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        if path in keep:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        evicted += 1
+
+    if evicted:
+        logger.info(
+            f"Evicted {evicted} image caches, {total / 1024**3:.2f} GB remaining"
+        )
+    return evicted
+
+
+def _cached_load_image(self, i, rect_mode=True):
+    """BaseDataset.load_image reading resized images from the image cache"""
+    # Non-rect resizing and images already held in RAM take the normal path
+    if not rect_mode or self.ims[i] is not None:
+        return type(self).load_image(self, i, rect_mode)
+
+    image, hw0, hw = self.image_cache.load(i)
+    # Augmentations may write into the image; the memory map is read-only
+    image = np.array(image)
+    if self.augment:
+        # Mosaic samples its partner images from this buffer
+        self.ims[i], self.im_hw0[i], self.im_hw[i] = image, hw0, hw
+        self.buffer.append(i)
+        if 1 < len(self.buffer) >= self.max_buffer_length:
+            j = self.buffer.pop(0)
+            if self.cache != "ram":
+                self.ims[j], self.im_hw0[j], self.im_hw[j] = None, None, None
+    return image, hw0, hw
+
+
+def attach_image_cache(dataset, root, workers=None):
+    """Make an ultralytics dataset load its images from a (new) image cache"""
+    cache = ImageCache(root, dataset.im_files, dataset.imgsz, dataset.augment)
+    cache.ensure(workers)
+    dataset.image_cache = cache
+    dataset.load_image = types.MethodType(_cached_load_image, dataset)
+    return cache
+
+
+def cached_trainer_class(root, workers=None, max_bytes=None):
+    """DetectionTrainer subclass whose datasets read from the image cache
+
+    With max_bytes, caches not used by this trainer are evicted (least
+    recently used first) once the cache root grows beyond it.
+    """
+    from ultralytics.models.yolo.detect import DetectionTrainer
+
+    class CachedDetectionTrainer(DetectionTrainer):
+        def build_dataset(self, img_path, mode="train", batch=None):
+            dataset = super().build_dataset(img_path, mode=mode, batch=batch)
+            cache = attach_image_cache(dataset, root, workers)
+            logger.info(f"Using image cache {cache.path} for {mode}")
+            # The train and val caches of this run stay in place
+            self.image_cache_paths = getattr(self, "image_cache_paths", [])
+            self.image_cache_paths.append(cache.path)
+            if max_bytes:
+                evict_caches(root, max_bytes, keep=self.image_cache_paths)
+            return dataset
+
+    return CachedDetectionTrainer
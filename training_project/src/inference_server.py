@@ -0,0 +1,327 @@
+# ===========================================
+# File: training_project/src/inference_server.py
+# ===========================================
+import http.client
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import numpy as np
+
+from src.instrumentation import metrics
+from src.utils import setup_logging
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the micro-batcher has too many pending requests"""
+
+
+class ServiceStoppedError(RuntimeError):
+    """Raised for requests the micro-batcher no longer answers after stop()"""
+
+
+class MicroBatcher:
+    """Coalesce concurrent requests into batches for one resident model
+
+    A batch is dispatched as soon as it holds max_batch images or when the
+    oldest request has waited max_latency_ms, whichever comes first.
+    """
+
+    def __init__(self, predictor, max_batch=8, max_latency_ms=10, max_queue=256):
+        self.predictor = predictor
+        self.max_batch = max(1, max_batch)
+        self.max_latency = max_latency_ms / 1000.0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="micro-batcher", daemon=True
+        )
+
+    def start(self):
+        """Start the dispatch thread"""
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        """Stop dispatching; requests still queued fail with ServiceStoppedError"""
+        self._stop.set()
+        self._thread.join(timeout)
+        # Request threads block on these futures until they are resolved
+        while True:
+            try:
+                _, _, _, future = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            future.set_exception(ServiceStoppedError("Inference service stopped"))
+
+    @property
+    def queue_depth(self):
+        """Requests waiting for a batch"""
+        return self._queue.qsize()
+
+    def submit(self, image, source="image"):
+        """Queue one BGR image; the returned Future resolves to a DetectionRecord"""
+        if self._stop.is_set():
+            raise ServiceStoppedError("Inference service stopped")
+        future = Future()
+        try:
+            self._queue.put_nowait((time.perf_counter(), image, source, future))
+        except queue.Full:
+            metrics.count("server_rejected")
+            raise QueueFullError("Inference queue is full")
+        metrics.gauge("server_queue_depth", self._queue.qsize())
+        return future
+
+    def _collect(self):
+        """Block for the first request, then fill the batch until the deadline"""
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = first[0] + self.max_latency
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if not batch:
+                continue
+
+            now = time.perf_counter()
+            metrics.gauge("server_queue_depth", self._queue.qsize())
+            metrics.observe("server_batch_size", len(batch))
+            for enqueued, _, _, _ in batch:
+                metrics.observe("server_queue_wait_seconds", now - enqueued)
+
+            _, images, sources, futures = zip(*batch)
+            try:
+                records = self.predictor.predict_images(
+                    list(images), sources=list(sources), mode="server"
+                )
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            for future, record in zip(futures, records):
+                future.set_result(record)
+
+
+class InferenceRequestHandler(BaseHTTPRequestHandler):
+    """POST /predict with an encoded image body, GET /metrics and GET /health"""
+
+    server_version = "PDFOCRInference/1.0"
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) address
+        if isinstance(self.client_address, tuple) and self.client_address:
+            return str(self.client_address[0])
+        return "unix"
+
+    def log_message(self, format, *args):
+        self.server.logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send(self, status, body, content_type="application/json"):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/metrics":
+            metrics.gauge("server_queue_depth", self.server.batcher.queue_depth)
+            self._send(
+                200,
+                metrics.prometheus_text().encode("utf-8"),
+                "text/plain; version=0.0.4",
+            )
+        elif path == "/health":
+            self._send(
+                200,
+                {
+                    "status": "ok",
+                    "model": str(self.server.batcher.predictor.model_path),
+                    "queue_depth": self.server.batcher.queue_depth,
+                },
+            )
+        else:
+            self._send(404, {"error": f"Unknown path: {path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/predict":
+            self._send(404, {"error": f"Unknown path: {url.path}"})
+            return
+
+        import cv2
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send(400, {"error": "Invalid Content-Length"})
+            return
+        if length > self.server.max_body_bytes:
+            # The body is not read, so the connection cannot be reused
+            self.close_connection = True
+            limit = self.server.max_body_bytes
+            self._send(413, {"error": f"Request body larger than {limit} bytes"})
+            return
+        data = np.frombuffer(self.rfile.read(length), dtype=np.uint8)
+        # Decoding happens in the request thread, in parallel with inference
+        image = cv2.imdecode(data, cv2.IMREAD_COLOR) if length else None
+        if image is None:
+            self._send(400, {"error": "Request body is not a decodable image"})
+            return
+
+        source = parse_qs(url.query).get("source", ["image"])[0]
+        try:
+            record = self.server.batcher.submit(image, source).result()
+        except (QueueFullError, ServiceStoppedError) as e:
+            self._send(503, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send(500, {"error": str(e)})
+            return
+        self._send(200, record.to_dict(self.server.names))
+
+
+class _ServerMixin:
+    """State shared by the TCP and Unix socket servers"""
+
+    daemon_threads = True
+
+    def attach(self, batcher, names, logger, max_body_bytes):
+        self.batcher = batcher
+        self.names = names
+        self.logger = logger
+        self.max_body_bytes = max_body_bytes
+        return self
+
+
+class InferenceHTTPServer(_ServerMixin, ThreadingHTTPServer):
+    pass
+
+
+class InferenceUnixServer(
+    _ServerMixin, socketserver.ThreadingMixIn, socketserver.UnixStreamServer
+):
+    pass
+
+
+def serve(predictor, config, host=None, port=None, socket_path=None):
+    """Run the inference service until interrupted"""
+    logger = setup_logging()
+    # /metrics always exposes the service metrics
+    if not metrics.enabled:
+        metrics.configure(enabled=True)
+
+    batcher = MicroBatcher(
+        predictor,
+        max_batch=config.SERVER_MAX_BATCH,
+        max_latency_ms=config.SERVER_MAX_LATENCY_MS,
+        max_queue=config.SERVER_MAX_QUEUE,
+    ).start()
+
+    socket_path = socket_path or config.SERVER_SOCKET
+    if socket_path:
+        socket_path = Path(socket_path)
+        if socket_path.exists():
+            socket_path.unlink()
+        server = InferenceUnixServer(str(socket_path), InferenceRequestHandler)
+        address = f"unix:{socket_path}"
+    else:
+        host = host or config.SERVER_HOST
+        port = port or config.SERVER_PORT
+        server = InferenceHTTPServer((host, port), InferenceRequestHandler)
+        address = f"http://{host}:{port}"
+    server.attach(
+        batcher,
+        predictor.names,
+        logger,
+        int(config.SERVER_MAX_BODY_MB * 1024**2),
+    )
+
+    logger.info(
+        f"Serving {predictor.model_path} on {address} "
+        f"(max batch {batcher.max_batch}, "
+        f"max latency {config.SERVER_MAX_LATENCY_MS}ms)"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down inference service")
+    finally:
+        server.server_close()
+        batcher.stop()
+        if socket_path:
+            socket_path.unlink(missing_ok=True)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path, timeout=60):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class InferenceClient:
+    """Client for the inference service, e.g. from pipeline worker processes"""
+
+    def __init__(self, address="http://127.0.0.1:8765", timeout=60):
+        self.address = address
+        self.timeout = timeout
+
+    def _connection(self):
+        if self.address.startswith("unix:"):
+            return _UnixHTTPConnection(self.address[5:], timeout=self.timeout)
+        url = urlparse(self.address)
+        return http.client.HTTPConnection(url.hostname, url.port, timeout=self.timeout)
+
+    def predict(self, image, source="image"):
+        """Detections for an image file path or encoded image bytes"""
+        if isinstance(image, (str, os.PathLike)):
+            source = str(image)
+            image = Path(image).read_bytes()
+
+        connection = self._connection()
+        try:
+            connection.request(
+                "POST",
+                "/predict?" + urlencode({"source": source}),
+                body=image,
+                headers={"Content-Type": "application/octet-stream"},
+            )
+            response = connection.getresponse()
+            payload = json.loads(response.read())
+        finally:
+            connection.close()
+
+        if response.status != 200:
+            raise RuntimeError(f"Inference service error: {payload.get('error')}")
+        return payload
@@ -0,0 +1,332 @@
+# ===========================================
+# File: training_project/src/instrumentation.py
+# ===========================================
+# Standard library only: this module is also imported by the docling pipeline
+# in the repository's top-level src/ folder.
+import json
+import re
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+# Upper bounds in seconds, from sub-millisecond NMS up to multi-minute conversions
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    300.0,
+)
+
+METRIC_PREFIX = "pdf_ocr_"
+
+
+class _NullSpan:
+    """Span returned while instrumentation is disabled; does nothing"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Times a block and records it as a histogram observation"""
+
+    __slots__ = ("_instrumentation", "name", "labels", "start")
+
+    def __init__(self, instrumentation, name, labels):
+        self._instrumentation = instrumentation
+        self.name = name
+        self.labels = labels
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        self._instrumentation._finish_span(
+            self.name, self.labels, seconds, exc_type is not None
+        )
+        return False
+
+
+def _label_key(labels):
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+def _metric_name(name):
+    return METRIC_PREFIX + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=None):
+    pairs = list(labels) + (list(extra) if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Instrumentation:
+    """Spans, counters, gauges and histograms with JSON-lines and Prometheus exporters
+
+    While disabled, span() returns a shared no-op context manager and count(),
+    gauge() and observe() return immediately, so instrumented code pays one attribute
+    check per call.
+    """
+
+    def __init__(self, enabled=False, jsonl_path=None, buckets=DEFAULT_BUCKETS):
+        self.enabled = False
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._jsonl_path = None
+        self._jsonl = None
+        if enabled:
+            self.configure(enabled=True, jsonl_path=jsonl_path)
+
+    def configure(self, enabled=True, jsonl_path=None):
+        """Enable or disable recording; span events are appended to jsonl_path"""
+        self.close()
+        self.enabled = enabled
+        self._jsonl_path = Path(jsonl_path) if jsonl_path else None
+        return self
+
+    def worker_config(self):
+        """Arguments for configure() in a worker process sharing this setup"""
+        return {
+            "enabled": self.enabled,
+            "jsonl_path": str(self._jsonl_path) if self._jsonl_path else None,
+        }
+
+    # ---------------------------------------------------------------- recording
+
+    def span(self, name, **labels):
+        """Context manager timing a pipeline stage"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, labels)
+
+    def count(self, name, value=1, **labels):
+        """Increase a counter"""
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def gauge(self, name, value, **labels):
+        """Set a value that can go up and down, e.g. a queue depth"""
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name, value, **labels):
+        """Record a value in a histogram"""
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [
+                    [0] * (len(self.buckets) + 1),
+                    0.0,
+                    0,
+                ]
+            histogram[0][bisect_left(self.buckets, value)] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def _finish_span(self, name, labels, seconds, error):
+        self.observe(f"{name}_seconds", seconds, **labels)
+        if error:
+            self.count(f"{name}_errors", **labels)
+        if self._jsonl_path is not None:
+            event = {
+                "ts": time.time(),
+                "span": name,
+                "seconds": round(seconds, 6),
+                "error": error,
+                **{k: str(v) for k, v in labels.items()},
+            }
+            self._write_event(event)
+
+    def _write_event(self, event):
+        line = json.dumps(event) + "\n"
+        with self._lock:
+            if self._jsonl is None:
+                self._jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+                # Append mode: worker processes can share one events file
+                self._jsonl = open(self._jsonl_path, "a", encoding="utf-8")
+            self._jsonl.write(line)
+            self._jsonl.flush()
+
+    # ------------------------------------------------------ multi-process merge
+
+    def snapshot(self):
+        """Plain, picklable copy of all counters and histograms"""
+        with self._lock:
+            return {
+                "buckets": list(self.buckets),
+                "counters": [
+                    [name, list(labels), value]
+                    for (name, labels), value in self._counters.items()
+                ],
+                "gauges": [
+                    [name, list(labels), value]
+                    for (name, labels), value in self._gauges.items()
+                ],
+                "histograms": [
+                    [name, list(labels), list(counts), total, n]
+                    for (name, labels), (counts, total, n) in self._histograms.items()
+                ],
+            }
+
+    def drain(self):
+        """Snapshot and reset, e.g. at the end of a worker task"""
+        snapshot = self.snapshot()
+        self.reset()
+        return snapshot
+
+    def merge(self, snapshot):
+        """Add a snapshot taken in another process"""
+        if not self.enabled or not snapshot:
+            return
+        if tuple(snapshot["buckets"]) != self.buckets:
+            raise ValueError("Cannot merge histograms with different buckets")
+        with self._lock:
+            for name, labels, value in snapshot["counters"]:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                self._counters[key] = self._counters.get(key, 0) + value
+            # Gauges are point-in-time values: the latest snapshot wins
+            for name, labels, value in snapshot.get("gauges", []):
+                key = (name, tuple(tuple(pair) for pair in labels))
+                self._gauges[key] = value
+            for name, labels, counts, total, n in snapshot["histograms"]:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                histogram = self._histograms.setdefault(
+                    key, [[0] * (len(self.buckets) + 1), 0.0, 0]
+                )
+                histogram[0] = [a + b for a, b in zip(histogram[0], counts)]
+                histogram[1] += total
+                histogram[2] += n
+
+    def reset(self):
+        """Drop all recorded values"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    # ---------------------------------------------------------------- exporting
+
+    def prometheus_text(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted(self._histograms.items())
+
+        typed = set()
+        for (name, labels), value in counters:
+            metric = _metric_name(name) + "_total"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{_format_labels(labels)} {value}")
+
+        for (name, labels), value in gauges:
+            metric = _metric_name(name)
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} gauge")
+                typed.add(metric)
+            lines.append(f"{metric}{_format_labels(labels)} {value}")
+
+        for (name, labels), (counts, total, n) in histograms:
+            metric = _metric_name(name)
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(metric)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _format_labels(labels, [("le", repr(float(bound)))])
+                lines.append(f"{metric}_bucket{le} {cumulative}")
+            le = _format_labels(labels, [("le", "+Inf")])
+            lines.append(f"{metric}_bucket{le} {n}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {n}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Dump all metrics to a Prometheus text file (node_exporter textfile format)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        tmp_path.replace(path)
+
+    def close(self):
+        """Close the JSON-lines event file"""
+        with self._lock:
+            if self._jsonl is not None:
+                self._jsonl.close()
+                self._jsonl = None
+
+
+# Process-wide instance used by the pipeline stages; disabled until configured
+metrics = Instrumentation()
+
+
+def add_metrics_arguments(parser):
+    """Add --metrics-jsonl / --metrics-prom options to a CLI parser"""
+    parser.add_argument(
+        "--metrics-jsonl", help="Append per-stage timing events to this JSON-lines file"
+    )
+    parser.add_argument(
+        "--metrics-prom", help="Write a Prometheus text-format metrics dump on exit"
+    )
+
+
+def setup_metrics(args):
+    """Enable instrumentation if any metrics option was given on the command line"""
+    if args.metrics_jsonl or args.metrics_prom:
+        metrics.configure(enabled=True, jsonl_path=args.metrics_jsonl)
+    return metrics
+
+
+def finish_metrics(args):
+    """Write the Prometheus dump requested on the command line"""
+    if args.metrics_prom:
+        metrics.write_prometheus(args.metrics_prom)
+    metrics.close()
@@ -0,0 +1,127 @@
+# ===========================================
+# File: training_project/src/pdf_source.py
+# ===========================================
+import hashlib
+import queue
+import threading
+from pathlib import Path
+
+import fitz  # PyMuPDF
+import numpy as np
+
+# Relative import: this module is also imported as training_project.src.pdf_source
+# by the docling pipeline in the top-level src/ folder
+from .instrumentation import metrics
+
+_DONE = object()
+
+
+def render_page(page, dpi):
+    """Render a PyMuPDF page straight to a contiguous BGR uint8 array"""
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csRGB, alpha=False)
+    rgb = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(
+        pix.height, pix.width, pix.n
+    )
+    # Single copy out of the pixmap buffer, swapping RGB -> BGR for ultralytics
+    return np.ascontiguousarray(rgb[:, :, ::-1])
+
+
+def page_fingerprint(doc, page):
+    """Hash of a page's content streams, images, form XObjects and geometry"""
+    digest = hashlib.sha256()
+    digest.update(f"{tuple(page.rect)}|{page.rotation}".encode("utf-8"))
+    for xref in page.get_contents():
+        digest.update(doc.xref_stream_raw(xref) or b"")
+    for image in page.get_images(full=True):
+        digest.update(doc.xref_stream_raw(image[0]) or b"")
+    for xobject in page.get_xobjects():
+        digest.update(doc.xref_stream_raw(xobject[0]) or b"")
+    # Font definitions only; embedded font programs are too costly to hash
+    for font in page.get_fonts(full=True):
+        digest.update(doc.xref_object(font[0], compressed=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def page_fingerprints(pdf_path):
+    """Fingerprint every page of a PDF, in page order"""
+    with fitz.open(pdf_path) as doc:
+        return [page_fingerprint(doc, page) for page in doc]
+
+
+def page_count(pdf_path):
+    """Number of pages of a PDF, without rendering any of them"""
+    with fitz.open(pdf_path) as doc:
+        return doc.page_count
+
+
+class PDFPageSource:
+    """Render PDF pages in a background thread and hand them out in batches
+
+    At most ``prefetch`` rendered batches are held in memory, so rendering
+    stays just ahead of inference without materialising the whole document.
+    """
+
+    def __init__(self, pdf_path, dpi=150, batch_size=8, prefetch=2, pages=None):
+        self.pdf_path = Path(pdf_path)
+        if not self.pdf_path.exists():
+            raise FileNotFoundError(f"PDF not found: {self.pdf_path}")
+
+        self.dpi = dpi
+        self.batch_size = max(1, batch_size)
+        self.prefetch = max(1, prefetch)
+
+        with fitz.open(self.pdf_path) as doc:
+            self.page_count = doc.page_count
+        if pages is None:
+            pages = range(self.page_count)
+        self.pages = list(pages)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def _render(self, batches, stop):
+        """Producer: render pages and push (page_indices, images) batches"""
+        try:
+            # The document is opened in the render thread; PyMuPDF objects
+            # must not be shared across threads
+            with fitz.open(self.pdf_path) as doc:
+                for start in range(0, len(self.pages), self.batch_size):
+                    indices = self.pages[start : start + self.batch_size]
+                    with metrics.span("rasterization"):
+                        images = [render_page(doc[i], self.dpi) for i in indices]
+                    metrics.count("pages_rendered", len(images))
+                    while not stop.is_set():
+                        try:
+                            batches.put((indices, images), timeout=0.1)
+                            break
+                        except queue.Full:
+                            continue
+                    if stop.is_set():
+                        return
+            batches.put(_DONE)
+        except Exception as e:
+            batches.put(e)
+
+    def __iter__(self):
+        batches = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        worker = threading.Thread(
+            target=self._render, args=(batches, stop), daemon=True
+        )
+        worker.start()
+        try:
+            while True:
+                item = batches.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Consumer stopped early or finished: release the producer
+            stop.set()
+            while worker.is_alive():
+                try:
+                    batches.get_nowait()
+                except queue.Empty:
+                    worker.join(timeout=0.1)
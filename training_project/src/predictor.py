@@ -2,30 +2,112 @@
 # File: training_project/src/predictor.py (Updated)
 # ===========================================
 import logging
+from collections import OrderedDict
 from pathlib import Path
 
-from config.settings import Config
-from ultralytics import YOLO
+import numpy as np
+from config.settings import get_default_config
 
-from src.utils import setup_logging
+from src.dedup import DuplicatePageIndex, phash_images, reuse_record
+from src.detection_cache import model_key
+from src.detections import DetectionRecord
+from src.exporter import backend_for_path, check_backend
+from src.instrumentation import metrics
+from src.pdf_source import PDFPageSource, page_fingerprints
+from src.tiling import make_tiles, merge_tile_detections
+from src.utils import list_images, setup_logging
+
+# Resident models shared by all predictors, keyed by (resolved path, mtime)
+_MODEL_CACHE = OrderedDict()
+# Duplicate page indexes kept per predictor, one per (weights, confidence)
+DUPLICATE_INDEX_KEYS = 4
+
+
+def load_model(model_path, cache_size=2):
+    """Load YOLO weights once and keep them resident while the file is unchanged"""
+    path = Path(model_path).resolve()
+    key = (str(path), path.stat().st_mtime_ns)
+
+    model = _MODEL_CACHE.get(key)
+    if model is not None:
+        _MODEL_CACHE.move_to_end(key)
+        return model
+
+    # Weights were rewritten (e.g. last.pt during training): drop the stale model
+    for stale_key in [k for k in _MODEL_CACHE if k[0] == key[0]]:
+        del _MODEL_CACHE[stale_key]
+
+    check_backend(backend_for_path(path))
+
+    # Imported on first load so CLI startup does not pay for torch/ultralytics
+    from ultralytics import YOLO
+
+    logging.getLogger(__name__).info(f"Loading model weights: {path}")
+    with metrics.span("model_load"):
+        # Exported models (ONNX file, OpenVINO directory) carry no task metadata
+        # that ultralytics can rely on, so it is passed explicitly
+        if path.suffix == ".pt":
+            model = YOLO(str(path))
+        else:
+            model = YOLO(str(path), task="detect")
+    _MODEL_CACHE[key] = model
+
+    while len(_MODEL_CACHE) > max(cache_size, 1):
+        _MODEL_CACHE.popitem(last=False)
+    return model
+
+
+def clear_model_cache():
+    """Release all resident models"""
+    _MODEL_CACHE.clear()
 
 
 class YOLOPredictor:
     """YOLO model predictor class"""
 
-    def __init__(self, config=None, model_path=None):
+    def __init__(self, config=None, model_path=None, warmup=None):
         self.logger = setup_logging()
-        self.config = config or Config
+        self.config = config or get_default_config()
 
-        # Use custom model path or default weights path
-        self.model_path = model_path or self.config.get_weights_path()
+        # Use custom model path or the model of the configured backend
+        self.model_path = model_path or self.config.get_inference_model_path()
 
         if not Path(self.model_path).exists():
+            if model_path is None and self.config.BACKEND != "torch":
+                raise FileNotFoundError(
+                    f"No exported {self.config.BACKEND} model found at "
+                    f"{self.model_path}; run scripts/export.py first"
+                )
             raise FileNotFoundError(f"No trained model found at {self.model_path}")
 
+        # Detections of recently seen pages, per (weights, confidence threshold)
+        self._duplicate_indexes = {}
+
+        if warmup if warmup is not None else self.config.WARMUP:
+            self.warmup()
+
+    @property
+    def model(self):
+        """Resident YOLO model for the current weights"""
+        return load_model(self.model_path, self.config.MODEL_CACHE_SIZE)
+
+    def set_model_path(self, model_path):
+        """Switch weights; previously loaded weights stay resident in the cache"""
+        if not Path(model_path).exists():
+            raise FileNotFoundError(f"No trained model found at {model_path}")
+        self.model_path = model_path
+
+    def warmup(self, imgsz=None, runs=1):
+        """Run dummy inference so weight fusing and graph setup happen up front"""
+        imgsz = imgsz or self.config.IMGSZ
+        dummy = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+        for _ in range(runs):
+            self.model.predict(dummy, imgsz=imgsz, save=False, verbose=False)
+        self.logger.info(f"Warmed up model {self.model_path}")
+
     def predict(self, source, save_dir=None, conf=None):
         """Run prediction on source"""
-        model = YOLO(str(self.model_path))
+        model = self.model
 
         # Default save directory to main output folder if not specified
         if save_dir is None:
@@ -46,6 +128,325 @@ class YOLOPredictor:
         self.logger.info("Prediction completed!")
         return results
 
+    def _inference_params(self, conf=None):
+        """Inference parameters shared by all prediction modes"""
+        return {
+            "conf": conf or self.config.CONFIDENCE_THRESHOLD,
+            "iou": self.config.IOU_THRESHOLD,
+            "max_det": self.config.MAX_DETECTIONS,
+            "half": self.config.HALF_PRECISION,
+            "augment": self.config.AUGMENT,
+            "agnostic_nms": self.config.AGNOSTIC_NMS,
+            "imgsz": self.config.IMGSZ,
+            "verbose": False,
+        }
+
+    def predict_stream(
+        self, source, conf=None, save=False, save_dir=None, batch=None
+    ):
+        """Yield one DetectionRecord per image without keeping results in memory
+
+        Annotated images are only drawn and written when save=True. With
+        DEDUP_PREDICTION image files are decoded here and duplicate pages
+        reuse earlier detections (see predict_images).
+        """
+        if self.config.DEDUP_PREDICTION and not save and Path(str(source)).exists():
+            yield from self._predict_files(source, conf, batch)
+            return
+
+        predict_params = self._inference_params(conf)
+        predict_params.update(
+            {
+                "source": source,
+                "stream": True,
+                "save": save,
+                "batch": batch or self.config.PREDICT_BATCH_SIZE,
+            }
+        )
+        if save:
+            save_dir = save_dir or self.config.OUTPUT_PATH
+            predict_params.update(
+                {"project": str(save_dir), "name": "yolo_predictions"}
+            )
+            self.logger.info(
+                f"Annotated images will be saved to: {save_dir}/yolo_predictions"
+            )
+
+        self.logger.info(f"Streaming prediction on: {source}")
+        results = self.model.predict(**predict_params)
+        while True:
+            # Loading, inference and NMS all happen inside next()
+            with metrics.span("inference", mode="stream"):
+                result = next(results, None)
+            if result is None:
+                break
+            self._record_speed(result)
+            yield DetectionRecord.from_result(result)
+
+    def _predict_files(self, source, conf=None, batch=None):
+        """Decode image files batch by batch and detect with predict_images"""
+        import cv2
+
+        self.logger.info(f"Streaming prediction with deduplication on: {source}")
+        paths = list_images(source)
+        batch = batch or self.config.PREDICT_BATCH_SIZE
+        for start in range(0, len(paths), batch):
+            images, sources = [], []
+            for path in paths[start : start + batch]:
+                image = cv2.imread(str(path))
+                if image is None:
+                    self.logger.warning(f"Could not read image: {path}")
+                    continue
+                images.append(image)
+                sources.append(str(path))
+            yield from self.predict_images(
+                images, conf=conf, sources=sources, mode="stream"
+            )
+
+    def predict_images(
+        self, images, conf=None, sources=None, pages=None, mode="batch"
+    ):
+        """Detect on in-memory BGR images as one batch; one DetectionRecord each
+
+        With DEDUP_PREDICTION, images whose perceptual hash equals that of a
+        recently detected image reuse its detections instead of running the
+        model.
+        """
+        sources = sources or ["image"] * len(images)
+        pages = pages or [None] * len(images)
+        if self.config.DEDUP_PREDICTION:
+            return self._predict_deduplicated(images, conf, sources, pages, mode)
+        return self._predict_batch(images, conf, sources, pages, mode)
+
+    def _predict_batch(self, images, conf, sources, pages, mode):
+        if not images:
+            return []
+        with metrics.span("inference", mode=mode):
+            results = self.model.predict(source=images, **self._inference_params(conf))
+
+        records = []
+        for source, page, result in zip(sources, pages, results):
+            self._record_speed(result)
+            records.append(
+                DetectionRecord.from_result(result, source=source, page=page)
+            )
+        return records
+
+    def _predict_deduplicated(self, images, conf, sources, pages, mode):
+        """Run the model only on images without an identical page seen recently"""
+        key = (str(self.model_path), conf or self.config.CONFIDENCE_THRESHOLD)
+        index = self._duplicate_indexes.get(key)
+        if index is None:
+            # Keep the indexes of a long-running server from piling up
+            if len(self._duplicate_indexes) >= DUPLICATE_INDEX_KEYS:
+                self._duplicate_indexes.pop(next(iter(self._duplicate_indexes)))
+            index = DuplicatePageIndex(self.config.DEDUP_CACHE_SIZE)
+            self._duplicate_indexes[key] = index
+
+        with metrics.span("phash"):
+            hashes = phash_images(images)
+        records = [None] * len(images)
+        fresh = []
+        # Duplicates within this batch wait for the detections of their twin
+        batch_hashes = {}
+        twins = {}
+        for i, value in enumerate(hashes):
+            original = index.lookup(value)
+            if original is not None:
+                records[i] = reuse_record(
+                    original, sources[i], pages[i], images[i].shape[:2]
+                )
+                continue
+            twin = batch_hashes.get(value)
+            if twin is None:
+                batch_hashes[value] = i
+                fresh.append(i)
+            else:
+                twins[i] = twin
+
+        detected = self._predict_batch(
+            [images[i] for i in fresh],
+            conf,
+            [sources[i] for i in fresh],
+            [pages[i] for i in fresh],
+            mode,
+        )
+        for i, record in zip(fresh, detected):
+            records[i] = record
+            index.add(hashes[i], record)
+        for i, twin in twins.items():
+            records[i] = reuse_record(
+                records[twin], sources[i], pages[i], images[i].shape[:2]
+            )
+
+        metrics.count("duplicate_pages", len(images) - len(fresh))
+        return records
+
+    def predict_pdf(
+        self,
+        pdf_path,
+        conf=None,
+        dpi=None,
+        batch=None,
+        prefetch=None,
+        pages=None,
+        page_cache=None,
+        tiled=None,
+    ):
+        """Yield one DetectionRecord per PDF page, rendered in memory
+
+        With a DetectionPageCache only pages whose fingerprint changed since
+        the last run are rendered and detected; the rest come from the cache.
+        In tiled mode pages are rendered at TILE_PDF_DPI and detected tile by
+        tile (see predict_tiled).
+        """
+        tiled = self.config.TILED if tiled is None else tiled
+        if tiled:
+            dpi = dpi or self.config.TILE_PDF_DPI
+            predict_params = self._tile_params(conf)
+        else:
+            dpi = dpi or self.config.PDF_DPI
+            predict_params = self._inference_params(conf)
+
+        if pages is None:
+            pages = range(PDFPageSource(pdf_path).page_count)
+        pages = list(pages)
+
+        cached = {}
+        if page_cache is not None:
+            fingerprints = page_fingerprints(pdf_path)
+            cache_key = model_key(self.model_path, {**predict_params, "dpi": dpi})
+            for page in pages:
+                record = page_cache.get(
+                    cache_key, fingerprints[page], source=pdf_path, page=page
+                )
+                if record is not None:
+                    cached[page] = record
+
+        missing = [page for page in pages if page not in cached]
+        self.logger.info(
+            f"Running prediction on {len(missing)} of {len(pages)} pages "
+            f"({len(cached)} cached) of: {pdf_path}"
+        )
+
+        def detect_missing():
+            source = PDFPageSource(
+                pdf_path,
+                dpi=dpi,
+                # Tiled mode batches tiles, so high-DPI pages are rendered one by one
+                batch_size=1 if tiled else batch or self.config.PREDICT_BATCH_SIZE,
+                prefetch=prefetch or self.config.PREFETCH_BATCHES,
+                pages=missing,
+            )
+            for indices, images in source:
+                if tiled:
+                    records = [
+                        self.predict_tiled(
+                            image, conf=conf, source=pdf_path, page=page, batch=batch
+                        )
+                        for page, image in zip(indices, images)
+                    ]
+                else:
+                    records = self.predict_images(
+                        images,
+                        conf=conf,
+                        sources=[pdf_path] * len(images),
+                        pages=indices,
+                        mode="pdf",
+                    )
+                for page, record in zip(indices, records):
+                    if page_cache is not None:
+                        page_cache.put(cache_key, fingerprints[page], record)
+                    yield record
+
+        # Interleave cached and freshly detected pages in page order
+        detected = detect_missing() if missing else iter(())
+        for page in pages:
+            yield cached[page] if page in cached else next(detected)
+
+    def _tile_params(self, conf=None):
+        """Inference parameters for tiles: tiles are fed at their native size"""
+        predict_params = self._inference_params(conf)
+        predict_params["imgsz"] = self.config.TILE_SIZE
+        predict_params["tile_overlap"] = self.config.TILE_OVERLAP
+        predict_params["tile_merge_threshold"] = self.config.TILE_MERGE_THRESHOLD
+        return predict_params
+
+    def predict_tiled(self, image, conf=None, source=None, page=None, batch=None):
+        """Detect on overlapping tiles of a high-resolution image
+
+        Tiles are TILE_SIZE pixels wide with TILE_OVERLAP pixels of overlap and
+        run through the model in batches; the per-tile boxes are shifted into
+        image coordinates and merged with a cross-tile NMS.
+        """
+        predict_params = self._tile_params(conf)
+        tile_overlap = predict_params.pop("tile_overlap")
+        merge_threshold = predict_params.pop("tile_merge_threshold")
+        batch = batch or self.config.PREDICT_BATCH_SIZE
+
+        tiles, offsets = make_tiles(image, self.config.TILE_SIZE, tile_overlap)
+        metrics.count("tiles", len(tiles))
+
+        boxes, classes, scores = [], [], []
+        for start in range(0, len(tiles), batch):
+            with metrics.span("inference", mode="tiled"):
+                results = self.model.predict(
+                    source=tiles[start : start + batch], **predict_params
+                )
+            for result in results:
+                self._record_speed(result)
+                tile = DetectionRecord.from_result(result)
+                boxes.append(tile.boxes)
+                classes.append(tile.classes)
+                scores.append(tile.scores)
+
+        with metrics.span("tile_merge"):
+            boxes, classes, scores = merge_tile_detections(
+                boxes,
+                classes,
+                scores,
+                offsets,
+                threshold=merge_threshold,
+                agnostic=self.config.AGNOSTIC_NMS,
+            )
+
+        # Merged boxes come out sorted by score
+        max_det = self.config.MAX_DETECTIONS
+        return DetectionRecord(
+            source=str(source),
+            boxes=boxes[:max_det],
+            classes=classes[:max_det],
+            scores=scores[:max_det],
+            image_shape=tuple(int(v) for v in image.shape[:2]),
+            page=page,
+        )
+
+    def predict_tiled_stream(self, source, conf=None, batch=None):
+        """Yield one tiled DetectionRecord per image file of a file or folder"""
+        import cv2
+
+        self.logger.info(f"Tiled prediction on: {source}")
+        for path in list_images(source):
+            image = cv2.imread(str(path))
+            if image is None:
+                self.logger.warning(f"Could not read image: {path}")
+                continue
+            yield self.predict_tiled(image, conf=conf, source=path, batch=batch)
+
+    def _record_speed(self, result):
+        """Record ultralytics' per-image stage timings (milliseconds)"""
+        if not metrics.enabled:
+            return
+        metrics.count("images")
+        for stage, milliseconds in result.speed.items():
+            if milliseconds is not None:
+                metrics.observe(f"yolo_{stage}_seconds", milliseconds / 1000.0)
+
+    @property
+    def names(self):
+        """Class id to name mapping of the loaded model"""
+        return self.model.names
+
     def predict_images_folder(self, source_dir, output_dir=None):
         """Run prediction on all images in a folder"""
         source_path = Path(source_dir)
@@ -0,0 +1,205 @@
+# ===========================================
+# File: training_project/src/quantizer.py
+# ===========================================
+import random
+import re
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from config.settings import get_default_config
+
+from src.evaluator import split_images
+from src.exporter import ModelExporter, check_backend
+from src.utils import setup_logging
+
+CALIBRATION_METHODS = ("minmax", "entropy", "percentile")
+
+
+def letterbox(image, imgsz):
+    """Resize keeping the aspect ratio and pad to a square, like ultralytics"""
+    import cv2
+
+    height, width = image.shape[:2]
+    scale = min(imgsz / height, imgsz / width)
+    new_w, new_h = round(width * scale), round(height * scale)
+    if (new_w, new_h) != (width, height):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top, left = (imgsz - new_h) // 2, (imgsz - new_w) // 2
+    canvas[top : top + new_h, left : left + new_w] = image
+    return canvas
+
+
+def preprocess(image, imgsz):
+    """BGR uint8 image to the (1, 3, imgsz, imgsz) float32 model input"""
+    image = letterbox(image, imgsz)
+    tensor = image[:, :, ::-1].transpose(2, 0, 1)  # BGR HWC -> RGB CHW
+    return np.ascontiguousarray(tensor, dtype=np.float32)[None] / 255.0
+
+
+def sample_calibration_images(data_yaml, count, split="train", seed=0):
+    """Random, reproducible sample of training images for calibration"""
+    images = split_images(data_yaml, split)
+    if not images:
+        raise ValueError(f"No '{split}' images found for calibration in {data_yaml}")
+    random.Random(seed).shuffle(images)
+    return images[:count]
+
+
+def detect_head_nodes(onnx_path):
+    """Names of the nodes of the last top-level module (the YOLO detect head)"""
+    import onnx
+
+    model = onnx.load(str(onnx_path), load_external_data=False)
+    pattern = re.compile(r"^/model\.(\d+)/")
+    indices = {}
+    for node in model.graph.node:
+        match = pattern.match(node.name)
+        if match:
+            indices.setdefault(int(match.group(1)), []).append(node.name)
+    return indices[max(indices)] if indices else []
+
+
+def copy_metadata(source_path, target_path):
+    """Copy ONNX metadata (class names, stride, imgsz) that ultralytics reads"""
+    import onnx
+
+    source = onnx.load(str(source_path), load_external_data=False)
+    target = onnx.load(str(target_path))
+    existing = {prop.key for prop in target.metadata_props}
+    for prop in source.metadata_props:
+        if prop.key not in existing:
+            target.metadata_props.add(key=prop.key, value=prop.value)
+    onnx.save(target, str(target_path))
+
+
+def _calibration_reader(input_name, images, imgsz):
+    """onnxruntime CalibrationDataReader decoding images one at a time"""
+    import cv2
+    from onnxruntime.quantization import CalibrationDataReader
+
+    class ImageCalibrationReader(CalibrationDataReader):
+        def __init__(self):
+            self._images = iter(images)
+
+        def get_next(self):
+            for path in self._images:
+                image = cv2.imread(str(path))
+                if image is not None:
+                    return {input_name: preprocess(image, imgsz)}
+            return None
+
+        def rewind(self):
+            self._images = iter(images)
+
+    return ImageCalibrationReader()
+
+
+class ModelQuantizer:
+    """INT8 post-training static quantization of exported ONNX weights"""
+
+    def __init__(self, config=None, weights_path=None):
+        self.logger = setup_logging()
+        self.config = config or get_default_config()
+        self.weights_path = Path(weights_path or self.config.get_weights_path())
+
+        if not self.weights_path.exists():
+            raise FileNotFoundError(f"No trained model found at {self.weights_path}")
+
+    @property
+    def fp32_path(self):
+        """FP32 ONNX export written by the onnx backend exporter"""
+        return self.weights_path.with_suffix(".onnx")
+
+    @property
+    def int8_path(self):
+        """Quantized model, loaded by the onnx_int8 backend"""
+        return self.weights_path.with_name(f"{self.weights_path.stem}_int8.onnx")
+
+    def ensure_fp32(self, imgsz=None):
+        """FP32 ONNX export of the weights, exported first if missing or stale"""
+        fp32_path = self.fp32_path
+        if (
+            not fp32_path.exists()
+            or fp32_path.stat().st_mtime < self.weights_path.stat().st_mtime
+        ):
+            ModelExporter(self.config, self.weights_path).export("onnx", imgsz=imgsz)
+        return fp32_path
+
+    def quantize(
+        self, calibration_images=None, method=None, data_yaml=None, imgsz=None
+    ):
+        """Calibrate on training images and write <weights>_int8.onnx"""
+        check_backend("onnx")
+        import onnxruntime
+        from onnxruntime.quantization import (
+            CalibrationMethod,
+            QuantFormat,
+            QuantType,
+            quantize_static,
+        )
+        from onnxruntime.quantization.shape_inference import quant_pre_process
+
+        method = method or self.config.CALIBRATION_METHOD
+        if method not in CALIBRATION_METHODS:
+            raise ValueError(
+                f"Unknown calibration method '{method}' "
+                f"(expected one of: {', '.join(CALIBRATION_METHODS)})"
+            )
+        imgsz = imgsz or self.config.IMGSZ
+        fp32_path = self.ensure_fp32(imgsz=imgsz)
+
+        images = sample_calibration_images(
+            data_yaml or self.config.YAML_PATH,
+            calibration_images or self.config.CALIBRATION_IMAGES,
+        )
+        input_name = (
+            onnxruntime.InferenceSession(
+                str(fp32_path), providers=["CPUExecutionProvider"]
+            )
+            .get_inputs()[0]
+            .name
+        )
+
+        exclude = []
+        if self.config.QUANT_EXCLUDE_HEAD:
+            exclude = detect_head_nodes(fp32_path)
+        self.logger.info(
+            f"Calibrating on {len(images)} images ({method}), "
+            f"{len(exclude)} detect head nodes kept in FP32"
+        )
+
+        # Work next to the weights so the final rename stays on one filesystem
+        with tempfile.TemporaryDirectory(dir=self.weights_path.parent) as tmp_dir:
+            # Shape inference and graph optimisation recommended before quantizing
+            prepared_path = Path(tmp_dir) / "prepared.onnx"
+            quant_pre_process(str(fp32_path), str(prepared_path))
+
+            tmp_int8 = Path(tmp_dir) / self.int8_path.name
+            quantize_static(
+                str(prepared_path),
+                str(tmp_int8),
+                _calibration_reader(input_name, images, imgsz),
+                quant_format=QuantFormat.QDQ,
+                activation_type=QuantType.QUInt8,
+                weight_type=QuantType.QInt8,
+                per_channel=self.config.QUANT_PER_CHANNEL,
+                nodes_to_exclude=exclude,
+                calibrate_method={
+                    "minmax": CalibrationMethod.MinMax,
+                    "entropy": CalibrationMethod.Entropy,
+                    "percentile": CalibrationMethod.Percentile,
+                }[method],
+            )
+            copy_metadata(fp32_path, tmp_int8)
+            tmp_int8.replace(self.int8_path)
+
+        fp32_mb = fp32_path.stat().st_size / 1024**2
+        int8_mb = self.int8_path.stat().st_size / 1024**2
+        self.logger.info(
+            f"INT8 model saved to: {self.int8_path} "
+            f"({int8_mb:.1f} MB, FP32 {fp32_mb:.1f} MB)"
+        )
+        return self.int8_path
@@ -0,0 +1,108 @@
+# ===========================================
+# File: training_project/src/tiling.py
+# ===========================================
+import numpy as np
+
+
+def tile_origins(length, tile_size, overlap):
+    """Start offsets along one axis; the last tile is aligned to the far edge"""
+    if length <= tile_size:
+        return [0]
+    stride = max(1, tile_size - overlap)
+    origins = list(range(0, length - tile_size, stride))
+    origins.append(length - tile_size)
+    return origins
+
+
+def make_tiles(image, tile_size, overlap):
+    """Cut an image into overlapping tiles
+
+    Returns (tiles, offsets): tiles are zero-copy views into ``image`` and
+    offsets is an (N, 2) array with the (x, y) origin of every tile.
+    """
+    height, width = image.shape[:2]
+    tiles = []
+    offsets = []
+    for y in tile_origins(height, tile_size, overlap):
+        for x in tile_origins(width, tile_size, overlap):
+            tiles.append(image[y : y + tile_size, x : x + tile_size])
+            offsets.append((x, y))
+    return tiles, np.asarray(offsets, dtype=np.float32).reshape(-1, 2)
+
+
+def pairwise_overlap(box, boxes, metric="iou"):
+    """Overlap of one xyxy box with many; 'ios' divides by the smaller area"""
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    if metric == "ios":
+        denominator = np.minimum(area, areas)
+    else:
+        denominator = area + areas - intersection
+    return intersection / np.maximum(denominator, 1e-9)
+
+
+def nms(boxes, scores, classes=None, threshold=0.5, metric="iou", agnostic=False):
+    """Greedy NMS with vectorized overlap computation; returns kept indices
+
+    Boxes of different classes never suppress each other unless agnostic is
+    set: they are shifted apart by a per-class offset larger than the image.
+    """
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    boxes = np.asarray(boxes, dtype=np.float32)
+    if classes is not None and not agnostic:
+        offset = float(boxes.max()) + 1.0
+        boxes = boxes + (np.asarray(classes, dtype=np.float32) * offset)[:, None]
+
+    order = np.argsort(-np.asarray(scores), kind="stable")
+    keep = []
+    while order.size:
+        best = order[0]
+        keep.append(best)
+        if order.size == 1:
+            break
+        rest = order[1:]
+        overlap = pairwise_overlap(boxes[best], boxes[rest], metric)
+        order = rest[overlap <= threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def merge_tile_detections(
+    tile_boxes,
+    tile_classes,
+    tile_scores,
+    offsets,
+    threshold=0.5,
+    metric="ios",
+    agnostic=False,
+):
+    """Shift per-tile detections into page coordinates and merge across tiles
+
+    The default 'ios' metric also merges a box that was cut at a tile border
+    with the complete box found in the neighbouring tile.
+    """
+    counts = [len(b) for b in tile_boxes]
+    if not sum(counts):
+        return (
+            np.zeros((0, 4), dtype=np.float32),
+            np.zeros(0, dtype=np.int32),
+            np.zeros(0, dtype=np.float32),
+        )
+
+    boxes = np.concatenate(tile_boxes).astype(np.float32, copy=False)
+    classes = np.concatenate(tile_classes).astype(np.int32, copy=False)
+    scores = np.concatenate(tile_scores).astype(np.float32, copy=False)
+
+    # Every tile's (x, y) origin repeated for its boxes, applied to both corners
+    shifts = np.repeat(offsets, counts, axis=0)
+    boxes = boxes + np.tile(shifts, 2)
+
+    keep = nms(boxes, scores, classes, threshold, metric, agnostic)
+    return boxes[keep], classes[keep], scores[keep]
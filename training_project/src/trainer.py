@@ -5,20 +5,44 @@ import gc
 import logging
 from pathlib import Path
 
-import torch
-from config.settings import Config, default_config
-from ultralytics import YOLO
+from config.settings import Config, get_default_config
 
+from src.distributed import (
+    broadcast_object,
+    distributed_trainer_class,
+    init_process_group,
+    is_distributed,
+    is_main_process,
+    rank,
+    record_scaling,
+    world_size,
+)
+from src.instrumentation import metrics
 from src.utils import check_file_exists, setup_logging
 
 
+def cpu_workers_trainer_class(base, workers):
+    """Subclass of an ultralytics trainer class that keeps dataloader workers on CPU
+
+    BaseTrainer.__init__ sets workers to 0 for cpu/mps devices; the requested
+    count is restored before any dataloader is built.
+    """
+
+    class CPUWorkersTrainer(base):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.args.workers = workers
+
+    return CPUWorkersTrainer
+
+
 class YOLOTrainer:
     """YOLO model trainer class with MPS optimizations"""
 
     def __init__(self, config=None):
         self.logger = setup_logging()
         # Now config is an instance, not a class
-        self.config = config if config is not None else default_config
+        self.config = config if config is not None else get_default_config()
         self.config.validate_paths()
 
         # Print configuration info
@@ -32,20 +56,95 @@ class YOLOTrainer:
 
     def _clear_mps_cache(self):
         """Clear MPS cache to free memory"""
+        import torch
+
         if self.config.DEVICE == "mps" and torch.backends.mps.is_available():
             if hasattr(torch.mps, "empty_cache"):
                 torch.mps.empty_cache()
             gc.collect()
             self.logger.info("Cleared MPS cache")
 
+    def _check_distributed(self):
+        """Settings a torchrun worker needs; CPU DDP uses the gloo backend"""
+        if self.config.DEVICE != "cpu":
+            self.logger.info(
+                f"Distributed training runs on CPU, not {self.config.DEVICE}"
+            )
+            self.config.DEVICE = "cpu"
+        if self.config.BATCH_SIZE < 1:
+            raise ValueError(
+                "Distributed training needs a fixed global batch size (--batch N)"
+            )
+        if self.config.SYNC_BN:
+            self.logger.warning(
+                "sync_bn is ignored: SyncBatchNorm is not supported on CPU/gloo"
+            )
+        init_process_group()
+        self.logger.info(
+            f"Rank {rank()} of {world_size()} joined the gloo process group"
+        )
+
+    def _run_complete(self, distributed):
+        """Completion as seen by rank 0, so all ranks take the same decision"""
+        complete = self.config.is_run_complete()
+        return broadcast_object(complete) if distributed else complete
+
+    def _can_resume(self, weights_path, distributed):
+        """Resume decision of rank 0; every rank must be able to read the checkpoint"""
+        if not distributed:
+            return weights_path.exists()
+        resume = broadcast_object(weights_path.exists())
+        if resume and not weights_path.exists():
+            raise FileNotFoundError(
+                f"Rank {rank()} cannot read checkpoint {weights_path}; "
+                "PROJECT_PATH must be on a filesystem shared by all nodes"
+            )
+        return resume
+
+    def _deduplicated_data(self, distributed):
+        """data.yaml listing one training image per near-duplicate group"""
+        from src.dedup import dedup_dataset
+
+        pruned_yaml = None
+        if is_main_process():
+            pruned_yaml, kept, dropped = dedup_dataset(
+                self.config.YAML_PATH,
+                self.config.DEDUP_PATH,
+                self.config.DEDUP_THRESHOLD,
+            )
+            self.logger.info(
+                f"Deduplicated training split: {kept} images kept, "
+                f"{dropped} near-duplicates dropped"
+            )
+        # Rank 0 hashes the dataset; the other ranks train on its list
+        if distributed:
+            pruned_yaml = broadcast_object(pruned_yaml)
+        return str(pruned_yaml)
+
+    def _record_scaling(self, model, epoch_seconds):
+        """Add this run's epoch times to the scaling report"""
+        trainer = model.trainer
+        images = len(trainer.train_loader.dataset)
+        report_path = self.config.OUTPUT_PATH / "benchmarks" / "ddp_scaling.json"
+        record_scaling(
+            report_path, self.config.RUN_NAME, world_size(), epoch_seconds, images
+        )
+        self.logger.info(f"Scaling report updated: {report_path}")
+
     def train(self, resume_if_possible=True):
         """Train the model with automatic resume detection and MPS optimizations"""
+        from ultralytics import YOLO
+
         try:
             # Clear cache before starting
             if self.config.DEVICE == "mps":
                 self._clear_mps_cache()
 
-            if self.config.is_run_complete():
+            distributed = is_distributed()
+            if distributed:
+                self._check_distributed()
+
+            if self._run_complete(distributed):
                 self.logger.info(
                     f"Run '{self.config.RUN_NAME}' already completed. Skipping training."
                 )
@@ -53,7 +152,7 @@ class YOLOTrainer:
 
             weights_path = self.config.get_weights_path()
 
-            if resume_if_possible and weights_path.exists():
+            if resume_if_possible and self._can_resume(weights_path, distributed):
                 self.logger.info(f"Found checkpoint at {weights_path}")
                 self.logger.info("Resuming training from checkpoint...")
 
@@ -73,12 +172,23 @@ class YOLOTrainer:
 
                 training_params = self.get_training_params()
 
-            # Save current configuration for reproducibility
-            run_config_path = (
-                self.config.PROJECT_PATH / self.config.RUN_NAME / "config.yaml"
-            )
-            run_config_path.parent.mkdir(parents=True, exist_ok=True)
-            self.config.save_config(run_config_path)
+            if self.config.DEDUP_TRAINING:
+                training_params["data"] = self._deduplicated_data(distributed)
+
+            # Thread count from scripts/autotune.py (or set by hand) for CPU runs
+            if self.config.THREADS:
+                import torch
+
+                torch.set_num_threads(self.config.THREADS)
+                self.logger.info(f"Using {self.config.THREADS} torch threads")
+
+            # Save current configuration for reproducibility (once per run)
+            if is_main_process():
+                run_config_path = (
+                    self.config.PROJECT_PATH / self.config.RUN_NAME / "config.yaml"
+                )
+                run_config_path.parent.mkdir(parents=True, exist_ok=True)
+                self.config.save_config(run_config_path)
 
             # MPS-specific setup
             if self.config.DEVICE == "mps":
@@ -110,12 +220,64 @@ class YOLOTrainer:
             if self.config.DEVICE == "mps":
                 model.add_callback("on_train_epoch_end", on_train_epoch_end)
 
-            results = model.train(**training_params)
+            def on_fit_epoch_end(trainer):
+                """Callback recording epoch wall time (training plus validation)"""
+                metrics.observe("train_epoch_seconds", trainer.epoch_time)
+                metrics.count("train_epochs")
+
+            if metrics.enabled:
+                model.add_callback("on_fit_epoch_end", on_fit_epoch_end)
+
+            # Epoch times of CPU runs feed the DDP scaling report
+            epoch_seconds = []
+            if self.config.DEVICE == "cpu" and is_main_process():
+                model.add_callback(
+                    "on_fit_epoch_end",
+                    lambda trainer: epoch_seconds.append(trainer.epoch_time),
+                )
+
+            # ultralytics' own cache (cache: ram/disk) takes precedence
+            trainer_class = None
+            if self.config.IMAGE_CACHE and not self.config.CACHE:
+                from src.image_cache import cached_trainer_class
+
+                self.logger.info(f"Image cache: {self.config.IMAGE_CACHE_PATH}")
+                trainer_class = cached_trainer_class(
+                    self.config.IMAGE_CACHE_PATH,
+                    max_bytes=int(self.config.IMAGE_CACHE_MAX_GB * 1024**3),
+                )
+            cpu_workers = self.config.DEVICE == "cpu" and self.config.WORKERS > 0
+            if trainer_class is None and (cpu_workers or distributed):
+                from ultralytics.models.yolo.detect import DetectionTrainer
+
+                trainer_class = DetectionTrainer
+            if cpu_workers:
+                trainer_class = cpu_workers_trainer_class(
+                    trainer_class, self.config.WORKERS
+                )
+                self.logger.info(f"Using {self.config.WORKERS} dataloader workers")
+            if distributed:
+                trainer_class = distributed_trainer_class(trainer_class)
+            if trainer_class is not None:
+                training_params["trainer"] = trainer_class
+
+            with metrics.span(
+                "training", device=self.config.DEVICE, world_size=world_size()
+            ):
+                results = model.train(**training_params)
+
+            if epoch_seconds:
+                self._record_scaling(model, epoch_seconds)
 
             # Final memory cleanup
             if self.config.DEVICE == "mps":
                 self._clear_mps_cache()
 
+            if distributed:
+                import torch.distributed as dist
+
+                dist.destroy_process_group()
+
             self.logger.info("Training completed successfully!")
             return results
 
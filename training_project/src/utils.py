@@ -25,3 +25,18 @@ def check_file_exists(file_path, description="File"):
     else:
         logger.warning(f"{description} not found: {file_path}")
         return False
+
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp"}
+
+
+def list_images(source):
+    """Image files of a file or directory source, in sorted order"""
+    path = Path(source)
+    if path.is_dir():
+        return [
+            p for p in sorted(path.rglob("*")) if p.suffix.lower() in IMAGE_SUFFIXES
+        ]
+    if not path.exists():
+        raise FileNotFoundError(f"Source not found: {source}")
+    return [path]
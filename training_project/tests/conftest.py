@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Modules import each other as src.<module>, like the scripts do
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from src.autolabel import confidence_uncertainty, disagreement, yolo_lines
+from src.detections import DetectionRecord
+
+
+def record(boxes, classes, scores, image_shape=(100, 200)):
+    return DetectionRecord(
+        source="page.png",
+        boxes=np.array(boxes, dtype=np.float32).reshape(-1, 4),
+        classes=np.array(classes, dtype=np.int32),
+        scores=np.array(scores, dtype=np.float32),
+        image_shape=image_shape,
+    )
+
+
+def test_confidence_uncertainty():
+    assert confidence_uncertainty(np.zeros(0, dtype=np.float32), 0.5) == 0.0
+    assert confidence_uncertainty(np.array([0.5, 0.99]), 0.5) == pytest.approx(1.0)
+    assert confidence_uncertainty(np.array([1.0]), 0.5) == pytest.approx(0.0)
+    assert confidence_uncertainty(np.array([0.75]), 0.5) == pytest.approx(0.5)
+
+
+def test_disagreement_identical_records():
+    a = record([[0, 0, 10, 10], [50, 50, 80, 80]], [0, 1], [0.9, 0.8])
+    assert disagreement(a, a, conf=0.5, iou=0.5) == 0.0
+
+
+def test_disagreement_empty_records():
+    empty = record([], [], [])
+    assert disagreement(empty, empty, conf=0.5, iou=0.5) == 0.0
+    a = record([[0, 0, 10, 10]], [0], [0.9])
+    assert disagreement(a, empty, conf=0.5, iou=0.5) == 1.0
+
+
+def test_disagreement_counts_class_and_overlap():
+    a = record([[0, 0, 10, 10], [50, 50, 80, 80]], [0, 1], [0.9, 0.8])
+    # Same first box, second box with another class
+    b = record([[1, 1, 10, 10], [50, 50, 80, 80]], [0, 2], [0.9, 0.8])
+    assert disagreement(a, b, conf=0.5, iou=0.5) == pytest.approx(0.5)
+    # Shifted box below the IoU threshold
+    c = record([[5, 5, 15, 15], [50, 50, 80, 80]], [0, 1], [0.9, 0.8])
+    assert disagreement(a, c, conf=0.5, iou=0.5) == pytest.approx(0.5)
+
+
+def test_disagreement_ignores_boxes_below_conf():
+    a = record([[0, 0, 10, 10], [50, 50, 80, 80]], [0, 1], [0.9, 0.2])
+    b = record([[0, 0, 10, 10]], [0], [0.9])
+    assert disagreement(a, b, conf=0.5, iou=0.5) == 0.0
+
+
+def test_disagreement_matches_each_box_once():
+    a = record([[0, 0, 10, 10], [0, 0, 10, 10]], [0, 0], [0.9, 0.8])
+    b = record([[0, 0, 10, 10]], [0], [0.9])
+    assert disagreement(a, b, conf=0.5, iou=0.5) == pytest.approx(1 / 3)
+
+
+def test_yolo_lines():
+    r = record(
+        [[0, 0, 100, 50], [150, 25, 250, 75], [10, 10, 20, 20]],
+        [3, 1, 0],
+        [0.9, 0.6, 0.1],
+    )
+    assert yolo_lines(r, conf=0.5) == [
+        "3 0.250000 0.250000 0.500000 0.500000",
+        # Clipped to the image
+        "1 0.875000 0.500000 0.250000 0.500000",
+    ]
+    assert yolo_lines(record([], [], []), conf=0.5) == []
@@ -0,0 +1,120 @@
+import numpy as np
+
+from src.dedup import (
+    BKTree,
+    DuplicatePageIndex,
+    find_duplicates,
+    hamming,
+    phash_batch,
+    reuse_record,
+)
+from src.detections import DetectionRecord
+
+
+def thumbnails(count, seed=0):
+    """Smooth random 32x32 images, distinct from each other"""
+    rng = np.random.default_rng(seed)
+    coarse = rng.uniform(0, 255, size=(count, 8, 8))
+    return np.kron(coarse, np.ones((4, 4))).astype(np.float32)
+
+
+def test_hamming():
+    assert hamming(0, 0) == 0
+    assert hamming(0b1011, 0b0001) == 2
+    assert hamming(0, 2**64 - 1) == 64
+
+
+def test_phash_batch_matches_single_images():
+    images = thumbnails(3)
+    hashes = phash_batch(images)
+    assert len(hashes) == 3
+    assert all(0 <= value < 2**64 for value in hashes)
+    assert hashes == [phash_batch(image[None])[0] for image in images]
+    assert phash_batch(np.zeros((0, 32, 32))) == []
+
+
+def test_phash_batch_is_robust_to_noise_and_brightness():
+    image = thumbnails(1)[0]
+    noise = np.random.default_rng(1).normal(0, 2, size=image.shape)
+    original, noisy, brighter = phash_batch([image, image + noise, image * 0.8 + 20])
+    assert hamming(original, noisy) <= 4
+    assert hamming(original, brighter) <= 4
+
+
+def test_phash_batch_separates_different_images():
+    hashes = phash_batch(thumbnails(8))
+    distances = [hamming(a, b) for i, a in enumerate(hashes) for b in hashes[i + 1 :]]
+    assert min(distances) > 10
+
+
+def test_bk_tree_search_and_nearest():
+    tree = BKTree()
+    values = [0b0000, 0b0001, 0b0011, 0b0111, 0b1111_0000]
+    for index, value in enumerate(values):
+        tree.add(value, index)
+    assert len(tree) == len(values)
+    assert tree.search(0b0000, 1) == [(0, 0), (1, 1)]
+    matches = tree.search(0b0011, 1)
+    assert matches[0] == (0, 2)
+    assert sorted(matches) == [(0, 2), (1, 1), (1, 3)]
+    assert tree.nearest(0b0110, 1) == 3
+    assert tree.nearest(0b1010_1010, 2) is None
+    assert BKTree().search(0, 64) == []
+
+
+def test_bk_tree_search_matches_brute_force():
+    rng = np.random.default_rng(2)
+    values = [int(v) for v in rng.integers(0, 2**16, size=200)]
+    tree = BKTree()
+    for index, value in enumerate(values):
+        tree.add(value, index)
+    query = values[0] ^ 0b101
+    expected = {i for i, value in enumerate(values) if hamming(query, value) <= 4}
+    assert {item for _, item in tree.search(query, 4)} == expected
+
+
+def test_find_duplicates():
+    hashes = [0b0000, 0b0001, 0b1111_0000, 0b1111_0001, 0b1111_1111_0000_0000]
+    assert find_duplicates(hashes, threshold=1) == {1: 0, 3: 2}
+    assert find_duplicates(hashes, threshold=0) == {}
+
+
+def test_find_duplicates_against_reference():
+    hashes = [0b0000, 0b0001, 0b1111_0000]
+    reference = [0b1111_0001]
+    assert find_duplicates(hashes, threshold=1, reference=reference) == {
+        1: 0,
+        2: ("reference", 0),
+    }
+
+
+def test_duplicate_page_index_evicts_least_recently_used():
+    index = DuplicatePageIndex(max_size=2)
+    index.add(1, "a")
+    index.add(2, "b")
+    assert index.lookup(1) == "a"
+    index.add(3, "c")
+    assert len(index) == 2
+    assert index.lookup(2) is None
+    assert index.lookup(1) == "a"
+    assert index.lookup(3) == "c"
+    # Only exact hashes match
+    assert index.lookup(1 ^ 1) is None
+
+
+def test_reuse_record_rescales_boxes():
+    record = DetectionRecord(
+        source="a.pdf",
+        boxes=np.array([[10, 20, 30, 40]], dtype=np.float32),
+        classes=np.array([2], dtype=np.int32),
+        scores=np.array([0.9], dtype=np.float32),
+        image_shape=(100, 50),
+        page=0,
+    )
+    reused = reuse_record(record, "b.pdf", 3, (200, 150))
+    assert reused.source == "b.pdf"
+    assert reused.page == 3
+    assert reused.image_shape == (200, 150)
+    assert reused.boxes.tolist() == [[30, 40, 90, 80]]
+    assert reused.classes is record.classes
+    assert record.boxes.tolist() == [[10, 20, 30, 40]]
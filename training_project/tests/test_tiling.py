@@ -0,0 +1,74 @@
+import numpy as np
+
+from src.tiling import make_tiles, merge_tile_detections, nms, tile_origins
+
+
+def test_tile_origins_cover_the_axis():
+    assert tile_origins(500, 640, 64) == [0]
+    origins = tile_origins(1500, 640, 128)
+    assert origins[0] == 0
+    assert origins[-1] == 1500 - 640
+    assert all(b - a <= 640 - 128 for a, b in zip(origins, origins[1:]))
+
+
+def test_make_tiles_returns_views_and_offsets():
+    image = np.zeros((1000, 1200, 3), dtype=np.uint8)
+    tiles, offsets = make_tiles(image, 640, 64)
+    assert len(tiles) == len(offsets) == 4
+    assert all(tile.shape == (640, 640, 3) for tile in tiles)
+    assert all(np.shares_memory(tile, image) for tile in tiles)
+    assert offsets.tolist() == [[0, 0], [560, 0], [0, 360], [560, 360]]
+
+
+def test_nms_suppresses_overlapping_boxes_of_the_same_class():
+    boxes = np.array([[0, 0, 10, 10], [1, 1, 10, 10], [20, 20, 30, 30]])
+    scores = np.array([0.8, 0.9, 0.7])
+    assert nms(boxes, scores, threshold=0.5).tolist() == [1, 2]
+
+
+def test_nms_keeps_overlapping_boxes_of_different_classes():
+    boxes = np.array([[0, 0, 10, 10], [0, 0, 10, 10]])
+    scores = np.array([0.9, 0.8])
+    assert nms(boxes, scores, classes=[0, 1]).tolist() == [0, 1]
+    assert nms(boxes, scores, classes=[0, 1], agnostic=True).tolist() == [0]
+
+
+def test_nms_of_no_boxes():
+    assert nms(np.zeros((0, 4)), np.zeros(0)).size == 0
+
+
+def test_merge_tile_detections_shifts_and_merges_cut_boxes():
+    # The same object: complete in tile 0, cut at the border of tile 1
+    tile_boxes = [
+        np.array([[500, 100, 600, 200]], dtype=np.float32),
+        np.array([[0, 100, 40, 200]], dtype=np.float32),
+    ]
+    tile_classes = [np.array([0]), np.array([0])]
+    tile_scores = [np.array([0.9]), np.array([0.6])]
+    offsets = np.array([[0, 0], [560, 0]], dtype=np.float32)
+
+    boxes, classes, scores = merge_tile_detections(
+        tile_boxes, tile_classes, tile_scores, offsets
+    )
+    assert boxes.tolist() == [[500, 100, 600, 200]]
+    assert classes.tolist() == [0]
+    assert scores.tolist() == [np.float32(0.9)]
+
+
+def test_merge_tile_detections_keeps_separate_objects():
+    tile_boxes = [
+        np.array([[10, 10, 50, 50]], dtype=np.float32),
+        np.array([[10, 10, 50, 50]], dtype=np.float32),
+    ]
+    offsets = np.array([[0, 0], [560, 0]], dtype=np.float32)
+    boxes, _, _ = merge_tile_detections(
+        tile_boxes, [np.array([0])] * 2, [np.array([0.9])] * 2, offsets
+    )
+    assert boxes.tolist() == [[10, 10, 50, 50], [570, 10, 610, 50]]
+
+
+def test_merge_tile_detections_without_detections():
+    boxes, classes, scores = merge_tile_detections(
+        [np.zeros((0, 4))], [np.zeros(0)], [np.zeros(0)], np.zeros((1, 2))
+    )
+    assert boxes.shape == (0, 4) and classes.size == 0 and scores.size == 0